@@ -100,6 +100,11 @@ def main() -> int:
         action="store_true",
         help="Emit Bake --set lines that push-by-digest for each stage.",
     )
+    parser.add_argument(
+        "--as-of",
+        default="",
+        help="Evaluate EOL dates as of this ISO date (defaults to today).",
+    )
     args = parser.parse_args()
 
     platform = canonical_platform(args.platform)  # e.g., "linux/arm/v7"
@@ -113,7 +118,9 @@ def main() -> int:
     release_group = f"{release}-{platform_group}"
 
     try:
-        templates = Templates(templates_path="templates.yml")
+        templates = Templates(
+            templates_path="templates.yml", as_of=args.as_of or None
+        )
     except ValueError as exc:
         core.set_failed(str(exc))
         return 1
@@ -131,10 +138,10 @@ def main() -> int:
     normalized_family = args.family.strip().lower()
     normalized_ghcr_owner = args.ghcr_owner.strip().lower()
     normalized_docker_user = args.docker_username.strip().lower()
-    for tgt in templates.targets_for_platform(entry, platform):
-        stage = tgt.get("target")
+    for target in templates.targets_for_platform(entry, platform):
+        stage = target.target
+        tname = f"{entry.token}-{stage}"
         stages.append(stage)
-        tname = f"{release}-{stage}"
         stage_targets.append(tname)
 
         destinations: list[str] = []
@@ -26,11 +26,21 @@ class GetVariablesTestCase(unittest.TestCase):
         self.original_cwd = os.getcwd()
         self.tmpdir = tempfile.TemporaryDirectory()
         os.chdir(self.tmpdir.name)
+        self.env = patch.dict(
+            os.environ,
+            {
+                "DOCKERFILES_TEMPLATES_CACHE_DIR": os.path.join(
+                    self.tmpdir.name, "cache"
+                )
+            },
+        )
+        self.env.start()
         self.module = load_get_variables_module()
         self.core_mock = MagicMock()
         self.module.core = self.core_mock
 
     def tearDown(self):
+        self.env.stop()
         os.chdir(self.original_cwd)
         self.tmpdir.cleanup()
 
@@ -12,24 +12,7 @@ REPO_ROOT = Path(__file__).resolve().parents[3]
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
-from dockerfiles_templates import (  # noqa: E402
-    Templates,
-    canonical_platform,
-)
-
-
-def collect_non_eol(
-    templates: Templates, platform: str | None = None
-) -> list[dict]:
-    platform = platform or ""
-    include: list[dict] = []
-    for entry in templates.entries(eol=False, platform=platform or None):
-        name = entry.get("name")
-        family = entry.get("family")
-        if not name or not family:
-            continue
-        include.append({"family": family, "distro": name})
-    return include
+from dockerfiles_templates import Templates  # noqa: E402
 
 
 def parse_changed(raw: str) -> set[tuple[str, str]]:
@@ -60,7 +43,7 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--templates",
         default="templates.yml",
-        help="Path to the templates.yml file.",
+        help="Path to templates.yml or a templates.d/ fragment directory.",
     )
     parser.add_argument(
         "--platform",
@@ -77,43 +60,45 @@ def parse_args() -> argparse.Namespace:
         default="false",
         help="return all values regardless of change status.",
     )
+    parser.add_argument(
+        "--as-of",
+        default="",
+        help="Evaluate EOL dates as of this ISO date (defaults to today).",
+    )
     return parser.parse_args()
 
 
 def main() -> int:
     args = parse_args()
     try:
-        templates = Templates(templates_path=Path(args.templates))
+        templates = Templates(
+            templates_path=Path(args.templates), as_of=args.as_of or None
+        )
     except ValueError as exc:
         core.set_failed(str(exc))
         return 1
     changed = parse_changed(args.changed)
     all = args.all.lower() == "true"
-    include: list[dict[str, str]] = []
-    stage_details: list[dict[str, str]] = []
-    want_platform = canonical_platform(args.platform) if args.platform else ""
-    for item in collect_non_eol(templates, args.platform or None):
-        if (not all and not changed) or (
-            not all and (item["family"], item["distro"]) not in changed
-        ):
-            continue
-        include.append(item)
-        entry = templates.get_entry(item["family"], item["distro"], eol=False)
-        if not entry:
-            continue
-        for target in templates.targets_for_platform(entry, want_platform):
-            stage = target.get("target")
-            if not stage:
-                continue
-            platforms = target.get("platforms", [])
-            stage_details.append(
-                {
-                    "family": item["family"],
-                    "distro": item["distro"],
-                    "stage": stage,
-                    "platforms": ",".join(platforms),
-                }
-            )
+    matrix = templates.matrix(
+        platform=args.platform or None,
+        eol=False,
+        changed=None if all else changed,
+    )
+    include = [
+        {"family": family, "distro": name}
+        for family, name in matrix.unique("family", "name")
+    ]
+    stage_details = [
+        {
+            "family": family,
+            "distro": name,
+            "stage": stage,
+            "platforms": ",".join(platforms),
+        }
+        for family, name, stage, platforms in matrix.unique(
+            "family", "name", "stage", "platforms"
+        )
+    ]
     families = sorted({item["family"] for item in include})
     core.set_output("distros", include)
     core.set_output("families", families)
@@ -32,10 +32,20 @@ class GetTargetsTestCase(unittest.TestCase):
         self._cwd = os.getcwd()
         self._tmpdir = tempfile.TemporaryDirectory()
         os.chdir(self._tmpdir.name)
+        self._env = patch.dict(
+            os.environ,
+            {
+                "DOCKERFILES_TEMPLATES_CACHE_DIR": os.path.join(
+                    self._tmpdir.name, "cache"
+                )
+            },
+        )
+        self._env.start()
         self.core_mock = MagicMock()
         TARGETS_MODULE.core = self.core_mock
 
     def tearDown(self) -> None:
+        self._env.stop()
         os.chdir(self._cwd)
         self._tmpdir.cleanup()
 
@@ -204,6 +214,30 @@ class GetTargetsTestCase(unittest.TestCase):
         self.assertEqual(outputs.get("families"), [])
         self.assertEqual(outputs.get("stages"), [])
 
+    def test_main_evaluates_eol_as_of_date(self) -> None:
+        self._write_templates(
+            """
+            dockerfiles:
+              - family: ros2
+                name: humble
+                distro: humble
+                base_image: ubuntu:22.04
+                eol: "2024-01-01"
+                targets:
+                  - target: base
+                    platforms: [linux/amd64]
+            """
+        )
+
+        argv = ["get_targets.py", "--all", "true", "--as-of", "2023-12-31"]
+        with patch.object(sys, "argv", argv):
+            exit_code = TARGETS_MODULE.main()
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(
+            self._outputs()["distros"], [{"family": "ros2", "distro": "humble"}]
+        )
+
     def test_parse_changed_ignores_non_dockerfiles(self) -> None:
         raw = "ros2/rolling.Dockerfile\nros2/README.md,gazebo/garden.Dockerfile"
         changed = TARGETS_MODULE.parse_changed(raw)
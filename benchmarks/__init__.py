@@ -0,0 +1 @@
+"""Benchmarks for the templates API and generation scripts."""
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Benchmark generate.py rendering across process-pool sizes.
+
+Renders the Dockerfiles, readmes and compose files of a synthetic catalog
+into scratch directories, once per ``--jobs`` value, and checks that every
+run is byte-identical to the serial one.
+
+Example:
+  python benchmarks/bench_generate.py --entries 2000 --jobs 1 2 4 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import filecmp
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+import generate  # noqa: E402
+from benchmarks.catalog import synthetic_catalog  # noqa: E402
+from dockerfiles_templates import Templates  # noqa: E402
+from dockerfiles_templates.manifest import Manifest  # noqa: E402
+
+
+def render_once(workdir: Path, workers: int) -> float:
+    """Render every job into ``workdir`` from scratch; return seconds."""
+    shutil.copytree(REPO_ROOT / "template", workdir / "template")
+    previous = os.getcwd()
+    os.chdir(workdir)
+    try:
+        generate.manifest = Manifest(workdir / ".generate-manifest.json")
+        generate._environments.clear()
+        jobs = (
+            generate.dockerfile_jobs(eol=True)
+            + generate.readme_jobs()
+            + generate.compose_jobs(eol=True)
+        )
+        start = time.perf_counter()
+        generate.render_outputs(jobs, workers)
+        return time.perf_counter() - start
+    finally:
+        os.chdir(previous)
+
+
+def identical(left: Path, right: Path) -> bool:
+    """Return True when two output trees hold the same files and bytes."""
+    compare = filecmp.dircmp(left, right, ignore=[".generate-manifest.json"])
+    pending = [compare]
+    while pending:
+        current = pending.pop()
+        if current.left_only or current.right_only or current.diff_files:
+            return False
+        _, mismatch, errors = filecmp.cmpfiles(
+            current.left, current.right, current.common_files, shallow=False
+        )
+        if mismatch or errors:
+            return False
+        pending.extend(current.subdirs.values())
+    return True
+
+
+def main() -> int:
+    """Entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=2000)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    generate.templates = Templates.from_dict(synthetic_catalog(args.entries))
+    jobs = sorted(set([1] + args.jobs))
+    with tempfile.TemporaryDirectory() as scratch:
+        root = Path(scratch)
+        timings = {}
+        for workers in jobs:
+            timings[workers] = render_once(root / f"jobs-{workers}", workers)
+
+        serial = timings[1]
+        print(f"{args.entries} entries")
+        print(f"{'jobs':>6} {'seconds':>9} {'speedup':>8}  output")
+        for workers in jobs:
+            same = identical(root / "jobs-1", root / f"jobs-{workers}")
+            print(
+                f"{workers:>6} {timings[workers]:>9.3f} "
+                f"{serial / timings[workers]:>7.2f}x  "
+                f"{'identical' if same else 'DIFFERENT'}"
+            )
+            if not same:
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
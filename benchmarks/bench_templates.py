@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Benchmark indexed Templates queries against a linear-scan reference.
+
+Example:
+  python benchmarks/bench_templates.py --entries 10000 --repeat 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.catalog import synthetic_catalog  # noqa: E402
+from dockerfiles_templates import (  # noqa: E402
+    Templates,
+    filter_targets_by_platform,
+)
+
+
+class LinearTemplates:
+    """Reference implementation that rescans every entry per query."""
+
+    def __init__(self, templates: Templates) -> None:
+        """Wrap the raw entries of an already validated catalog."""
+        self._templates = templates
+        self._entries = templates.raw()
+
+    def entries(self, family="", eol=False, platform=None) -> list:
+        """Filter entries with a full scan."""
+        output = []
+        for entry in self._entries:
+            if family and entry["family"] != family:
+                continue
+            if not eol and self._templates._compute_past_eol(entry):
+                continue
+            if platform and not filter_targets_by_platform(
+                entry.get("targets") or [], platform
+            ):
+                continue
+            output.append(entry)
+        return output
+
+    def group_by(self, key, eol=False, platform=None) -> dict:
+        """Group entries with a full scan."""
+        output = {}
+        for entry in self.entries(eol=eol, platform=platform):
+            output.setdefault(entry.get(key), []).append(entry)
+        return output
+
+    def image_tokens(self, eol=False) -> list[str]:
+        """Build image tokens with a full scan."""
+        return [f"{e['family']}-{e['name']}" for e in self.entries(eol=eol)]
+
+
+def normalize(result):
+    """Reduce query results to comparable plain values."""
+    if isinstance(result, dict):
+        return {key: normalize(value) for key, value in result.items()}
+    return [
+        item if isinstance(item, str) else (item["family"], item["name"])
+        for item in result
+    ]
+
+
+QUERIES = {
+    "entries()": lambda t: t.entries(),
+    "entries(family)": lambda t: t.entries(family="ros2"),
+    "entries(platform)": lambda t: t.entries(platform="linux/arm/v7"),
+    "group_by(family)": lambda t: t.group_by("family", eol=True),
+    "group_by(distro, platform)": lambda t: t.group_by(
+        "distro", platform="linux/arm64"
+    ),
+    "image_tokens()": lambda t: t.image_tokens(),
+}
+
+
+def main() -> int:
+    """Entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    templates = Templates.from_dict(synthetic_catalog(args.entries))
+    linear = LinearTemplates(templates)
+
+    print(f"{args.entries} entries, {args.repeat} calls per query")
+    print(f"{'query':<28}{'linear ms':>12}{'indexed ms':>12}{'speedup':>10}")
+    for label, query in QUERIES.items():
+        if normalize(query(linear)) != normalize(query(templates)):
+            raise SystemExit(f"Result mismatch for {label}")
+        slow = timeit.timeit(lambda: query(linear), number=args.repeat)
+        fast = timeit.timeit(lambda: query(templates), number=args.repeat)
+        per_call = 1000 / args.repeat
+        print(
+            f"{label:<28}{slow * per_call:>12.3f}{fast * per_call:>12.3f}"
+            f"{slow / fast:>9.1f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,48 @@
+"""Synthetic templates.yml catalogs for benchmarks."""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+FAMILIES = ("ros", "ros2", "gazebo", "ignition", "gz")
+STAGES = ("base", "dev", "desktop", "full", "gazebo")
+PLATFORMS = (
+    ["linux/amd64", "linux/arm64"],
+    ["linux/amd64"],
+    ["linux/arm/v7"],
+    ["linux/arm"],
+)
+BASE_IMAGES = ("ubuntu:20.04", "ubuntu:22.04", "ubuntu:24.04")
+
+
+def synthetic_catalog(count: int) -> dict:
+    """Return a schema-valid settings dictionary with ``count`` entries.
+
+    Roughly a third of the entries are past EOL and the platform mix
+    includes variant and variant-less declarations so every query path
+    of the API is exercised.
+    """
+    today = date.today()
+    dockerfiles = []
+    for index in range(count):
+        family = FAMILIES[index % len(FAMILIES)]
+        entry = {
+            "family": family,
+            "name": f"distro{index}",
+            "distro": f"distro{index % 97}",
+            "base_image": BASE_IMAGES[index % len(BASE_IMAGES)],
+            "eol": (today + timedelta(days=(index % 3 - 1) * 365)).isoformat(),
+            "targets": [
+                {
+                    "target": stage,
+                    "platforms": list(
+                        PLATFORMS[(index + offset) % len(PLATFORMS)]
+                    ),
+                }
+                for offset, stage in enumerate(STAGES[: 2 + index % 4])
+            ],
+        }
+        if family == "ignition":
+            entry["gazebo_version"] = str(index % 20)
+        dockerfiles.append(entry)
+    return {"dockerfiles": dockerfiles}
@@ -5,15 +5,32 @@ from __future__ import annotations
 
 import logging
 import os
+import re
 import subprocess
 import json
-import re
+import time
 from datetime import date
 from pathlib import Path
-from typing import Iterable
+from typing import Callable, Iterable, Mapping
 
 import click
 
+from dockerfiles_templates import default_as_of
+from dockerfiles_templates.bake import (
+    BAKE_DIR,
+    BAKE_JSON,
+    bake_files,
+    cache_attributes,
+    parse_cache,
+)
+from dockerfiles_templates.fingerprint import (
+    STATE_FILE,
+    BuildState,
+    build_key,
+    fingerprints,
+)
+from dockerfiles_templates.stages import StageGraph, memory_cap, run_graph
+
 """ md
 # Build (`build.py`)
 
@@ -34,16 +51,60 @@ python build.py ros2-jazzy
 
 ### Options
 - `--push`: Push results to `${DOCKER_REGISTRY:-althack}` (or set `DOCKER_PUSH=true`).
-- `--no-clean`: Skip the final `docker system prune -f` (or set `DOCKER_CLEAN=false`).
-
-The script always reads from the generated `docker-bake.hcl`, updating tags like
+- `--clean/--no-clean`: Run or skip the final prune (default: `DOCKER_CLEAN`, which
+  is on unless set to a false value such as `false`).
+- `--prune POLICY`: What the final prune removes (or set `DOCKER_PRUNE`):
+  - `dangling` (default): only this project's images left untagged by this run,
+    i.e. the previous images of the `registry/<family>:*` tags that were rebuilt.
+  - `buildcache-keep=<size>`: additionally trim the BuildKit cache down to `<size>`
+    (e.g. `20GB`), least recently used records first.
+  - `age=<duration>`: additionally drop build cache unused for `<duration>`
+    (e.g. `72h`, `7d`).
+  - `none`: remove nothing.
+
+  Base images and the build cache of recently built distros are kept, so the next
+  run starts warm; `docker system prune` is never run.
+- `--as-of YYYY-MM-DD`: Date used for dated tags (defaults to
+  `DOCKERFILES_TEMPLATES_AS_OF` or today), so one run shares a single snapshot.
+
+The script always reads from the generated bake files (`docker-bake.json` plus
+the `bake/<family>.json` files the selector needs), updating tags like
 `registry/repo:image-stage` and `registry/repo:image-stage-YYYY-MM-DD` when pushing.
+A selector is built by a single bake invocation (tags are passed per target with
+`--set`), so stages shared by its targets are built once.
+
+- `--jobs N`: Schedule the selector's targets instead, one bake run per target, in
+  the order of their Dockerfile stage graph (`FROM base AS dev`, ...). Up to N
+  independent chains run at once, capped by available memory (see `--job-memory`);
+  targets with the most dependents, such as each release's `base`, start first.
+- `--cache local:<dir>|registry:<ref>|none`: Import and export the BuildKit layer
+  cache of every target (or set `DOCKER_CACHE`; default `none`). Each target,
+  stage and platform gets a stable scope (`ros2-jazzy-base-linux-amd64`): a
+  subdirectory of `<dir>`, or a tag of the `<ref>` repository, written with
+  `mode=max`. Exporting a cache needs a `docker-container` builder
+  (`docker buildx create --use --driver-opt network=host`; host networking lets
+  it reach a `localhost:5000` registry container).
+- `--skip-unchanged`: Skip targets whose inputs match their last successful build
+  (loaded and pushed builds are tracked separately). A target's fingerprint
+  hashes its Dockerfile stage and ancestor stages (including the `FROM` base
+  image reference), the context files they `COPY` (`ros_entrypoint.sh`) and the
+  fingerprints of targets it is built `FROM`; the registry and the tags it is
+  built with are part of the match too, so pushing to another registry or with
+  a new `--as-of` date builds again. A loaded target is only skipped while its
+  image is still in the local image store. Every successful build records its
+  key and duration in `.cache/build/state.json`; skipped targets and the build
+  time they last took are reported.
 
 """
 
-TODAY = date.today()
 DEFAULT_REGISTRY = "althack"
-DOCKER_BAKE_FILE = Path(__file__).resolve().parent / "docker-bake.hcl"
+DEFAULT_JOB_MEMORY_GB = 4.0
+DEFAULT_PRUNE = "dangling"
+SIZE_PATTERN = re.compile(r"\d+(?:\.\d+)?(?:[kmgt]i?)?b?", re.IGNORECASE)
+DURATION_PATTERN = re.compile(r"(?:\d+[smhd])+")
+DURATION_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+REPO_ROOT = Path(__file__).resolve().parent
+DOCKER_BAKE_FILE = REPO_ROOT / BAKE_JSON
 
 log = logging.getLogger(__name__)
 
@@ -55,9 +116,9 @@ def _bake_selector_completion(
     del ctx, param
     values = {"all"}
     if DOCKER_BAKE_FILE.exists():
-        text = DOCKER_BAKE_FILE.read_text(encoding="utf-8")
-        for match in re.findall(r'^(?:target|group)\s+"([^"]+)"', text, re.M):
-            values.add(match)
+        definition = DockerBake().definition("default")
+        values.update(definition["target"])
+        values.update(definition["group"])
     return [
         click.shell_completion.CompletionItem(value)
         for value in sorted(values)
@@ -65,6 +126,38 @@ def _bake_selector_completion(
     ]
 
 
+def _validate_cache(
+    ctx: click.Context, param: click.Parameter, value: str | None
+) -> str | None:
+    """Reject malformed ``--cache`` specs before building."""
+    del ctx, param
+    if value is not None:
+        try:
+            parse_cache(value)
+        except ValueError as exc:
+            raise click.BadParameter(str(exc)) from exc
+    return value
+
+
+def _validate_prune(
+    ctx: click.Context, param: click.Parameter, value: str | None
+) -> str | None:
+    """Reject malformed ``--prune`` policies before building."""
+    del ctx, param
+    if value is not None:
+        try:
+            parse_prune(value)
+        except ValueError as exc:
+            raise click.BadParameter(str(exc)) from exc
+    return value
+
+
+def load_bake_definition(path: str | Path) -> dict:
+    """Return the parsed docker-bake.json definition."""
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
 def _get_bool(value: str | None) -> bool:
     """Return True when an environment value should be considered enabled."""
     if value is None:
@@ -78,8 +171,8 @@ def should_push() -> bool:
 
 
 def should_clean() -> bool:
-    """Return True when a post-build prune is requested."""
-    return _get_bool(os.getenv("DOCKER_CLEAN"))
+    """Return True unless ``DOCKER_CLEAN`` turns the post-build prune off."""
+    return _get_bool(os.getenv("DOCKER_CLEAN", "true"))
 
 
 class DockerBake:
@@ -94,38 +187,113 @@ class DockerBake:
         self.registry = registry or os.getenv(
             "DOCKER_REGISTRY", DEFAULT_REGISTRY
         )
-        self.bake_file = str(DOCKER_BAKE_FILE)
+        self.root = REPO_ROOT
+
+    def families(self) -> list[str]:
+        """Return the families with a generated bake file."""
+        return sorted(
+            path.stem for path in (self.root / BAKE_DIR).glob("*.json")
+        )
+
+    def files(self, ref: str) -> list[str]:
+        """Return the bake files defining ``ref``: the root and its family."""
+        return [
+            str(self.root / name)
+            for name in bake_files(ref, self.families())
+        ]
+
+    def _file_args(self, ref: str) -> list[str]:
+        args = []
+        for bake_file in self.files(ref):
+            args.extend(["--file", bake_file])
+        return args
+
+    def definition(self, ref: str) -> dict:
+        """Return the merged groups and targets of the files for ``ref``."""
+        merged = {"group": {}, "target": {}}
+        for bake_file in self.files(ref):
+            if not os.path.exists(bake_file):
+                continue
+            definition = load_bake_definition(bake_file)
+            for kind, items in merged.items():
+                items.update(definition.get(kind) or {})
+        return merged
+
+    def platform(self) -> str:
+        """Return the native ``os/arch`` of the Docker daemon."""
+        output = subprocess.check_output(
+            [
+                "docker",
+                "version",
+                "--format",
+                "{{.Server.Os}}/{{.Server.Arch}}",
+            ],
+            text=True,
+        )
+        return output.strip()
+
+    def cache_settings(
+        self, cache: str, targets: Iterable[str]
+    ) -> dict[str, dict[str, str]]:
+        """Return the cache attributes of ``targets`` for a cache spec.
+
+        A ``local`` directory is made absolute, since bake resolves
+        relative paths against the bake file directory.
+        """
+        backend, location = parse_cache(cache)
+        if backend == "none":
+            return {}
+        if backend == "local":
+            cache = f"local:{os.path.abspath(location)}"
+        platform = self.platform()
+        return {
+            target: cache_attributes(cache, target, platform)
+            for target in targets
+        }
 
     def bake(
         self,
-        target: str,
+        ref: str,
         *,
         push: bool,
-        tags: Iterable[str] | None = None,
+        tags: Mapping[str, Iterable[str]] | None = None,
+        cache: Mapping[str, Mapping[str, str]] | None = None,
+        targets: Iterable[str] | None = None,
     ) -> None:
-        """Execute a bake target with optional push settings.
+        """Execute a bake target or group in one ``docker buildx bake`` run.
+
+        Building a group in one invocation lets BuildKit share the stages
+        its targets have in common and build independent targets
+        concurrently.
 
         Args:
-            target: Bake target name (e.g. ``ros2-rolling-base``).
+            ref: Bake target or group name (e.g. ``ros2-rolling``).
             push: Whether to push instead of loading locally.
-            tags: Additional tags to apply when pushing.
+            tags: Tags to apply when pushing, per target of ``ref``.
+            cache: ``cache-from``/``cache-to`` attributes per target.
+            targets: Build these targets of ``ref``'s bake files instead
+                of ``ref`` itself.
         """
         cmd: list[str] = [
             "docker",
             "buildx",
             "bake",
-            "--file",
-            self.bake_file,
+            *self._file_args(ref),
             "--debug",
         ]
 
         cmd.append("--push" if push else "--load")
 
         if push and tags:
-            tag_list = ",".join(tags)
-            cmd.extend(["--set", f"{target}.tags={tag_list}"])
+            for target, target_tags in tags.items():
+                tag_list = ",".join(target_tags)
+                cmd.extend(["--set", f"{target}.tags={tag_list}"])
+
+        for target, attributes in (cache or {}).items():
+            for name, value in attributes.items():
+                cmd.extend(["--set", f"{target}.{name}={value}"])
 
-        cmd.append(target)
+        cmd.extend(targets or [ref])
         log.debug("Running: %s", " ".join(cmd))
         subprocess.run(cmd, check=True)
 
@@ -135,8 +303,7 @@ class DockerBake:
             "docker",
             "buildx",
             "bake",
-            "--file",
-            self.bake_file,
+            *self._file_args(ref),
             "--print",
             ref,
         ]
@@ -148,25 +315,110 @@ class DockerBake:
         return targets
 
     def has_target(self, target: str) -> bool:
-        """Return True when the target exists in docker-bake.hcl."""
-        with open(self.bake_file, "r", encoding="utf-8") as file:
-            content = file.read()
-        return f'target "{target}"' in content
+        """Return True when the target exists in the bake files."""
+        return target in self.definition(target)["target"]
 
     def has_group(self, group: str) -> bool:
-        """Return True when the group exists in docker-bake.hcl."""
-        with open(self.bake_file, "r", encoding="utf-8") as file:
-            content = file.read()
-        return f'group "{group}"' in content
+        """Return True when the group exists in the bake files."""
+        return group in self.definition(group)["group"]
 
     def has_ref(self, ref: str) -> bool:
         """Return True when a bake ref exists as either target or group."""
         return self.has_target(ref) or self.has_group(ref)
 
+    def local_tags(self, definition: Mapping, target: str) -> list[str]:
+        """Return the tags bake gives ``target`` when loading it locally.
+
+        Without ``--set``, bake takes ``REGISTRY`` from the environment or
+        the default of the root bake file.
+        """
+        registry = os.getenv("REGISTRY")
+        if not registry:
+            root = load_bake_definition(self.root / BAKE_JSON)
+            registry = root["variable"]["REGISTRY"]["default"]
+        tags = (definition.get("target") or {}).get(target, {}).get("tags")
+        return [tag.replace("${REGISTRY}", registry) for tag in tags or []]
+
+    @staticmethod
+    def image_exists(image: str) -> bool:
+        """Return True when ``image`` is in the local image store."""
+        result = subprocess.run(
+            ["docker", "image", "inspect", image],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=False,
+        )
+        return result.returncode == 0
+
     @staticmethod
-    def prune() -> None:
-        """Prune dangling Docker resources."""
-        subprocess.run(["docker", "system", "prune", "-f"], check=True)
+    def retag(image: str, tags: Iterable[str]) -> None:
+        """Point ``tags`` at the pushed ``image`` without rebuilding it."""
+        cmd = ["docker", "buildx", "imagetools", "create"]
+        for tag in tags:
+            cmd.extend(["--tag", tag])
+        cmd.append(image)
+        log.debug("Re-tagging with: %s", " ".join(cmd))
+        subprocess.run(cmd, check=True)
+
+    def project_images(self) -> set[str]:
+        """Return the IDs of local images tagged ``registry/<family>:*``."""
+        families = self.families()
+        if not families:
+            return set()
+        cmd = ["docker", "image", "ls", "--no-trunc", "--format", "{{.ID}}"]
+        for family in families:
+            cmd.extend(["--filter", f"reference={self.registry}/{family}:*"])
+        return set(subprocess.check_output(cmd, text=True).split())
+
+    def prune(self, policy: str, before: set[str] | None = None) -> None:
+        """Prune after a build according to a ``--prune`` policy.
+
+        Args:
+            policy: ``none``, ``dangling``, ``buildcache-keep=<size>`` or
+                ``age=<duration>``.
+            before: ``project_images()`` from before the build; images
+                among them that are now untagged are removed.
+        """
+        kind, value = parse_prune(policy)
+        if kind == "none":
+            return
+        if before:
+            dangling = subprocess.check_output(
+                [
+                    "docker",
+                    "image",
+                    "ls",
+                    "--quiet",
+                    "--no-trunc",
+                    "--filter",
+                    "dangling=true",
+                ],
+                text=True,
+            ).split()
+            stale = sorted(
+                (before - self.project_images()).intersection(dangling)
+            )
+            if stale:
+                log.info("Removing %d superseded images", len(stale))
+                # Images still used by a container stay; that is not an error.
+                subprocess.run(["docker", "image", "rm", *stale], check=False)
+        if kind == "buildcache-keep":
+            subprocess.run(
+                ["docker", "buildx", "prune", "-f", "--keep-storage", value],
+                check=True,
+            )
+        elif kind == "age":
+            subprocess.run(
+                [
+                    "docker",
+                    "buildx",
+                    "prune",
+                    "-f",
+                    "--filter",
+                    f"until={value}",
+                ],
+                check=True,
+            )
 
 
 def parse_bake_target(target: str) -> tuple[str, str, str]:
@@ -178,38 +430,231 @@ def parse_bake_target(target: str) -> tuple[str, str, str]:
     return family, name, stage
 
 
-def build(selection: str, push: bool, clean: bool) -> None:
-    """Build a bake target/group, or ``all`` (mapped to ``default`` group)."""
+def parse_prune(policy: str) -> tuple[str, str]:
+    """Split a ``--prune`` policy into its kind and argument.
+
+    ``age`` durations may use days (``7d``); they are returned in the
+    hours or seconds that Docker's ``until`` filter accepts.
+
+    Raises:
+        ValueError: The policy is unknown or its argument is malformed.
+    """
+    kind, _, value = policy.partition("=")
+    if kind in ("none", "dangling") and not value:
+        return kind, ""
+    if kind == "buildcache-keep" and SIZE_PATTERN.fullmatch(value):
+        return kind, value
+    if kind == "age" and DURATION_PATTERN.fullmatch(value):
+        seconds = sum(
+            int(amount) * DURATION_SECONDS[unit]
+            for amount, unit in re.findall(r"(\d+)([smhd])", value)
+        )
+        if seconds:
+            hours, rest = divmod(seconds, 3600)
+            return kind, f"{hours}h" if not rest else f"{seconds}s"
+    raise ValueError(
+        f"Invalid prune policy '{policy}'; expected none, dangling, "
+        "buildcache-keep=<size> or age=<duration>"
+    )
+
+
+def target_tags(registry: str, target: str, as_of: date) -> list[str]:
+    """Return the base and dated tags a target is pushed with."""
+    family, name, stage = parse_bake_target(target)
+    base_tag = f"{registry}/{family}:{name}-{stage}"
+    return [base_tag, f"{base_tag}-{as_of}"]
+
+
+def build(
+    selection: str,
+    push: bool,
+    clean: bool | None = None,
+    as_of: date | None = None,
+    jobs: int | None = None,
+    job_memory: float = DEFAULT_JOB_MEMORY_GB,
+    cache: str | None = None,
+    skip_unchanged: bool = False,
+    prune: str | None = None,
+) -> None:
+    """Build a bake target/group, or ``all`` (mapped to ``default`` group).
+
+    Without ``jobs`` the selector is handed to one bake invocation. With
+    ``jobs``, its targets are scheduled along their Dockerfile stage
+    graph, running up to ``jobs`` bake invocations at once, further
+    capped to one per ``job_memory`` GiB of available memory.
+
+    ``cache`` is a ``local:<dir>``, ``registry:<ref>`` or ``none`` spec
+    (default: ``DOCKER_CACHE``, else ``none``). With ``skip_unchanged``,
+    targets whose fingerprint matches their last successful build are
+    left out; skipped pushed targets get the dated tag of ``as_of`` by
+    re-tagging their base tag. With ``clean`` (default:
+    ``should_clean()``), the build ends with the ``prune`` policy
+    (default: ``DOCKER_PRUNE``, else ``dangling``).
+    """
+    as_of = as_of or default_as_of()
+    cache = cache or os.getenv("DOCKER_CACHE") or "none"
+    parse_cache(cache)
+    prune = prune or os.getenv("DOCKER_PRUNE") or DEFAULT_PRUNE
+    if clean is None:
+        clean = should_clean()
+    pruning = clean and parse_prune(prune)[0] != "none"
     baker = DockerBake()
     bake_ref = "default" if selection == "all" else selection
     if not baker.has_ref(bake_ref):
         raise Exception(
-            f"Bake target/group '{bake_ref}' was not found in docker-bake.hcl. "
+            f"Bake target/group '{bake_ref}' was not found in the bake files. "
             "Run './generate.py' to refresh bake targets."
         )
 
     push_requested = push or should_push()
+    targets = baker.resolve_targets(bake_ref)
+    if not targets:
+        raise Exception(f"No concrete bake targets resolved for '{bake_ref}'.")
+    definition = baker.definition(bake_ref)
+    prints = fingerprints(
+        definition,
+        StageGraph.from_definition(
+            definition, targets, baker.root, baker.registry
+        ),
+        baker.root,
+    )
     if push_requested:
-        targets = baker.resolve_targets(bake_ref)
+        tags = {
+            target: target_tags(baker.registry, target, as_of)
+            for target in targets
+        }
+    else:
+        tags = {
+            target: baker.local_tags(definition, target) for target in targets
+        }
+    # The dated tag of a push changes daily, so pushes are keyed on the
+    # base tag alone and skipped ones are re-tagged below.
+    keys = {
+        target: build_key(
+            prints[target],
+            baker.registry,
+            tags[target][:1] if push_requested else tags[target],
+        )
+        for target in targets
+    }
+    state = BuildState.load(baker.root / STATE_FILE)
+    before = baker.project_images() if pruning else None
+
+    skipped = []
+    if skip_unchanged:
+        skipped = [
+            target
+            for target in targets
+            if state.is_current(target, keys[target], push_requested)
+            and (
+                push_requested
+                or all(baker.image_exists(tag) for tag in tags[target])
+            )
+        ]
+    if skipped:
+        saved = sum(state.seconds(target, push_requested) for target in skipped)
+        log.info(
+            "Skipping %d unchanged targets (%.1f s of build time saved): %s",
+            len(skipped),
+            saved,
+            ", ".join(skipped),
+        )
+        targets = [target for target in targets if target not in skipped]
+        if push_requested:
+            for target in skipped:
+                baker.retag(tags[target][0], tags[target][1:])
+
+    def done(built: list[str], seconds: float) -> None:
+        for target in built:
+            state.record(
+                target, keys[target], seconds / len(built), push_requested
+            )
+
+    try:
         if not targets:
-            raise Exception(f"No concrete bake targets resolved for '{bake_ref}'.")
-        for target in targets:
-            family, name, stage = parse_bake_target(target)
-            base_tag = f"{baker.registry}/{family}:{name}-{stage}"
-            extra_tags = [base_tag, f"{base_tag}-{TODAY}"]
-            log.info(
-                "Building %s (target=%s push=%s)",
-                base_tag,
-                target,
+            log.info("Nothing to build for %s", bake_ref)
+        elif jobs is not None:
+            schedule(
+                baker,
+                bake_ref,
+                targets,
                 push_requested,
+                as_of,
+                jobs,
+                job_memory,
+                cache,
+                done,
             )
-            baker.bake(target, push=True, tags=extra_tags)
-    else:
-        log.info("Building %s (push=%s)", bake_ref, push_requested)
-        baker.bake(bake_ref, push=False)
+        else:
+            if push_requested:
+                for target in targets:
+                    log.info(
+                        "Building %s (target=%s push=%s)",
+                        tags[target][0],
+                        target,
+                        push_requested,
+                    )
+            else:
+                log.info("Building %s (push=%s)", bake_ref, push_requested)
+            log.info("Build cache: %s", cache)
+            started = time.perf_counter()
+            baker.bake(
+                bake_ref,
+                push=push_requested,
+                tags={target: tags[target] for target in targets},
+                cache=baker.cache_settings(cache, targets),
+                targets=targets if skipped else None,
+            )
+            done(targets, time.perf_counter() - started)
+    finally:
+        state.save()
 
-    if clean or should_clean():
-        baker.prune()
+    if pruning:
+        baker.prune(prune, before)
+
+
+def schedule(
+    baker: DockerBake,
+    bake_ref: str,
+    targets: list[str],
+    push: bool,
+    as_of: date,
+    jobs: int,
+    job_memory: float,
+    cache: str = "none",
+    done: Callable[[list[str], float], None] | None = None,
+) -> None:
+    """Bake ``targets`` of ``bake_ref`` concurrently along the stage graph.
+
+    ``done([target], seconds)`` is called after each successful bake.
+    """
+    graph = StageGraph.from_definition(
+        baker.definition(bake_ref), targets, baker.root, baker.registry
+    )
+    settings = baker.cache_settings(cache, targets)
+    cap = memory_cap(int(job_memory * 1024**3))
+    workers = min(jobs, cap) if cap else jobs
+    log.info(
+        "Scheduling %d targets of %s on %d workers (jobs=%d, memory cap=%s)",
+        len(graph),
+        bake_ref,
+        workers,
+        jobs,
+        cap if cap else "none",
+    )
+
+    def run(target: str) -> None:
+        tags = None
+        if push:
+            tags = {target: target_tags(baker.registry, target, as_of)}
+        log.info("Building %s (push=%s)", target, push)
+        cache_settings = {target: settings[target]} if settings else None
+        started = time.perf_counter()
+        baker.bake(target, push=push, tags=tags, cache=cache_settings)
+        if done is not None:
+            done([target], time.perf_counter() - started)
+
+    run_graph(graph, run, workers)
 
 
 @click.command()
@@ -220,13 +665,71 @@ def build(selection: str, push: bool, clean: bool) -> None:
 )
 @click.option(
     "--clean/--no-clean",
-    default=True,
-    help="Run `docker system prune -f` after the build.",
+    default=None,
+    help=(
+        "Prune after the build according to --prune "
+        "(default: $DOCKER_CLEAN, else on)."
+    ),
+)
+@click.option(
+    "--as-of",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    default=None,
+    help="Date for dated tags (defaults to today).",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=None,
+    help=(
+        "Schedule targets along the Dockerfile stage graph, running up to N "
+        "bake invocations at once."
+    ),
+)
+@click.option(
+    "--job-memory",
+    type=click.FloatRange(min=0),
+    default=DEFAULT_JOB_MEMORY_GB,
+    show_default=True,
+    help="GiB of available memory per concurrent build with --jobs (0: no cap).",
+)
+@click.option(
+    "--cache",
+    default=None,
+    metavar="local:DIR|registry:REF|none",
+    callback=_validate_cache,
+    help=(
+        "Import/export the build cache per target and platform "
+        "(default: $DOCKER_CACHE or none)."
+    ),
+)
+@click.option(
+    "--skip-unchanged",
+    is_flag=True,
+    default=False,
+    help="Skip targets whose inputs match their last successful build.",
+)
+@click.option(
+    "--prune",
+    default=None,
+    metavar="none|dangling|buildcache-keep=SIZE|age=DURATION",
+    callback=_validate_prune,
+    help=(
+        "What to prune after the build (default: $DOCKER_PRUNE or dangling, "
+        "this project's superseded images)."
+    ),
 )
 @click.argument("selector", shell_complete=_bake_selector_completion)
 def main(
     push: bool,
-    clean: bool,
+    clean: bool | None,
+    as_of,
+    jobs: int | None,
+    job_memory: float,
+    cache: str | None,
+    skip_unchanged: bool,
+    prune: str | None,
     selector: str,
 ) -> None:
     """CLI entry point dispatching generate + build routines."""
@@ -236,7 +739,17 @@ def main(
     handler.setLevel(logging.DEBUG)
     log.addHandler(handler)
 
-    build(selector, push, clean)
+    build(
+        selector,
+        push,
+        clean,
+        as_of=as_of.date() if as_of else None,
+        jobs=jobs,
+        job_memory=job_memory,
+        cache=cache,
+        skip_unchanged=skip_unchanged,
+        prune=prune,
+    )
 
 
 if __name__ == "__main__":
@@ -1,9 +1,12 @@
-"""Shared templates.yml interface for generation and workflows."""
+"""Shared templates.yml interface for generation and workflows.
 
-from .api import (
-    Templates,
+Platform helpers are imported eagerly; the catalog API (and with it YAML and
+JSON schema support) is loaded on first attribute access.
+"""
+
+from .platforms import (
+    Platform,
     canonical_platform,
-    eol_is_past,
     filter_targets_by_platform,
     parse_platform,
     platforms_support,
@@ -12,11 +15,44 @@ from .api import (
 __version__ = "0.1.0"
 
 __all__ = [
+    "BuildMatrix",
+    "Entry",
+    "MatrixRow",
+    "Platform",
+    "Target",
     "Templates",
     "canonical_platform",
+    "default_as_of",
     "eol_is_past",
     "filter_targets_by_platform",
     "parse_platform",
     "platforms_support",
     "__version__",
 ]
+
+_LAZY_ATTRIBUTES = {
+    "BuildMatrix": ".matrix",
+    "MatrixRow": ".matrix",
+    "Entry": ".model",
+    "Target": ".model",
+    "Templates": ".api",
+    "default_as_of": ".api",
+    "eol_is_past": ".api",
+}
+
+
+def __getattr__(name: str):
+    """Import catalog API attributes on first access."""
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    """List module attributes including lazily loaded ones."""
+    return sorted(set(globals()) | set(__all__))
@@ -3,74 +3,125 @@
 from __future__ import annotations
 
 import json
+import os
+import time
+from collections.abc import Mapping
 from datetime import date
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
+
+from .cache import CatalogCache, cache_disabled, content_key
+from .matrix import BuildMatrix, MatrixRow
+from .model import Entry, Target
+from .platforms import (  # noqa: F401 - re-exported for compatibility
+    Platform,
+    canonical_platform,
+    filter_targets_by_platform,
+    parse_platform,
+    platforms_support,
+    registry,
+)
+from .yaml_io import dump_yaml, load_yaml, safe_loader_name
+
+GROUP_KEYS = ("family", "name", "distro", "base_image")
+AS_OF_ENV = "DOCKERFILES_TEMPLATES_AS_OF"
+VALIDATION_MODES = ("full", "first", "trusted")
+FRAGMENT_SUFFIXES = (".yml", ".yaml")
+
+# Content digests that passed validation in this process (trusted mode).
+_validated_digests: set[str] = set()
+
+
+def _bit_positions(bits: int) -> tuple[int, ...]:
+    """Return the positions of set bits in ascending order."""
+    digits = bin(bits)[:1:-1]
+    positions = []
+    position = digits.find("1")
+    while position != -1:
+        positions.append(position)
+        position = digits.find("1", position + 1)
+    return tuple(positions)
+
+
+def fragment_paths(directory: str | Path) -> list[Path]:
+    """Return catalog fragment files under ``directory`` in merge order.
+
+    Fragments are ``*.yml``/``*.yaml`` files at any depth, ordered by their
+    relative POSIX path so the merged catalog order is stable. Hidden files
+    and directories and editor lock files (``.#name.yml``, ``#name.yml``)
+    are not fragments.
+    """
+    root = Path(directory)
+    return sorted(
+        (
+            path
+            for path in root.rglob("*")
+            if path.suffix in FRAGMENT_SUFFIXES
+            and not any(
+                part.startswith((".", "#"))
+                for part in path.relative_to(root).parts
+            )
+            and path.is_file()
+        ),
+        key=lambda path: path.relative_to(root).as_posix(),
+    )
 
-import ruamel.yaml
-from jsonschema import Draft202012Validator, FormatChecker
 
+def _catalog_key(content: bytes, schema: bytes) -> str:
+    """Return the cache key of a catalog file validated against ``schema``.
 
-yaml = ruamel.yaml.YAML()
-yaml.preserve_quotes = True
+    The YAML loader is part of the key: PyYAML (YAML 1.1) and ruamel (YAML
+    1.2) can read the same document differently, e.g. ``on`` or ``yes``.
+    """
+    return content_key(safe_loader_name().encode(), content, schema)
 
 
-def parse_platform(raw: str) -> tuple[str, str, str | None]:
-    """Parse Docker platform text into (os, arch, variant)."""
-    raw = (raw or "").strip().lower().replace("-", "/")
-    parts = [p for p in raw.split("/") if p]
-    if len(parts) == 1:
-        return "linux", parts[0], None
-    if len(parts) == 2:
-        return parts[0], parts[1], None
-    return parts[0], parts[1], "/".join(parts[2:])
+@lru_cache(maxsize=8)
+def _compiled_validator(schema_path: str, mtime_ns: int):
+    """Build a schema validator; cached per schema path and mtime."""
+    del mtime_ns  # Only part of the cache key.
+    from jsonschema import Draft202012Validator, FormatChecker
 
+    with open(schema_path, "r", encoding="utf-8") as file:
+        schema = json.load(file)
+    return Draft202012Validator(schema, format_checker=FormatChecker())
 
-def canonical_platform(raw: str) -> str:
-    """Normalize a platform string to os/arch[/variant]."""
-    os_name, arch, variant = parse_platform(raw)
-    return f"{os_name}/{arch}" + (f"/{variant}" if variant else "")
 
+def compiled_validator(schema_path: str | Path):
+    """Return the process-wide compiled validator for a schema file."""
+    path = Path(schema_path).resolve()
+    return _compiled_validator(str(path), path.stat().st_mtime_ns)
 
-def platforms_support(platforms: list[str] | str, want: str) -> bool:
-    """Return True when any allowed platform matches ``want``."""
-    want_os, want_arch, want_var = parse_platform(want)
-    entries = (
-        platforms if isinstance(platforms, list) else str(platforms).split(",")
-    )
-    for raw in entries:
-        p_os, p_arch, p_var = parse_platform(str(raw).strip())
-        if (p_os, p_arch) != (want_os, want_arch):
-            continue
-        if p_var is None:
-            return True
-        if want_var == p_var:
-            return True
-    return False
-
-
-def filter_targets_by_platform(
-    targets: list[dict], platform: str | None = None
-) -> list[dict]:
-    """Filter target definitions by platform support."""
-    if not platform:
-        return list(targets or [])
-    want = canonical_platform(platform)
-    output = []
-    for target in targets or []:
-        if platforms_support(target.get("platforms", []), want):
-            output.append(target)
-    return output
-
-
-def eol_is_past(value) -> bool:
-    """Return True if EOL date is today or in the past."""
+
+def default_as_of() -> date:
+    """Return the snapshot date for EOL decisions.
+
+    ``DOCKERFILES_TEMPLATES_AS_OF`` (ISO date) lets several tools in one run
+    share a snapshot; otherwise today's date is used.
+    """
+    value = os.getenv(AS_OF_ENV, "").strip()
+    return date.fromisoformat(value) if value else date.today()
+
+
+def _as_date(value: date | str | None) -> date:
+    """Coerce an ``as_of`` argument to a date."""
+    if value in (None, ""):
+        return default_as_of()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+
+def eol_is_past(value, as_of: date | str | None = None) -> bool:
+    """Return True if EOL date is on or before ``as_of`` (default today)."""
     if value in (None, "", False):
         return False
     if isinstance(value, bool):
         return value
-    if isinstance(value, date):
-        return value <= date.today()
-    return date.fromisoformat(str(value)) <= date.today()
+    if not isinstance(value, date):
+        value = date.fromisoformat(str(value))
+    return value <= _as_date(as_of)
 
 
 class Templates:
@@ -81,13 +132,44 @@ class Templates:
         templates_path: str | Path = "templates.yml",
         schema_path: str | Path | None = None,
         settings: dict | None = None,
+        cache: bool | None = None,
+        cache_dir: str | Path | None = None,
+        round_trip: bool = False,
+        validation: str = "first",
+        as_of: date | str | None = None,
+        read_only_cache: bool = False,
     ) -> None:
         """Load templates.yml and validate it against the schema.
 
+        Validated catalogs are cached on disk keyed by the content of the
+        templates and schema files, so repeat loads skip YAML parsing and
+        schema validation.
+
+        ``templates_path`` may also be a directory (e.g. ``templates.d/``)
+        of catalog fragments, each a schema-valid document with its own
+        ``dockerfiles`` list. Fragments are parsed, validated and cached
+        independently, then merged in path order, so editing one fragment
+        only reparses that file.
+
         Args:
-            templates_path: Path to templates configuration YAML.
+            templates_path: Path to templates configuration YAML, or a
+                directory of catalog fragments.
             schema_path: Optional override path to JSON schema file.
             settings: Optional pre-loaded templates settings dictionary.
+            cache: Use the on-disk catalog cache. Defaults to enabled unless
+                ``DOCKERFILES_TEMPLATES_NO_CACHE`` is set.
+            cache_dir: Optional override for the cache directory.
+            round_trip: Load with ruamel's round-trip loader so the catalog
+                can be written back with ``save()``. Bypasses the cache;
+                read-only callers should leave this off.
+            validation: ``"first"`` stops at the first schema error,
+                ``"full"`` collects every error and reports the first by
+                document path, and ``"trusted"`` skips validation for
+                content whose digest already validated in this process.
+            as_of: Date EOL states are evaluated against, once, at load
+                time. Defaults to ``default_as_of()``.
+            read_only_cache: Use the catalog cache for lookups only, never
+                storing entries or load records.
         """
         self._templates_path = Path(templates_path)
         self._schema_path = (
@@ -97,49 +179,233 @@ class Templates:
             / "schema"
             / "templates.schema.json"
         )
+        if validation not in VALIDATION_MODES:
+            raise ValueError(
+                f"Unsupported validation mode '{validation}'. "
+                f"Expected one of: {', '.join(VALIDATION_MODES)}"
+            )
+        self._validation = validation
+        self.as_of = _as_date(as_of)
+        self._round_trip = round_trip
+        if cache is None:
+            cache = not cache_disabled()
+        if round_trip:
+            cache = False
+        self._fragments: Mapping[str, str] = MappingProxyType({})
+        self._fragment_names: tuple[str, ...] = ()
+        self._changed_fragments: tuple[str, ...] | None = None
+        self._state_cache: CatalogCache | None = None
+        self._load_stats = {
+            "cache_hits": 0,
+            "cache_misses": 0,
+            "parse_seconds": 0.0,
+            "validation_seconds": 0.0,
+        }
         if settings is None:
-            with self._templates_path.open("r", encoding="utf-8") as file:
-                self._settings = yaml.load(file) or {}
+            self._load(
+                CatalogCache(cache_dir, read_only=read_only_cache)
+                if cache
+                else None
+            )
         else:
             self._settings = settings or {}
-        self.validate_settings()
-        self._entries = self._settings["dockerfiles"]
+            self.validate_settings()
+        self._entries = tuple(
+            Entry(entry) for entry in self._settings["dockerfiles"]
+        )
         self.validate_uniqueness()
         self._entry_by_key = {
             (entry["family"], entry["name"]): entry for entry in self._entries
         }
+        self._build_indexes()
 
     @classmethod
     def from_dict(
         cls,
         settings: dict,
         schema_path: str | Path | None = None,
+        validation: str = "first",
+        as_of: date | str | None = None,
     ) -> "Templates":
         """Build a Templates instance from an in-memory settings dictionary."""
         return cls(
             templates_path="<in-memory>",
             schema_path=schema_path,
             settings=settings,
+            validation=validation,
+            as_of=as_of,
         )
 
-    def validate_settings(self) -> None:
-        """Validate settings against JSON schema."""
-        with self._schema_path.open("r", encoding="utf-8") as file:
-            schema = json.load(file)
+    def _load(self, cache: CatalogCache | None) -> None:
+        """Load and validate templates.yml, consulting the cache if given."""
+        if self._templates_path.is_dir():
+            if self._round_trip:
+                raise ValueError(
+                    "Round-trip loading requires a single templates file, "
+                    f"not the directory {self._templates_path}"
+                )
+            self._load_fragments(cache)
+            return
+        content = self._templates_path.read_bytes()
+        key = _catalog_key(content, self._schema_path.read_bytes())
+        settings = cache.load(key) if cache is not None else None
+        if cache is not None:
+            hit = "cache_hits" if settings is not None else "cache_misses"
+            self._load_stats[hit] += 1
+        if settings is None:
+            self._settings = self._parse(content, round_trip=self._round_trip)
+            self.validate_settings(digest=key)
+            if cache is not None:
+                cache.store(key, self._settings)
+        else:
+            self._settings = settings
+        self._record_fragments({self._templates_path.name: key}, cache)
+
+    def _load_fragments(self, cache: CatalogCache | None) -> None:
+        """Load, validate and merge a directory of catalog fragments."""
+        schema = self._schema_path.read_bytes()
+        fragments = {}
+        merged = []
+        owners = []
+        for path in fragment_paths(self._templates_path):
+            name = path.relative_to(self._templates_path).as_posix()
+            content = path.read_bytes()
+            key = _catalog_key(content, schema)
+            settings = cache.load(key) if cache is not None else None
+            if cache is not None:
+                hit = "cache_hits" if settings is not None else "cache_misses"
+                self._load_stats[hit] += 1
+            if settings is None:
+                settings = self._parse(content)
+                self._validate(settings, digest=key, source=name)
+                if cache is not None:
+                    cache.store(key, settings)
+            fragments[name] = key
+            items = settings.get("dockerfiles", [])
+            merged.extend(items)
+            owners.extend([name] * len(items))
+        self._settings = {"dockerfiles": merged}
+        self._fragment_names = tuple(owners)
+        self._record_fragments(fragments, cache)
+
+    def _parse(self, content: bytes, round_trip: bool = False) -> dict:
+        """Parse one YAML document, timing it for ``load_stats()``."""
+        start = time.perf_counter()
+        try:
+            return load_yaml(content, round_trip=round_trip) or {}
+        finally:
+            self._load_stats["parse_seconds"] += time.perf_counter() - start
+
+    def load_stats(self) -> Mapping[str, float]:
+        """Return how this catalog was loaded.
+
+        ``cache_hits``/``cache_misses`` count catalog cache lookups (one
+        per file or fragment); ``parse_seconds`` and
+        ``validation_seconds`` are the time spent parsing YAML and
+        validating against the schema.
+        """
+        return MappingProxyType(dict(self._load_stats))
 
-        validator = Draft202012Validator(schema, format_checker=FormatChecker())
-        errors = sorted(
-            validator.iter_errors(self._settings),
-            key=lambda item: list(item.absolute_path),
+    def _record_fragments(
+        self, fragments: dict[str, str], cache: CatalogCache | None
+    ) -> None:
+        """Remember fragment keys for ``changed_fragments()``."""
+        self._fragments = MappingProxyType(fragments)
+        self._state_cache = cache
+
+    def _diff_fragments(self) -> tuple[str, ...]:
+        """Diff fragment keys against the recorded load and record this one."""
+        cache = self._state_cache
+        fragments = dict(self._fragments)
+        state_key = content_key(str(self._templates_path.resolve()).encode())
+        previous = (cache.load(state_key, "state") if cache else None) or {}
+        if cache is not None and previous != fragments:
+            cache.store(state_key, fragments, "state")
+        return tuple(
+            sorted(
+                name
+                for name in fragments.keys() | previous.keys()
+                if fragments.get(name) != previous.get(name)
+            )
+        )
+
+    def save(self, path: str | Path | None = None) -> None:
+        """Write the catalog back to YAML, preserving comments and quoting.
+
+        Args:
+            path: Destination; defaults to the loaded templates path.
+        """
+        if not self._round_trip:
+            raise ValueError(
+                "Templates must be loaded with round_trip=True to be saved"
+            )
+        dump_yaml(self._settings, path or self._templates_path)
+
+    def _settings_digest(self) -> str:
+        """Return a digest of the in-memory settings and schema file."""
+        schema = self._schema_path.resolve()
+        return content_key(
+            json.dumps(self._settings, sort_keys=True, default=str).encode(),
+            f"{schema}:{schema.stat().st_mtime_ns}".encode(),
         )
-        if errors:
-            first_error = errors[0]
+
+    def validate_settings(
+        self, mode: str | None = None, digest: str | None = None
+    ) -> None:
+        """Validate settings against JSON schema.
+
+        Args:
+            mode: Validation mode; defaults to the instance's mode.
+            digest: Content digest used by trusted mode; computed from the
+                in-memory settings when omitted.
+        """
+        self._validate(self._settings, mode=mode, digest=digest)
+
+    def _validate(
+        self,
+        settings: dict,
+        mode: str | None = None,
+        digest: str | None = None,
+        source: str = "templates.yml",
+    ) -> None:
+        """Validate one settings document; ``source`` names it in errors."""
+        start = time.perf_counter()
+        try:
+            self._check_schema(settings, mode, digest, source)
+        finally:
+            self._load_stats["validation_seconds"] += (
+                time.perf_counter() - start
+            )
+
+    def _check_schema(
+        self,
+        settings: dict,
+        mode: str | None,
+        digest: str | None,
+        source: str,
+    ) -> None:
+        mode = mode or self._validation
+        if mode == "trusted":
+            digest = digest or self._settings_digest()
+            if digest in _validated_digests:
+                return
+
+        validator = compiled_validator(self._schema_path)
+        errors = validator.iter_errors(settings)
+        if mode == "full":
+            errors = sorted(errors, key=lambda item: list(item.absolute_path))
+            first_error = errors[0] if errors else None
+        else:
+            first_error = next(errors, None)
+        if first_error is not None:
             path = ".".join(str(p) for p in first_error.absolute_path)
             path = path if path else "<root>"
             raise ValueError(
-                f"templates.yml failed schema validation at "
+                f"{source} failed schema validation at "
                 f"'{path}': {first_error.message}"
             )
+        if mode == "trusted":
+            _validated_digests.add(digest)
 
     def validate_uniqueness(self) -> None:
         """Validate uniqueness of (family, name)."""
@@ -150,9 +416,119 @@ class Templates:
                 raise ValueError(
                     "templates.yml has duplicate dockerfile entry "
                     f"for family={item['family']} name={item['name']}"
+                    + self._fragment_hint(key)
                 )
             seen.add(key)
 
+    def _fragment_hint(self, key: tuple[str, str]) -> str:
+        """Name the fragments declaring ``key``, for error messages."""
+        names = [
+            name
+            for name, item in zip(self._fragment_names, self._entries)
+            if (item["family"], item["name"]) == key
+        ]
+        return f" (in {', '.join(names)})" if names else ""
+
+    def _build_indexes(self) -> None:
+        """Build immutable lookup indexes over the loaded entries.
+
+        Group keys map to entry positions (in catalog order). Family, EOL
+        state and platform support are stored as entry bitsets (bit ``i``
+        is entry ``i``), so a filtered query is a few bitwise ANDs instead
+        of rescanning and re-parsing every entry.
+        """
+        by_key: dict[str, dict] = {key: {} for key in GROUP_KEYS}
+        by_platform: dict[int, int] = {}
+        eol_bits = 0
+        self._position_by_key = {}
+        for position, entry in enumerate(self._entries):
+            bit = 1 << position
+            self._position_by_key[(entry.family, entry.name)] = position
+            for key, index in by_key.items():
+                index.setdefault(entry.get(key), []).append(position)
+            if self._compute_past_eol(entry):
+                eol_bits |= bit
+            entry_mask = 0
+            for target in entry.targets:
+                entry_mask |= target.mask
+            while entry_mask:
+                platform_bit = entry_mask & -entry_mask
+                by_platform[platform_bit] = (
+                    by_platform.get(platform_bit, 0) | bit
+                )
+                entry_mask ^= platform_bit
+
+        self._index = MappingProxyType(
+            {
+                key: MappingProxyType(
+                    {value: tuple(items) for value, items in index.items()}
+                )
+                for key, index in by_key.items()
+            }
+        )
+        self._family_bits = MappingProxyType(
+            {
+                family: sum(1 << position for position in positions)
+                for family, positions in self._index["family"].items()
+            }
+        )
+        self._platform_bits = MappingProxyType(by_platform)
+        self._all_bits = (1 << len(self._entries)) - 1
+        self._eol_bits = eol_bits
+        self._active_bits = self._all_bits & ~eol_bits
+        self._tokens = tuple(entry.token for entry in self._entries)
+        self._active = tuple(
+            self._entries[p] for p in _bit_positions(self._active_bits)
+        )
+        self._eol = tuple(
+            self._entries[p] for p in _bit_positions(self._eol_bits)
+        )
+        self._query_cache: dict[tuple, tuple[int, ...]] = {}
+        self._platform_targets: dict[tuple[int, str], list[Target]] = {}
+        self._matrix = None
+        self._matrix_cache: dict[tuple, BuildMatrix] = {}
+
+    def _position(self, entry: Mapping) -> int | None:
+        """Return the index position of an entry owned by this catalog."""
+        position = self._position_by_key.get(
+            (entry.get("family"), entry.get("name"))
+        )
+        if position is None or self._entries[position] is not entry:
+            return None
+        return position
+
+    def _platform_entry_bits(self, want: str) -> int:
+        """Return the bitset of entries with a target supporting ``want``."""
+        query = registry.query_mask(want)
+        bits = 0
+        while query:
+            platform_bit = query & -query
+            bits |= self._platform_bits.get(platform_bit, 0)
+            query ^= platform_bit
+        return bits
+
+    def _select(
+        self,
+        family: str = "",
+        eol: bool = False,
+        platform: str | None = None,
+    ) -> tuple[int, ...]:
+        """Return sorted entry positions matching the given filters."""
+        want = canonical_platform(platform) if platform else ""
+        key = (family, eol, want)
+        positions = self._query_cache.get(key)
+        if positions is not None:
+            return positions
+
+        selected = self._all_bits if eol else self._active_bits
+        if family:
+            selected &= self._family_bits.get(family, 0)
+        if want:
+            selected &= self._platform_entry_bits(want)
+        positions = _bit_positions(selected)
+        self._query_cache[key] = positions
+        return positions
+
     @staticmethod
     def eol_date(entry: dict) -> date | None:
         """Return parsed EOL date for an entry, if present."""
@@ -163,51 +539,113 @@ class Templates:
             return value
         return date.fromisoformat(str(value))
 
-    def is_past_eol(self, entry: dict) -> bool:
-        """Return True if entry's EOL date is today or in the past."""
+    def _compute_past_eol(self, entry: Mapping) -> bool:
+        """Compute whether an entry's EOL date is on or before ``as_of``."""
         end_of_life = self.eol_date(entry)
         if not end_of_life:
             return False
-        return end_of_life <= date.today()
+        return end_of_life <= self.as_of
+
+    def is_past_eol(self, entry: Mapping) -> bool:
+        """Return True if entry's EOL date is on or before ``as_of``."""
+        position = self._position(entry)
+        if position is None:
+            return self._compute_past_eol(entry)
+        return bool(self._eol_bits >> position & 1)
+
+    def active(self) -> tuple[Entry, ...]:
+        """Get entries that are not past EOL as of the snapshot date."""
+        return self._active
+
+    def eol(self) -> tuple[Entry, ...]:
+        """Get entries that are past EOL as of the snapshot date."""
+        return self._eol
 
     def raw(self) -> list:
-        """Get raw template entries."""
-        return self._entries
+        """Get raw template entries as loaded from templates.yml."""
+        return self._settings["dockerfiles"]
+
+    def fragments(self) -> Mapping[str, str]:
+        """Get the loaded catalog files mapped to their content keys.
+
+        A directory catalog lists each fragment by its relative path; a
+        single file is one fragment named after the file.
+        """
+        return self._fragments
+
+    def fragment_of(self, entry: Mapping) -> str | None:
+        """Get the fragment that declared ``entry``, for directory catalogs."""
+        position = self._position(entry)
+        if position is None or not self._fragment_names:
+            return None
+        return self._fragment_names[position]
+
+    def changed_fragments(self) -> tuple[str, ...]:
+        """Get fragments added, edited or removed since the last cached load.
+
+        The first call compares this load with the one recorded in the
+        cache and records it in turn, so only loads that ask are recorded.
+        Every fragment counts as changed on the first load or when the
+        cache is disabled.
+        """
+        if self._changed_fragments is None:
+            self._changed_fragments = self._diff_fragments()
+        return self._changed_fragments
+
+    def changed_entries(self) -> frozenset[tuple[str, str]]:
+        """Get ``(family, name)`` keys declared by changed fragments.
+
+        The result can be passed as ``matrix(changed=...)``. Entries of
+        removed fragments are gone from the catalog and are not included.
+        """
+        changed = set(self.changed_fragments())
+        if not self._fragment_names:
+            if changed & self._fragments.keys():
+                return frozenset(self._position_by_key)
+            return frozenset()
+        return frozenset(
+            (entry.family, entry.name)
+            for name, entry in zip(self._fragment_names, self._entries)
+            if name in changed
+        )
 
     def entries(
         self,
         family: str = "",
         eol: bool = False,
         platform: str | None = None,
-    ) -> list:
+    ) -> list[Entry]:
         """Get filtered entries."""
-        output = []
-        for entry in self._entries:
-            if family and entry["family"] != family:
-                continue
-            if not eol and self.is_past_eol(entry):
-                continue
-            if platform and not self.targets_for_platform(entry, platform):
-                continue
-            output.append(entry)
-        return output
+        positions = self._select(family=family, eol=eol, platform=platform)
+        return [self._entries[position] for position in positions]
 
     def get_entry(
         self, family: str, name: str, eol: bool = False
-    ) -> dict | None:
+    ) -> Entry | None:
         """Get one entry by (family, name), honoring EOL filter rules."""
-        entry = self._entry_by_key.get((family, name))
-        if entry is None:
+        position = self._position_by_key.get((family, name))
+        if position is None:
             return None
-        if not eol and self.is_past_eol(entry):
+        if not eol and self._eol_bits >> position & 1:
             return None
-        return entry
+        return self._entries[position]
 
     def targets_for_platform(
-        self, entry: dict, platform: str | None = None
-    ) -> list[dict]:
+        self, entry: Mapping, platform: str | None = None
+    ) -> list[Mapping]:
         """Get entry targets filtered by platform support."""
-        return filter_targets_by_platform(entry.get("targets") or [], platform)
+        position = self._position(entry) if platform else None
+        if position is None:
+            return filter_targets_by_platform(
+                entry.get("targets") or [], platform
+            )
+        want = Platform.parse(platform)
+        key = (position, want.canonical)
+        targets = self._platform_targets.get(key)
+        if targets is None:
+            targets = [t for t in entry.targets if t.supports(want)]
+            self._platform_targets[key] = targets
+        return list(targets)
 
     def group_by(
         self,
@@ -216,23 +654,34 @@ class Templates:
         platform: str | None = None,
     ) -> dict:
         """Get entries grouped by a supported key."""
-        valid_keys = {"family", "name", "distro", "base_image"}
-        if key not in valid_keys:
+        if key not in GROUP_KEYS:
             raise ValueError(
                 f"Unsupported group_by key '{key}'. "
-                f"Expected one of: {', '.join(sorted(valid_keys))}"
+                f"Expected one of: {', '.join(sorted(GROUP_KEYS))}"
             )
-        output = {}
-        for entry in self.entries(eol=eol, platform=platform):
-            value = entry.get(key)
-            output.setdefault(value, [])
-            output[value].append(entry)
-        return output
+        selected = self._select(eol=eol, platform=platform)
+        allowed = None if len(selected) == len(self._entries) else set(selected)
+        groups = []
+        for value, positions in self._index[key].items():
+            members = (
+                positions
+                if allowed is None
+                else [p for p in positions if p in allowed]
+            )
+            if members:
+                groups.append((members[0], value, members))
+        # Keep groups in order of their first matching entry.
+        groups.sort(key=lambda item: item[0])
+        return {
+            value: [self._entries[position] for position in members]
+            for _, value, members in groups
+        }
 
     def images(self, eol: bool = False) -> dict:
         """Get nested dict of images and targets as [family][name]."""
         image_list = {}
-        for dockerfile in self.entries(eol=eol):
+        for position in self._select(eol=eol):
+            dockerfile = self._entries[position]
             family = dockerfile["family"]
             name = dockerfile["name"]
             targets = [target["target"] for target in dockerfile["targets"]]
@@ -246,10 +695,90 @@ class Templates:
 
     def image_tokens(self, eol: bool = False) -> list[str]:
         """Get CLI image tokens as ``family-name``."""
-        output = []
-        for dockerfile in self.entries(eol=eol):
-            output.append(f"{dockerfile['family']}-{dockerfile['name']}")
-        return output
+        return [self._tokens[position] for position in self._select(eol=eol)]
+
+    def _build_matrix(self) -> tuple[BuildMatrix, tuple, tuple]:
+        """Materialize every (entry, stage, platform) row in one pass.
+
+        Returns the full matrix plus, per row, the owning entry position and
+        the platform bit used for platform filtering.
+        """
+        rows = []
+        positions = []
+        bits = []
+        for position, entry in enumerate(self._entries):
+            release = entry.token
+            past_eol = bool(self._eol_bits >> position & 1)
+            for target in entry.targets:
+                stage = target.target
+                target_name = f"{release}-{stage}"
+                tags = (f"{entry.family}:{entry.name}-{stage}",)
+                for platform in target.parsed_platforms:
+                    platform_group = platform.parent.replace("/", "-")
+                    rows.append(
+                        MatrixRow(
+                            family=entry.family,
+                            name=entry.name,
+                            distro=entry.distro,
+                            stage=stage,
+                            platform=platform.canonical,
+                            platform_key=platform.key,
+                            platform_group=platform_group,
+                            release=release,
+                            target=target_name,
+                            group=f"{release}-{platform_group}",
+                            tags=tags,
+                            platforms=target.platforms,
+                            eol=past_eol,
+                        )
+                    )
+                    positions.append(position)
+                    bits.append(1 << registry.id(platform))
+        return BuildMatrix.from_rows(rows), tuple(positions), tuple(bits)
+
+    def matrix(
+        self,
+        family: str = "",
+        platform: str | None = None,
+        eol: bool = False,
+        changed=None,
+    ) -> BuildMatrix:
+        """Get the build matrix of (entry, stage, platform) rows.
+
+        The full matrix is materialized once per catalog; filtered views
+        are cached per filter combination.
+
+        Args:
+            family: Only rows of this family.
+            platform: Only rows whose declared platform supports this one.
+            eol: Include entries past EOL.
+            changed: Optional iterable of ``(family, name)`` pairs; only
+                rows of those entries are kept.
+        """
+        want = canonical_platform(platform) if platform else ""
+        changed = None if changed is None else frozenset(changed)
+        key = (family, eol, want, changed)
+        cached = self._matrix_cache.get(key)
+        if cached is not None:
+            return cached
+
+        if self._matrix is None:
+            self._matrix = self._build_matrix()
+        full, positions, bits = self._matrix
+        selected = set(self._select(family=family, eol=eol, platform=want))
+        query = registry.query_mask(want) if want else 0
+        families = full.column("family")
+        names = full.column("name")
+        indexes = [
+            index
+            for index, position in enumerate(positions)
+            if position in selected
+            and (not query or bits[index] & query)
+            and (changed is None or (families[index], names[index]) in changed)
+        ]
+        result = full if len(indexes) == len(full) else full.select(indexes)
+        self._matrix_cache[key] = result
+        return result
 
     def image_definition(self, token: str, eol: bool = False) -> dict:
         """Resolve a ``family-name`` token to image definition."""
@@ -259,7 +788,11 @@ class Templates:
                 f"Invalid image token '{token}', expected family-name"
             )
 
-        image_map = self.images(eol=eol)
-        if family not in image_map or name not in image_map[family]:
+        entry = self.get_entry(family, name, eol=eol)
+        if entry is None:
             raise KeyError(f"Unknown image token '{token}'")
-        return image_map[family][name]
+        return {
+            "repository": family,
+            "name": name,
+            "targets": [target["target"] for target in entry["targets"]],
+        }
@@ -0,0 +1,356 @@
+"""Docker Bake model built from the catalog, emitted as HCL and JSON.
+
+JSON is split for bake speed: ``docker-bake.json`` is a small root with
+the ``REGISTRY`` variable and the ``default`` group, and each family's
+targets and groups live in ``bake/<family>.json``. A selector only needs
+the root plus the files of the families it names (see ``bake_files``).
+
+Build cache settings are not part of the generated files: where a build
+caches is a per-run choice, so ``cache_attributes`` returns the
+``cache-from``/``cache-to`` values that ``build.py`` passes with ``--set``.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import NamedTuple
+
+BAKE_HCL = "docker-bake.hcl"
+BAKE_JSON = "docker-bake.json"
+BAKE_DIR = "bake"
+DEFAULT_REGISTRY = "althack"
+CACHE_BACKENDS = ("local", "registry", "none")
+
+
+class BakeTarget(NamedTuple):
+    """One bake target: a Dockerfile stage of a catalog entry."""
+
+    name: str
+    context: str
+    dockerfile: str
+    target: str
+    tags: tuple[str, ...]
+
+
+class BakeRelease(NamedTuple):
+    """Targets and parent-platform groups of one catalog entry."""
+
+    family: str
+    group: str
+    targets: tuple[BakeTarget, ...]
+    platform_groups: tuple[tuple[str, tuple[str, ...]], ...]
+
+
+class BakeModel:
+    """Targets and groups of docker-bake, computed in one catalog pass.
+
+    Releases (one per entry) are ordered by family, in order of each
+    family's first appearance in the catalog, then by catalog order; the
+    ``default`` group lists the targets of entries that are not past EOL.
+    """
+
+    __slots__ = ("registry", "releases", "families", "default")
+
+    def __init__(
+        self,
+        releases: tuple[BakeRelease, ...],
+        families: tuple[tuple[str, tuple[str, ...]], ...],
+        default: tuple[str, ...],
+        registry: str = DEFAULT_REGISTRY,
+    ) -> None:
+        """Initialize a model from precomputed releases and groups."""
+        self.registry = registry
+        self.releases = releases
+        self.families = families
+        self.default = default
+
+    @classmethod
+    def from_templates(
+        cls, templates, registry: str = DEFAULT_REGISTRY
+    ) -> "BakeModel":
+        """Build the model from a ``Templates`` catalog, EOL entries included.
+
+        Parent-platform groups collect, per ``os/arch``, every target with
+        a platform of that parent (any variant), in target order.
+        """
+        releases: dict[str, list[BakeRelease]] = {}
+        active: dict[str, list[str]] = {}
+        for entry in templates.entries(eol=True):
+            family = entry.family
+            name = entry.name
+            targets = []
+            parents: dict[str, list[str]] = {}
+            for target in entry.targets:
+                stage = target.target
+                target_name = f"{family}-{name}-{stage}"
+                targets.append(
+                    BakeTarget(
+                        name=target_name,
+                        context=family,
+                        dockerfile=f"{name}.Dockerfile",
+                        target=stage,
+                        tags=(f"${{REGISTRY}}/{family}:{name}-{stage}",),
+                    )
+                )
+                for platform in target.parsed_platforms:
+                    members = parents.setdefault(
+                        platform.parent.replace("/", "-"), []
+                    )
+                    if target_name not in members:
+                        members.append(target_name)
+            release = entry.token
+            releases.setdefault(family, []).append(
+                BakeRelease(
+                    family=family,
+                    group=release,
+                    targets=tuple(targets),
+                    platform_groups=tuple(
+                        (f"{release}-{parent}", tuple(members))
+                        for parent, members in parents.items()
+                    ),
+                )
+            )
+            if not templates.is_past_eol(entry):
+                active.setdefault(family, []).extend(
+                    target.name for target in targets
+                )
+
+        return cls(
+            releases=tuple(
+                release
+                for family_releases in releases.values()
+                for release in family_releases
+            ),
+            families=tuple(
+                (
+                    family,
+                    tuple(
+                        target.name
+                        for release in family_releases
+                        for target in release.targets
+                    ),
+                )
+                for family, family_releases in releases.items()
+            ),
+            default=tuple(
+                name for targets in active.values() for name in targets
+            ),
+            registry=registry,
+        )
+
+    def targets(self, family: str | None = None) -> dict[str, BakeTarget]:
+        """Return targets by name in emission order, optionally of a family."""
+        return {
+            target.name: target
+            for release in self._releases(family)
+            for target in release.targets
+        }
+
+    def groups(self, family: str | None = None) -> dict[str, tuple[str, ...]]:
+        """Return groups by name in emission order.
+
+        With ``family``, only that family's release, parent-platform and
+        family groups are returned; otherwise ``default`` is included too.
+        """
+        releases = self._releases(family)
+        groups = {}
+        for release in releases:
+            groups[release.group] = tuple(t.name for t in release.targets)
+        for release in releases:
+            groups.update(release.platform_groups)
+        for name, members in self.families:
+            if family is None or name == family:
+                groups[name] = members
+        if family is None:
+            groups["default"] = self.default
+        return groups
+
+    def _releases(self, family: str | None) -> tuple[BakeRelease, ...]:
+        if family is None:
+            return self.releases
+        return tuple(r for r in self.releases if r.family == family)
+
+    def to_hcl(self) -> str:
+        """Render docker-bake.hcl."""
+        quote = json.dumps
+        parts = [
+            "# Generated by generate.py from templates.yml — DO NOT EDIT BY "
+            "HAND.\n\n"
+            f'variable "REGISTRY" {{ default = {quote(self.registry)} }}\n\n'
+            " \n"
+        ]
+        for release in self.releases:
+            parts.append(
+                f"# ----------- targets for {release.group} -----------\n"
+            )
+            for target in release.targets:
+                tags = "".join(f"    {quote(tag)},\n" for tag in target.tags)
+                parts.append(
+                    f"\ntarget {quote(target.name)} {{\n"
+                    f"  context    = {quote(target.context)}\n"
+                    f"  dockerfile = {quote(target.dockerfile)}\n"
+                    f"  target     = {quote(target.target)}\n"
+                    f"  tags       = [\n{tags}  ]\n"
+                    "}\n"
+                )
+            members = ", ".join(quote(t.name) for t in release.targets)
+            parts.append(
+                f"\n# ---- group for all {release.group}  ----\n"
+                f"group {quote(release.group)} {{\n"
+                f"  targets = [{members}]\n"
+                "}\n\n"
+            )
+
+        parts.append(
+            "\n# ---------- Parent-platform groups per entry "
+            "(os/arch; variant-agnostic) ---------- #\n"
+        )
+        for release in self.releases:
+            parts.append("\n")
+            for group, members in release.platform_groups:
+                parts.append(_inline_group(group, members))
+            parts.append("\n")
+
+        parts.append(
+            "\n# ---------- Family-level groups "
+            "(e.g., ros2, gz, ignition) ----------\n\n"
+        )
+        for family, members in self.families:
+            parts.append(_inline_group(family, members))
+
+        default = ", ".join(quote(name) for name in self.default)
+        parts.append(
+            "\n# ---- all non-EOL targets ----\n"
+            'group "default" {\n'
+            "  targets = [\n"
+            f"    {default}\n"
+            "  ]\n"
+            "}"
+        )
+        return "".join(parts)
+
+    def root_json(self) -> str:
+        """Render the root docker-bake.json: variables and ``default``."""
+        return _dump(
+            {
+                "variable": {"REGISTRY": {"default": self.registry}},
+                "group": {"default": {"targets": list(self.default)}},
+            }
+        )
+
+    def family_json(self, family: str) -> str:
+        """Render ``bake/<family>.json`` with the family's targets/groups."""
+        return _dump(
+            {
+                "group": {
+                    name: {"targets": list(members)}
+                    for name, members in self.groups(family).items()
+                },
+                "target": {
+                    name: {
+                        "context": target.context,
+                        "dockerfile": target.dockerfile,
+                        "target": target.target,
+                        "tags": list(target.tags),
+                    }
+                    for name, target in self.targets(family).items()
+                },
+            }
+        )
+
+    def json_files(self) -> dict[str, str]:
+        """Return every JSON bake file by path: the root, then families."""
+        files = {BAKE_JSON: self.root_json()}
+        for family, _ in self.families:
+            files[family_bake_file(family)] = self.family_json(family)
+        return files
+
+
+def family_bake_file(family: str) -> str:
+    """Return the path of a family's JSON bake file."""
+    return f"{BAKE_DIR}/{family}.json"
+
+
+def bake_files(ref: str, families) -> list[str]:
+    """Return the JSON bake files ``docker buildx bake`` needs for ``ref``.
+
+    Targets and groups are named ``<family>-...`` (or are the family
+    itself), so they need the root and that family's file; ``default``
+    and unknown selectors need every family.
+    """
+    families = list(families)
+    family = ref.partition("-")[0]
+    if family in families:
+        families = [family]
+    return [BAKE_JSON, *(family_bake_file(name) for name in families)]
+
+
+def parse_cache(spec: str) -> tuple[str, str]:
+    """Split a cache spec into its backend and location.
+
+    Specs are ``local:<dir>``, ``registry:<ref>`` or ``none``. A registry
+    ``<ref>`` is a repository such as ``localhost:5000/cache``; each cache
+    scope becomes one of its tags, so it cannot carry a tag or digest.
+
+    Raises:
+        ValueError: The spec names an unknown backend, lacks a location,
+            or gives a registry ref with a tag or digest.
+    """
+    backend, _, location = spec.partition(":")
+    if backend == "none" and not location:
+        return backend, ""
+    if backend == "registry" and (
+        "@" in location or ":" in location.rpartition("/")[2]
+    ):
+        raise ValueError(
+            f"Invalid cache '{spec}'; registry:<ref> must name a repository "
+            "without a tag or digest (scopes are used as tags)"
+        )
+    if backend in CACHE_BACKENDS and backend != "none" and location:
+        return backend, location
+    raise ValueError(
+        f"Invalid cache '{spec}'; expected local:<dir>, registry:<ref> or none"
+    )
+
+
+def cache_scope(target: str, platform: str) -> str:
+    """Return the stable cache scope of a target built for ``platform``.
+
+    Target names already carry the family, release and stage, so
+    ``ros2-jazzy-base`` on ``linux/arm/v7`` is ``ros2-jazzy-base-linux-arm-v7``.
+    """
+    return f"{target}-{platform.replace('/', '-')}"
+
+
+def cache_attributes(spec: str, target: str, platform: str) -> dict[str, str]:
+    """Return the ``cache-from`` and ``cache-to`` of a target for ``spec``.
+
+    Each scope gets its own directory under a ``local`` cache and its own
+    tag of a ``registry`` cache repository; both export with ``mode=max``
+    so intermediate stages are cached too. ``none`` returns no attributes.
+    """
+    backend, location = parse_cache(spec)
+    scope = cache_scope(target, platform)
+    if backend == "local":
+        path = f"{location.rstrip('/')}/{scope}"
+        return {
+            "cache-from": f"type=local,src={path}",
+            "cache-to": f"type=local,dest={path},mode=max",
+        }
+    if backend == "registry":
+        ref = f"{location}:{scope}"
+        return {
+            "cache-from": f"type=registry,ref={ref}",
+            "cache-to": f"type=registry,ref={ref},mode=max",
+        }
+    return {}
+
+
+def _dump(document: dict) -> str:
+    return json.dumps(document, indent=2, ensure_ascii=False) + "\n"
+
+
+def _inline_group(name: str, members: tuple[str, ...]) -> str:
+    """Render a one-line HCL group."""
+    targets = ", ".join(json.dumps(member) for member in members)
+    return f'group "{name}" {{ targets = [ {targets} ] }}\n'
@@ -0,0 +1,214 @@
+"""On-disk caches of validated catalogs, fragments and rendered outputs."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+CACHE_DIR_ENV = "DOCKERFILES_TEMPLATES_CACHE_DIR"
+NO_CACHE_ENV = "DOCKERFILES_TEMPLATES_NO_CACHE"
+CACHE_FORMAT = "1"
+MAX_CACHE_FILES = 256
+RENDER_CACHE_SIZE_ENV = "DOCKERFILES_TEMPLATES_RENDER_CACHE_MB"
+DEFAULT_RENDER_CACHE_MB = 64
+
+
+def cache_disabled() -> bool:
+    """Return True when the cache is disabled via the environment."""
+    value = os.getenv(NO_CACHE_ENV, "")
+    return value.lower() not in {"", "0", "false", "no", "off"}
+
+
+def default_cache_dir() -> Path:
+    """Return the catalog cache directory for this user."""
+    override = os.getenv(CACHE_DIR_ENV)
+    if override:
+        return Path(override)
+    root = os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(root) / "dockerfiles-templates"
+
+
+def content_key(*parts: bytes) -> str:
+    """Return a hex digest identifying the given content parts."""
+    digest = hashlib.sha256(CACHE_FORMAT.encode())
+    for part in parts:
+        digest.update(len(part).to_bytes(8, "little"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class CatalogCache:
+    """Store validated catalog settings as compact JSON keyed by content."""
+
+    def __init__(
+        self, directory: str | Path | None = None, read_only: bool = False
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            directory: Cache directory; defaults to ``default_cache_dir()``.
+            read_only: Only look entries up; ``store()`` does nothing.
+        """
+        self.directory = Path(directory) if directory else default_cache_dir()
+        self.read_only = read_only
+
+    def _path(self, key: str, kind: str = "catalog") -> Path:
+        return self.directory / f"{kind}-{key}.json"
+
+    def load(self, key: str, kind: str = "catalog") -> dict | None:
+        """Return cached data for ``key``, or None on a miss.
+
+        Args:
+            key: Content key from ``content_key()``.
+            kind: File prefix; ``"catalog"`` for validated settings and
+                ``"state"`` for per-directory load records.
+        """
+        try:
+            with self._path(key, kind).open("r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def store(self, key: str, settings: dict, kind: str = "catalog") -> None:
+        """Persist data for ``key``; failures leave the cache untouched."""
+        if self.read_only:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            handle, tmp_name = tempfile.mkstemp(
+                dir=self.directory, suffix=".tmp"
+            )
+        except OSError:
+            return
+        try:
+            with os.fdopen(handle, "w", encoding="utf-8") as file:
+                json.dump(settings, file, separators=(",", ":"))
+            os.replace(tmp_name, self._path(key, kind))
+        except (OSError, TypeError, ValueError):
+            Path(tmp_name).unlink(missing_ok=True)
+            return
+        self._trim()
+
+    def _trim(self) -> None:
+        """Drop the oldest files beyond ``MAX_CACHE_FILES`` of each kind.
+
+        Validated catalogs and load records are capped separately, so
+        many catalog versions cannot evict the records of another path.
+        """
+        try:
+            for kind in ("catalog", "state"):
+                files = sorted(
+                    self.directory.glob(f"{kind}-*.json"),
+                    key=lambda path: path.stat().st_mtime,
+                    reverse=True,
+                )
+                for stale in files[MAX_CACHE_FILES:]:
+                    stale.unlink()
+        except OSError:
+            return
+
+
+def render_cache_limit() -> int:
+    """Return the render cache size cap in bytes."""
+    try:
+        megabytes = float(os.getenv(RENDER_CACHE_SIZE_ENV, ""))
+    except ValueError:
+        megabytes = DEFAULT_RENDER_CACHE_MB
+    return max(0, int(megabytes * 1024 * 1024))
+
+
+class RenderCache:
+    """Content-addressed store of rendered outputs.
+
+    Each entry is one file named by its key, a hash of everything the
+    output is rendered from, holding the output and the templates the
+    render loaded. Nothing in it depends on where the directory or the
+    repository live, so it can be saved and restored as a CI cache.
+    Reads refresh an entry's mtime; ``trim()`` evicts the least recently
+    used entries beyond the size cap.
+    """
+
+    def __init__(
+        self, directory: str | Path | None = None, read_only: bool = False
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            directory: Cache directory; defaults to ``render`` under
+                ``default_cache_dir()``.
+            read_only: Only look entries up: reads leave mtimes alone and
+                ``store()`` and ``trim()`` do nothing.
+        """
+        self.directory = (
+            Path(directory) if directory else default_cache_dir() / "render"
+        )
+        self.read_only = read_only
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def load(self, key: str) -> tuple[str, list[str]] | None:
+        """Return the cached output and loaded templates, or None."""
+        path = self._path(key)
+        try:
+            with path.open("r", encoding="utf-8") as file:
+                data = json.load(file)
+            if not self.read_only:
+                os.utime(path)
+            return data["output"], data["templates"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def store(self, key: str, output: str, templates: list[str]) -> None:
+        """Persist a render; failures leave the cache untouched."""
+        path = self._path(key)
+        if self.read_only or path.exists():
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            handle, tmp_name = tempfile.mkstemp(
+                dir=self.directory, suffix=".tmp"
+            )
+        except OSError:
+            return
+        try:
+            with os.fdopen(handle, "w", encoding="utf-8") as file:
+                json.dump(
+                    {"templates": templates, "output": output},
+                    file,
+                    separators=(",", ":"),
+                )
+            os.replace(tmp_name, path)
+        except (OSError, TypeError, ValueError):
+            Path(tmp_name).unlink(missing_ok=True)
+
+    def trim(self, limit: int | None = None) -> int:
+        """Evict least recently used entries beyond ``limit`` bytes.
+
+        Args:
+            limit: Size cap; defaults to ``render_cache_limit()``.
+
+        Returns the number of evicted entries.
+        """
+        if self.read_only:
+            return 0
+        limit = render_cache_limit() if limit is None else limit
+        try:
+            entries = [
+                (stat.st_mtime_ns, stat.st_size, path)
+                for path in self.directory.glob("*.json")
+                for stat in (path.stat(),)
+            ]
+        except OSError:
+            return 0
+        total = 0
+        evicted = 0
+        for _, size, path in sorted(entries, reverse=True):
+            total += size
+            if total > limit:
+                path.unlink(missing_ok=True)
+                evicted += 1
+        return evicted
@@ -0,0 +1,251 @@
+"""Input fingerprints of bake targets for build.py --skip-unchanged."""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import tempfile
+import time
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+
+from .cache import content_key
+from .manifest import file_digest
+from .stages import FROM_PATTERN, StageGraph
+
+STATE_FILE = ".cache/build/state.json"
+STATE_FORMAT = 2
+COPY_PATTERN = re.compile(r"^\s*(?:COPY|ADD)\s+(.+)$", re.IGNORECASE)
+
+
+def _instructions(block: str) -> str:
+    """Return a Dockerfile block without comments and blank lines."""
+    return "\n".join(
+        line.rstrip()
+        for line in block.splitlines()
+        if line.strip() and not line.lstrip().startswith("#")
+    )
+
+
+def stage_blocks(text: str) -> tuple[str, dict[str, tuple[str, str]]]:
+    """Split a Dockerfile into its preamble and named stages.
+
+    Returns the instructions before the first ``FROM`` (global ``ARG`` lines)
+    and, per stage, its base and its instructions from ``FROM`` up to the
+    next ``FROM``.
+    """
+    matches = list(FROM_PATTERN.finditer(text))
+    if not matches:
+        return _instructions(text), {}
+    ends = [match.start() for match in matches[1:]] + [len(text)]
+    blocks = {}
+    for match, end in zip(matches, ends):
+        base, name = match.group(1), match.group(2)
+        if name:
+            start = match.start()
+            blocks[name.lower()] = (
+                base.lower() if base.lower() in blocks else base,
+                _instructions(text[start:end]),
+            )
+    return _instructions(text[: matches[0].start()]), blocks
+
+
+def copy_sources(instructions: str) -> list[str]:
+    """Return the build-context sources of ``COPY``/``ADD`` instructions.
+
+    Sources copied ``--from`` another stage or image are not part of the
+    context and are left out.
+    """
+    sources = []
+    for line in instructions.splitlines():
+        match = COPY_PATTERN.match(line)
+        if match is None:
+            continue
+        args = match.group(1).strip()
+        flags = []
+        while args.startswith("--"):
+            flag, _, args = args.partition(" ")
+            flags.append(flag)
+            args = args.lstrip()
+        if any(flag.startswith("--from=") for flag in flags):
+            continue
+        if args.startswith("["):
+            try:
+                paths = json.loads(args)
+            except ValueError:
+                paths = args.split()
+        else:
+            paths = args.split()
+        sources.extend(str(path) for path in paths[:-1])
+    return sources
+
+
+def _context_digests(context: Path, sources: Iterable[str]) -> list[str]:
+    """Return ``path=digest`` lines for the context files of ``sources``."""
+    lines = []
+    for source in sources:
+        if "://" in source:
+            lines.append(f"{source}=url")
+            continue
+        pattern = source.lstrip("/") or "."
+        if any(char in pattern for char in "*?["):
+            paths = sorted(context.glob(pattern))
+        else:
+            paths = [context / pattern]
+        for path in paths:
+            files = sorted(p for p in path.rglob("*") if p.is_file())
+            for file in files if path.is_dir() else [path]:
+                name = file.relative_to(context).as_posix()
+                lines.append(f"{name}={file_digest(file) or 'missing'}")
+    return lines
+
+
+def target_fingerprint(
+    dockerfile: str | Path,
+    stage: str,
+    context: str | Path,
+    inputs: Iterable[str] = (),
+) -> str:
+    """Return the fingerprint of one Dockerfile stage.
+
+    It covers the preamble, the instructions of the stage and its
+    ancestor stages (so the ``FROM`` base image reference of the chain),
+    the context files they ``COPY``/``ADD``, and ``inputs`` such as the
+    fingerprints of targets whose images the chain starts from.
+    """
+    context = Path(context)
+    try:
+        text = Path(dockerfile).read_text(encoding="utf-8")
+    except OSError:
+        text = ""
+    preamble, blocks = stage_blocks(text)
+    chain = []
+    name = stage.lower()
+    while name in blocks and name not in chain:
+        chain.append(name)
+        name = blocks[name][0]
+    instructions = [blocks[name][1] for name in reversed(chain)]
+    sources = [
+        source for block in instructions for source in copy_sources(block)
+    ]
+    return content_key(
+        preamble.encode(),
+        *(block.encode() for block in instructions),
+        *(line.encode() for line in _context_digests(context, sources)),
+        *(item.encode() for item in inputs),
+    )
+
+
+def fingerprints(
+    definition: Mapping, graph: StageGraph, root: str | Path
+) -> dict[str, str]:
+    """Return the fingerprint of every target of ``graph``.
+
+    A target's fingerprint includes those of its dependencies, so a
+    change to a parent image's inputs changes its dependents too.
+    """
+    root = Path(root)
+    defined = definition.get("target") or {}
+    result: dict[str, str] = {}
+    for name in graph.order():
+        target = defined.get(name) or {}
+        context = root / target.get("context", ".")
+        result[name] = target_fingerprint(
+            context / (target.get("dockerfile") or "Dockerfile"),
+            target.get("target") or "",
+            context,
+            [result[dep] for dep in graph.dependencies(name)],
+        )
+    return result
+
+
+def build_key(fingerprint: str, registry: str, tags: Iterable[str]) -> str:
+    """Return the state key of a build of a target.
+
+    Besides the target's inputs it covers where the image goes: a build
+    pushed to one registry, or under other tags, is not a build of the
+    same image for another.
+    """
+    return content_key(
+        fingerprint.encode(),
+        registry.encode(),
+        *(tag.encode() for tag in tags),
+    )
+
+
+class BuildState:
+    """Build keys and durations of the last successful build per target.
+
+    Loaded (``--load``) and pushed builds are recorded separately: an
+    image pushed earlier is not in the local image store, and one only
+    loaded was never pushed.
+    """
+
+    def __init__(
+        self, path: str | Path = STATE_FILE, targets: dict | None = None
+    ) -> None:
+        """Initialize a state.
+
+        Args:
+            path: Where the state is saved.
+            targets: Previously recorded builds keyed by target.
+        """
+        self.path = Path(path)
+        self._targets: dict[str, dict] = dict(targets or {})
+
+    @classmethod
+    def load(cls, path: str | Path = STATE_FILE) -> "BuildState":
+        """Load a state; a missing or unreadable one starts empty."""
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return cls(path)
+        if not isinstance(data, dict) or data.get("format") != STATE_FORMAT:
+            return cls(path)
+        return cls(path, data.get("targets") or {})
+
+    @staticmethod
+    def _mode(push: bool) -> str:
+        return "push" if push else "load"
+
+    def is_current(self, target: str, key: str, push: bool) -> bool:
+        """Return True when ``target`` was last built with ``key``."""
+        record = self._targets.get(target, {}).get(self._mode(push))
+        return bool(record) and record.get("key") == key
+
+    def seconds(self, target: str, push: bool) -> float:
+        """Return how long the last recorded build of ``target`` took."""
+        record = self._targets.get(target, {}).get(self._mode(push)) or {}
+        return float(record.get("seconds", 0.0))
+
+    def record(
+        self, target: str, key: str, seconds: float, push: bool
+    ) -> None:
+        """Record a successful build of ``target`` with ``key``."""
+        self._targets.setdefault(target, {})[self._mode(push)] = {
+            "key": key,
+            "seconds": round(seconds, 3),
+            "built": int(time.time()),
+        }
+
+    def save(self) -> None:
+        """Persist the state atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        handle, tmp_name = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "w", encoding="utf-8") as file:
+                json.dump(
+                    {
+                        "format": STATE_FORMAT,
+                        "targets": dict(sorted(self._targets.items())),
+                    },
+                    file,
+                    indent=1,
+                )
+                file.write("\n")
+            os.replace(tmp_name, self.path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
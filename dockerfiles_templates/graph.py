@@ -0,0 +1,62 @@
+"""Dependency graph from generation inputs to generated outputs."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+FILE = "file"
+TEMPLATE = "template"
+ENTRY = "entry"
+OUTPUT = "output"
+
+
+def node(kind: str, name: str) -> str:
+    """Return the graph node for ``name`` of the given kind."""
+    return f"{kind}:{name}"
+
+
+class DependencyGraph:
+    """Directed graph of "is used to build" edges.
+
+    Nodes are strings from ``node()``. An edge ``source -> target`` means
+    ``target`` must be rebuilt when ``source`` changes.
+
+    ``FILE`` nodes are template source files; ``TEMPLATE`` nodes stand for
+    a template together with everything it includes, extends or imports,
+    so template edges point from the used template to the one using it.
+    Outputs hang off ``FILE`` nodes when the templates they actually
+    loaded are known, and off their top ``TEMPLATE`` node otherwise.
+    ``ENTRY`` nodes are catalog entries feeding an output's context.
+    """
+
+    __slots__ = ("_dependents",)
+
+    def __init__(self) -> None:
+        """Initialize an empty graph."""
+        self._dependents: dict[str, set[str]] = {}
+
+    def add(self, source: str, target: str) -> None:
+        """Record that ``target`` is built from ``source``."""
+        self._dependents.setdefault(source, set()).add(target)
+
+    def dependents(self, nodes: Iterable[str]) -> set[str]:
+        """Return every node reachable from ``nodes``, excluding them."""
+        seen: set[str] = set()
+        pending = list(nodes)
+        while pending:
+            current = pending.pop()
+            for target in self._dependents.get(current, ()):
+                if target not in seen:
+                    seen.add(target)
+                    pending.append(target)
+        return seen
+
+    def outputs(self, nodes: Iterable[str]) -> list[str]:
+        """Return the output files affected by changes to ``nodes``."""
+        return sorted(
+            name
+            for kind, _, name in (
+                item.partition(":") for item in self.dependents(nodes)
+            )
+            if kind == OUTPUT
+        )
@@ -0,0 +1,265 @@
+"""Content-hash manifest of generated outputs for incremental generation."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from collections.abc import Mapping
+from datetime import date
+from pathlib import Path
+
+from .cache import content_key
+
+MANIFEST_FILE = ".generate-manifest.json"
+MANIFEST_FORMAT = 1
+STATUSES = ("rendered", "written", "skipped", "removed")
+
+
+def _canonical(value):
+    """Convert a render context to plain JSON-encodable data."""
+    if isinstance(value, Mapping):
+        return {
+            key if isinstance(key, str) else repr(key): _canonical(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted((_canonical(item) for item in value), key=repr)
+    if isinstance(value, date):
+        return value.isoformat()
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def context_digest(context) -> bytes:
+    """Return a stable encoding of a render context for hashing."""
+    return json.dumps(
+        _canonical(context), sort_keys=True, separators=(",", ":")
+    ).encode()
+
+
+def file_digest(path: str | Path) -> str | None:
+    """Return the sha256 of a file's content, or None if it is missing."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 16), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def content_matches(path: str | Path, data: bytes) -> bool:
+    """Return True when the file at ``path`` holds exactly ``data``.
+
+    Sizes are compared first; equal-sized files are hashed in chunks, so
+    the file is never read into memory whole.
+    """
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return False
+    if size != len(data):
+        return False
+    return file_digest(path) == hashlib.sha256(data).hexdigest()
+
+
+class Manifest:
+    """Per-output record of input keys and written content hashes.
+
+    An output is up to date when its input key (template closure plus
+    render context) matches the recorded one and the file on disk still
+    holds the recorded content. Size and mtime are checked first so
+    untouched files are not re-hashed.
+    """
+
+    def __init__(
+        self, path: str | Path = MANIFEST_FILE, outputs: dict | None = None
+    ) -> None:
+        """Initialize a manifest.
+
+        Args:
+            path: Where the manifest is saved.
+            outputs: Previously recorded outputs keyed by output path.
+        """
+        self.path = Path(path)
+        self._outputs: dict[str, dict] = dict(outputs or {})
+        self._status: dict[str, str] = {}
+
+    @classmethod
+    def load(cls, path: str | Path = MANIFEST_FILE) -> "Manifest":
+        """Load a manifest; a missing or unreadable one starts empty."""
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return cls(path)
+        if not isinstance(data, dict):
+            return cls(path)
+        if data.get("format") != MANIFEST_FORMAT:
+            return cls(path)
+        return cls(path, data.get("outputs") or {})
+
+    @staticmethod
+    def key(*parts: bytes | str) -> str:
+        """Return an input key from template and context digests."""
+        return content_key(
+            *(
+                part.encode() if isinstance(part, str) else part
+                for part in parts
+            )
+        )
+
+    def is_fresh(self, out_file: str, key: str) -> bool:
+        """Return True when ``out_file`` was produced from ``key`` as-is."""
+        record = self._outputs.get(out_file)
+        if record is None or record.get("key") != key:
+            return False
+        try:
+            stat = os.stat(out_file)
+        except OSError:
+            return False
+        if (stat.st_size, stat.st_mtime_ns) == (
+            record.get("size"),
+            record.get("mtime_ns"),
+        ):
+            return True
+        return file_digest(out_file) == record.get("sha256")
+
+    def skip(self, out_file: str) -> None:
+        """Mark ``out_file`` as up to date for this run."""
+        self._status[out_file] = "skipped"
+
+    def record(self, out_file: str) -> dict | None:
+        """Return the recorded details of ``out_file``, if any."""
+        return self._outputs.get(out_file)
+
+    def write(
+        self, out_file: str, key: str, content: str, **details
+    ) -> bool:
+        """Write rendered content unless the file already holds it.
+
+        Args:
+            out_file: Output path.
+            key: Input key of the render.
+            content: Rendered text.
+            details: Extra JSON-encodable fields kept in the record, such
+                as the templates loaded while rendering.
+
+        Returns True when the file was (re)written.
+        """
+        data = content.encode()
+        sha256 = hashlib.sha256(data).hexdigest()
+        written = file_digest(out_file) != sha256
+        if written:
+            directory = os.path.dirname(out_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(out_file, "wb") as file:
+                file.write(data)
+        stat = os.stat(out_file)
+        self._outputs[out_file] = {
+            "key": key,
+            "sha256": sha256,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            **details,
+        }
+        self._status[out_file] = "written" if written else "rendered"
+        return written
+
+    def finish(self, complete: bool = True) -> list[str]:
+        """Drop outputs not produced this run and return their paths.
+
+        Stale files are only forgotten, not deleted: EOL images, for
+        example, keep their committed Dockerfiles when generated without
+        ``--eol``. Runs that only considered some outputs pass
+        ``complete=False`` to keep every other record.
+        """
+        if not complete:
+            return []
+        removed = sorted(set(self._outputs) - set(self._status))
+        for out_file in removed:
+            del self._outputs[out_file]
+            self._status[out_file] = "removed"
+        return removed
+
+    def outcomes(self, status: str) -> list[str]:
+        """Return the outputs of this run with the given status."""
+        return sorted(
+            out_file
+            for out_file, value in self._status.items()
+            if value == status
+        )
+
+    def summary(self) -> str:
+        """Return a one-line summary of this run."""
+        counts = {status: len(self.outcomes(status)) for status in STATUSES}
+        rendered = counts["rendered"] + counts["written"]
+        return (
+            f"{rendered} rendered ({counts['written']} written), "
+            f"{counts['skipped']} skipped, {counts['removed']} removed"
+        )
+
+    def save(self) -> None:
+        """Persist the manifest atomically."""
+        directory = self.path.parent
+        handle, tmp_name = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "w", encoding="utf-8") as file:
+                json.dump(
+                    {
+                        "format": MANIFEST_FORMAT,
+                        "outputs": dict(sorted(self._outputs.items())),
+                    },
+                    file,
+                    indent=1,
+                )
+                file.write("\n")
+            os.replace(tmp_name, self.path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+
+class CheckManifest(Manifest):
+    """Manifest for read-only freshness checks.
+
+    Every output counts as stale, so every output is rendered; ``write()``
+    then only compares the rendered content with the file on disk, and
+    nothing, including the manifest itself, is written.
+    """
+
+    def is_fresh(self, out_file: str, key: str) -> bool:
+        """Return False: every output is rendered and compared."""
+        return False
+
+    def write(
+        self, out_file: str, key: str, content: str, **details
+    ) -> bool:
+        """Compare rendered content with ``out_file``; never write.
+
+        Returns False, as nothing is written.
+        """
+        if content_matches(out_file, content.encode()):
+            self._status[out_file] = "current"
+        else:
+            self._status[out_file] = "stale"
+        return False
+
+    def finish(self, complete: bool = True) -> list[str]:
+        """Keep every record; a check forgets nothing."""
+        return []
+
+    def summary(self) -> str:
+        """Return a one-line summary of this check."""
+        stale = len(self.outcomes("stale"))
+        return f"{len(self._status)} checked, {stale} stale"
+
+    def save(self) -> None:
+        """Do nothing: checks are read-only."""
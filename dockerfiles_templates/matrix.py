@@ -0,0 +1,102 @@
+"""Columnar build matrix of (entry, stage, platform) combinations."""
+
+from __future__ import annotations
+
+from typing import Iterator, NamedTuple
+
+
+class MatrixRow(NamedTuple):
+    """One buildable (family, name, stage, platform) tuple."""
+
+    family: str
+    name: str
+    distro: str
+    stage: str
+    platform: str
+    platform_key: str
+    platform_group: str
+    release: str
+    target: str
+    group: str
+    tags: tuple[str, ...]
+    platforms: tuple[str, ...]
+    eol: bool
+
+
+class BuildMatrix:
+    """Immutable, columnar table of ``MatrixRow`` values.
+
+    Columns are stored as tuples built in a single pass over the catalog;
+    rows are only materialized when iterated.
+    """
+
+    COLUMNS = MatrixRow._fields
+
+    __slots__ = ("_columns", "_size")
+
+    def __init__(self, columns: dict[str, tuple]) -> None:
+        """Initialize from a mapping of column name to equal-length tuples."""
+        self._columns = {name: tuple(columns[name]) for name in self.COLUMNS}
+        sizes = {len(values) for values in self._columns.values()}
+        if len(sizes) > 1:
+            raise ValueError("BuildMatrix columns must have equal lengths")
+        self._size = sizes.pop() if sizes else 0
+
+    @classmethod
+    def from_rows(cls, rows) -> "BuildMatrix":
+        """Build a matrix from an iterable of ``MatrixRow`` values."""
+        rows = list(rows)
+        return cls(
+            {
+                name: tuple(row[index] for row in rows)
+                for index, name in enumerate(cls.COLUMNS)
+            }
+        )
+
+    def __len__(self) -> int:
+        """Return the number of rows."""
+        return self._size
+
+    def __bool__(self) -> bool:
+        """Return True when the matrix has rows."""
+        return self._size > 0
+
+    def __iter__(self) -> Iterator[MatrixRow]:
+        """Iterate rows lazily."""
+        columns = [self._columns[name] for name in self.COLUMNS]
+        return (MatrixRow._make(values) for values in zip(*columns))
+
+    def column(self, name: str) -> tuple:
+        """Return one column."""
+        return self._columns[name]
+
+    def select(self, indexes) -> "BuildMatrix":
+        """Return a new matrix with the rows at ``indexes``."""
+        indexes = tuple(indexes)
+        return BuildMatrix(
+            {
+                name: tuple(values[i] for i in indexes)
+                for name, values in self._columns.items()
+            }
+        )
+
+    def unique(self, *names: str) -> list:
+        """Return distinct values of ``names`` in first-appearance order.
+
+        A single column name yields plain values; several yield tuples.
+        """
+        columns = [self._columns[name] for name in names]
+        values = zip(*columns) if len(columns) > 1 else columns[0]
+        return list(dict.fromkeys(values))
+
+    def groups(self, key: tuple[str, ...] | str, value: str) -> dict:
+        """Group ``value`` column entries by ``key`` column(s), in order."""
+        keys = (key,) if isinstance(key, str) else key
+        key_columns = [self._columns[name] for name in keys]
+        key_values = (
+            zip(*key_columns) if len(key_columns) > 1 else key_columns[0]
+        )
+        output: dict = {}
+        for group, item in zip(key_values, self._columns[value]):
+            output.setdefault(group, []).append(item)
+        return output
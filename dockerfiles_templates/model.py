@@ -0,0 +1,161 @@
+"""Immutable, slotted model of templates.yml entries and targets.
+
+``Entry`` and ``Target`` are read-only mappings, so existing callers that
+index them like the raw dictionaries keep working, while platforms are
+parsed once into interned ``Platform`` tuples.
+"""
+
+from __future__ import annotations
+
+import sys
+from abc import abstractmethod
+from collections.abc import Mapping
+from typing import Iterable, Iterator
+
+from .platforms import Platform, registry
+
+
+def _intern(value):
+    """Intern string values; return anything else unchanged."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class _Frozen(Mapping):
+    """Read-only mapping over a fixed set of slots.
+
+    Subclasses implement ``to_dict`` and a ``from_dict`` classmethod that
+    accepts its result; ``__repr__`` and pickling are built on them.
+    """
+
+    __slots__ = ("_keys",)
+
+    def __getitem__(self, key: str):
+        if key not in self._keys:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key) -> bool:
+        return key in self._keys
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def copy(self) -> dict:
+        """Return a shallow, mutable ``dict`` copy."""
+        return dict(self)
+
+    @abstractmethod
+    def to_dict(self) -> dict:
+        """Return plain nested data equivalent to the source YAML."""
+
+    def __reduce__(self):
+        return (type(self).from_dict, (self.to_dict(),))
+
+
+class Target(_Frozen):
+    """One build stage of an entry and the platforms it supports."""
+
+    __slots__ = ("target", "platforms", "parsed_platforms", "mask")
+
+    def __init__(self, target: str, platforms: Iterable[str]) -> None:
+        """Initialize a target.
+
+        Args:
+            target: Dockerfile stage name (e.g. ``base``).
+            platforms: Declared platform strings (e.g. ``linux/amd64``).
+        """
+        raw = tuple(sys.intern(str(value)) for value in platforms)
+        set_slot = object.__setattr__
+        set_slot(self, "_keys", ("target", "platforms"))
+        set_slot(self, "target", sys.intern(target))
+        set_slot(self, "platforms", raw)
+        parsed = tuple(Platform.parse(p) for p in raw)
+        set_slot(self, "parsed_platforms", parsed)
+        set_slot(self, "mask", registry.mask(parsed))
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "Target":
+        """Build a Target from a templates.yml target mapping."""
+        return cls(data["target"], data.get("platforms") or ())
+
+    def supports(self, want: Platform | str) -> bool:
+        """Return True when any declared platform supports ``want``."""
+        return bool(self.mask & registry.query_mask(want))
+
+    def to_dict(self) -> dict:
+        """Return plain nested data equivalent to the source YAML."""
+        return {"target": self.target, "platforms": list(self.platforms)}
+
+
+class Entry(_Frozen):
+    """One dockerfile entry of templates.yml."""
+
+    FIELDS = ("family", "name", "distro", "base_image", "targets", "eol")
+
+    __slots__ = FIELDS + ("_extra",)
+
+    def __init__(self, data: Mapping) -> None:
+        """Initialize an entry from a templates.yml dockerfile mapping."""
+        set_slot = object.__setattr__
+        extra = {}
+        for field in self.FIELDS:
+            set_slot(self, field, None)
+        for key, value in data.items():
+            if key == "targets":
+                value = tuple(Target.from_dict(t) for t in value or ())
+            if key in self.FIELDS:
+                set_slot(self, key, _intern(value))
+            else:
+                extra[sys.intern(key)] = _intern(value)
+        set_slot(self, "_keys", tuple(sys.intern(key) for key in data))
+        set_slot(self, "_extra", extra)
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "Entry":
+        """Build an Entry from a templates.yml dockerfile mapping."""
+        return cls(data)
+
+    def __getitem__(self, key: str):
+        """Return a field value, mirroring the source dictionary."""
+        if key not in self._keys:
+            raise KeyError(key)
+        if key in self._extra:
+            return self._extra[key]
+        return getattr(self, key)
+
+    @property
+    def token(self) -> str:
+        """CLI image token, ``family-name``."""
+        return f"{self.family}-{self.name}"
+
+    def to_render_context(self, **extra) -> dict:
+        """Return a shallow dict suitable for template rendering.
+
+        Targets are shared immutable objects rather than deep copies, so
+        building a context only allocates the top-level dictionary.
+
+        Args:
+            **extra: Additional context values (e.g. ``out_file``).
+        """
+        context = dict(self)
+        context.update(extra)
+        return context
+
+    def to_dict(self) -> dict:
+        """Return plain nested data equivalent to the source YAML."""
+        data = dict(self)
+        if "targets" in data:
+            data["targets"] = [target.to_dict() for target in self.targets]
+        return data
@@ -0,0 +1,168 @@
+"""Docker platform string helpers.
+
+This module only depends on the standard library so it can be imported
+without loading YAML or JSON schema support.
+
+Platforms are interned into a process-wide registry that assigns each
+canonical platform a small integer ID. A set of declared platforms is
+then a bitmask, and "does this declaration support that platform" is a
+single bitwise AND against the query mask from ``PlatformRegistry``.
+"""
+
+from __future__ import annotations
+
+import sys
+from functools import lru_cache
+from typing import Iterable, NamedTuple
+
+
+@lru_cache(maxsize=1024)
+def parse_platform(raw: str) -> tuple[str, str, str | None]:
+    """Parse Docker platform text into (os, arch, variant)."""
+    raw = (raw or "").strip().lower().replace("-", "/")
+    parts = [p for p in raw.split("/") if p]
+    if len(parts) == 1:
+        return "linux", parts[0], None
+    if len(parts) == 2:
+        return parts[0], parts[1], None
+    return parts[0], parts[1], "/".join(parts[2:])
+
+
+@lru_cache(maxsize=1024)
+def canonical_platform(raw: str) -> str:
+    """Normalize a platform string to os/arch[/variant]."""
+    os_name, arch, variant = parse_platform(raw)
+    return f"{os_name}/{arch}" + (f"/{variant}" if variant else "")
+
+
+class Platform(NamedTuple):
+    """Parsed, interned Docker platform (os, arch, variant)."""
+
+    os: str
+    arch: str
+    variant: str | None = None
+
+    @classmethod
+    def parse(cls, raw: str) -> "Platform":
+        """Return the interned Platform for platform text ``raw``."""
+        platform = _interned.get(raw)
+        if platform is None:
+            os_name, arch, variant = parse_platform(raw)
+            platform = cls(
+                sys.intern(os_name),
+                sys.intern(arch),
+                sys.intern(variant) if variant else None,
+            )
+            platform = _interned.setdefault(platform.canonical, platform)
+            _interned[raw] = platform
+        return platform
+
+    @property
+    def canonical(self) -> str:
+        """Slash form, e.g. ``linux/arm/v7``."""
+        return f"{self.os}/{self.arch}" + (
+            f"/{self.variant}" if self.variant else ""
+        )
+
+    @property
+    def key(self) -> str:
+        """Dashed form safe for names and scopes, e.g. ``linux-arm-v7``."""
+        return self.canonical.replace("/", "-")
+
+    @property
+    def parent(self) -> str:
+        """Variant-agnostic ``os/arch`` form."""
+        return f"{self.os}/{self.arch}"
+
+    def __str__(self) -> str:
+        """Return the canonical slash form."""
+        return self.canonical
+
+
+# Platform text (raw and canonical) -> interned Platform.
+_interned: dict[str, Platform] = {}
+
+
+def _as_platform(value: Platform | str) -> Platform:
+    return value if isinstance(value, Platform) else Platform.parse(value)
+
+
+class PlatformRegistry:
+    """Assign interned platforms integer IDs for bitmask support checks."""
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._ids: dict[Platform, int] = {}
+        self._platforms: list[Platform] = []
+        self._queries: dict[Platform, int] = {}
+
+    def id(self, platform: Platform | str) -> int:
+        """Return the ID for ``platform``, registering it if needed."""
+        platform = _as_platform(platform)
+        platform_id = self._ids.get(platform)
+        if platform_id is None:
+            platform_id = len(self._platforms)
+            self._ids[platform] = platform_id
+            self._platforms.append(platform)
+        return platform_id
+
+    def mask(self, platforms: Iterable[Platform | str]) -> int:
+        """Return the bitmask of declared ``platforms``."""
+        bits = 0
+        for platform in platforms:
+            bits |= 1 << self.id(platform)
+        return bits
+
+    def query_mask(self, want: Platform | str) -> int:
+        """Return the bits of every declaration that supports ``want``.
+
+        That is the exact platform plus, for variant queries, the
+        variant-less ``os/arch`` declaration.
+        """
+        want = _as_platform(want)
+        bits = self._queries.get(want)
+        if bits is None:
+            bits = 1 << self.id(want)
+            if want.variant:
+                bits |= 1 << self.id(Platform.parse(want.parent))
+            self._queries[want] = bits
+        return bits
+
+    def platforms(self, mask: int) -> tuple[Platform, ...]:
+        """Decode a bitmask back into platforms."""
+        return tuple(
+            platform
+            for platform_id, platform in enumerate(self._platforms)
+            if mask >> platform_id & 1
+        )
+
+
+registry = PlatformRegistry()
+
+
+def platforms_support(platforms: list[str] | str, want: str) -> bool:
+    """Return True when any allowed platform matches ``want``."""
+    entries = (
+        platforms
+        if isinstance(platforms, (list, tuple))
+        else str(platforms).split(",")
+    )
+    declared = registry.mask(str(raw).strip() for raw in entries)
+    return bool(declared & registry.query_mask(want))
+
+
+def filter_targets_by_platform(
+    targets: list[dict], platform: str | None = None
+) -> list[dict]:
+    """Filter target definitions by platform support."""
+    if not platform:
+        return list(targets or [])
+    query = registry.query_mask(platform)
+    output = []
+    for target in targets or []:
+        declared = getattr(target, "mask", None)
+        if declared is None:
+            declared = registry.mask(target.get("platforms", []))
+        if declared & query:
+            output.append(target)
+    return output
@@ -0,0 +1,183 @@
+"""Timing and cache statistics for generate.py --profile."""
+
+from __future__ import annotations
+
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+PROFILE_FILE = ".generate-profile.json"
+
+
+class Profiler:
+    """Collect per-stage and per-output wall times and cache hit rates.
+
+    ``generate.gen()`` reports into one per run; tests can pass their own
+    and assert on ``report()``. Stage names may be dotted (``catalog.parse``)
+    to break a stage down; dotted stages are part of their parent's time.
+    """
+
+    def __init__(self, cprofile: bool = False) -> None:
+        """Initialize an empty profile.
+
+        Args:
+            cprofile: Also run ``cProfile`` between ``start()`` and
+                ``stop()`` so ``dump_stats()`` can write its statistics.
+        """
+        self._stages: dict[str, float] = {}
+        self._outputs: dict[str, dict] = {}
+        self._caches: dict[str, list[int]] = {}
+        self._started: float | None = None
+        self._total = 0.0
+        self._cprofile = None
+        if cprofile:
+            import cProfile
+
+            self._cprofile = cProfile.Profile()
+
+    def start(self) -> None:
+        """Start the wall clock (and cProfile, if enabled)."""
+        self._started = time.perf_counter()
+        if self._cprofile is not None:
+            self._cprofile.enable()
+
+    def stop(self) -> None:
+        """Stop the wall clock (and cProfile, if enabled)."""
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self._started is not None:
+            self._total += time.perf_counter() - self._started
+            self._started = None
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block and add it to stage ``name``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name: str, seconds: float) -> None:
+        """Add ``seconds`` to stage ``name``."""
+        self._stages[name] = self._stages.get(name, 0.0) + seconds
+
+    def output(self, out_file: str, source: str, **values: float) -> None:
+        """Record one output.
+
+        Args:
+            out_file: Output path.
+            source: Where the content came from: ``rendered``, ``cache``
+                (the render cache) or ``skipped`` (up to date).
+            values: Numbers to add up for the output, such as
+                ``render_seconds``, ``write_seconds`` or ``bytes_written``.
+        """
+        record = self._outputs.setdefault(out_file, {"source": source})
+        record["source"] = source
+        for name, value in values.items():
+            record[name] = record.get(name, 0) + value
+
+    def cache(self, name: str, hits: int = 0, misses: int = 0) -> None:
+        """Count lookups in cache ``name``."""
+        counts = self._caches.setdefault(name, [0, 0])
+        counts[0] += hits
+        counts[1] += misses
+
+    def report(self) -> dict:
+        """Return the profile as plain JSON-encodable data."""
+        total = self._total
+        if self._started is not None:
+            total += time.perf_counter() - self._started
+        caches = {}
+        for name, (hits, misses) in self._caches.items():
+            lookups = hits + misses
+            caches[name] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / lookups if lookups else None,
+            }
+        return {
+            "total_seconds": total,
+            "stages": dict(self._stages),
+            "bytes_written": sum(
+                record.get("bytes_written", 0)
+                for record in self._outputs.values()
+            ),
+            "caches": caches,
+            "outputs": {
+                out_file: dict(record)
+                for out_file, record in sorted(self._outputs.items())
+            },
+        }
+
+    def to_json(self) -> str:
+        """Return ``report()`` as indented JSON."""
+        return json.dumps(self.report(), indent=2) + "\n"
+
+    def format(self, slowest: int = 10) -> str:
+        """Return a human-readable summary of ``report()``.
+
+        Args:
+            slowest: How many of the slowest outputs to list.
+        """
+        report = self.report()
+        lines = [f"Total: {report['total_seconds'] * 1000:.1f} ms"]
+        lines.append("Stages:")
+        for name, seconds in report["stages"].items():
+            indent = "  " * (name.count(".") + 1)
+            lines.append(
+                f"{indent}{name.rsplit('.', 1)[-1]:<{24 - len(indent)}}"
+                f"{seconds * 1000:>10.1f} ms"
+            )
+        if report["caches"]:
+            lines.append("Caches:")
+            for name, counts in report["caches"].items():
+                rate = counts["hit_rate"]
+                rate = "n/a" if rate is None else f"{rate:.0%}"
+                lines.append(
+                    f"  {name:<22}{counts['hits']:>5} hits "
+                    f"{counts['misses']:>5} misses  {rate}"
+                )
+        outputs = report["outputs"]
+        counts: dict[str, int] = {}
+        for record in outputs.values():
+            counts[record["source"]] = counts.get(record["source"], 0) + 1
+        lines.append(
+            f"Outputs: {len(outputs)} ("
+            + ", ".join(f"{n} {source}" for source, n in sorted(counts.items()))
+            + f"), {report['bytes_written']} bytes written"
+        )
+
+        def elapsed(record: dict) -> float:
+            return sum(
+                value
+                for name, value in record.items()
+                if name.endswith("_seconds")
+            )
+
+        ranked = sorted(
+            outputs.items(), key=lambda item: elapsed(item[1]), reverse=True
+        )
+        for out_file, record in ranked[:slowest]:
+            if elapsed(record) <= 0:
+                break
+            lines.append(
+                f"  {elapsed(record) * 1000:>8.2f} ms  {out_file} "
+                f"({record['source']})"
+            )
+        return "\n".join(lines)
+
+    def save(self, path: str | Path = PROFILE_FILE) -> None:
+        """Write ``to_json()`` to ``path``."""
+        Path(path).write_text(self.to_json(), encoding="utf-8")
+
+    def dump_stats(self, path: str | Path) -> None:
+        """Write cProfile statistics for ``pstats``/snakeviz to ``path``.
+
+        Raises:
+            ValueError: The profiler was created without ``cprofile``.
+        """
+        if self._cprofile is None:
+            raise ValueError("cProfile was not enabled for this profiler")
+        self._cprofile.dump_stats(str(path))
@@ -0,0 +1,241 @@
+"""Stage graph of generated Dockerfiles and a parallel build scheduler."""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Callable, Iterable, Mapping
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+FROM_PATTERN = re.compile(
+    r"^\s*FROM\s+(?:--\S+\s+)*(\S+)(?:\s+AS\s+(\S+))?\s*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+MEMINFO = "/proc/meminfo"
+
+
+def dockerfile_stages(text: str) -> dict[str, str]:
+    """Return the base of each named stage of a Dockerfile.
+
+    A base is either an earlier stage name or an image reference.
+    """
+    stages: dict[str, str] = {}
+    for base, name in FROM_PATTERN.findall(text):
+        if name:
+            known = base.lower() in stages
+            stages[name.lower()] = base.lower() if known else base
+    return stages
+
+
+class StageGraph:
+    """Build order of bake targets through their Dockerfile stages.
+
+    Target ``B`` depends on target ``A`` when ``B``'s stage is built from
+    ``A``'s stage, directly or through stages that are not targets, in
+    the same Dockerfile, or when ``B`` starts ``FROM`` an image tagged by
+    ``A``.
+    """
+
+    __slots__ = ("_dependencies",)
+
+    def __init__(self, dependencies: Mapping[str, Iterable[str]]) -> None:
+        """Initialize a graph from each target's direct dependencies."""
+        self._dependencies = {
+            target: tuple(sorted(set(deps)))
+            for target, deps in dependencies.items()
+        }
+
+    @classmethod
+    def from_definition(
+        cls,
+        definition: Mapping,
+        targets: Iterable[str],
+        root: str | Path,
+        registry: str = "",
+    ) -> "StageGraph":
+        """Build the graph of ``targets`` from a bake definition.
+
+        Args:
+            definition: Bake JSON with a ``target`` mapping.
+            targets: Selected target names; dependencies on targets
+                outside the selection are ignored.
+            root: Directory bake contexts are relative to.
+            registry: Value of the ``REGISTRY`` variable in tags.
+        """
+        root = Path(root)
+        selected = list(targets)
+        defined = definition.get("target") or {}
+        by_stage = {}
+        by_tag = {}
+        for name in selected:
+            target = defined.get(name) or {}
+            dockerfile = root / target.get("context", ".") / (
+                target.get("dockerfile") or "Dockerfile"
+            )
+            stage = (target.get("target") or "").lower()
+            by_stage[(dockerfile, stage)] = name
+            for tag in target.get("tags") or []:
+                by_tag[tag.replace("${REGISTRY}", registry)] = name
+
+        parsed: dict[Path, dict[str, str]] = {}
+        dependencies = {}
+        for (dockerfile, stage), name in by_stage.items():
+            if dockerfile not in parsed:
+                try:
+                    text = dockerfile.read_text(encoding="utf-8")
+                except OSError:
+                    text = ""
+                parsed[dockerfile] = dockerfile_stages(text)
+            stages = parsed[dockerfile]
+            deps = set()
+            base = stages.get(stage)
+            seen = {stage}
+            while base is not None:
+                if base in stages and base not in seen:
+                    seen.add(base)
+                    owner = by_stage.get((dockerfile, base))
+                    if owner is not None:
+                        deps.add(owner)
+                        break
+                    base = stages[base]
+                else:
+                    owner = by_tag.get(base)
+                    if owner is not None and owner != name:
+                        deps.add(owner)
+                    break
+            dependencies[name] = deps
+        return cls(dependencies)
+
+    def dependencies(self, target: str) -> tuple[str, ...]:
+        """Return the direct dependencies of ``target``."""
+        return self._dependencies[target]
+
+    def descendants(self) -> dict[str, int]:
+        """Return how many targets transitively depend on each target."""
+        children: dict[str, set[str]] = {t: set() for t in self._dependencies}
+        for target, deps in self._dependencies.items():
+            for dep in deps:
+                children[dep].add(target)
+
+        counts: dict[str, set[str]] = {}
+
+        def below(target: str) -> set[str]:
+            if target not in counts:
+                counts[target] = set()
+                found = set(children[target])
+                for child in children[target]:
+                    found |= below(child)
+                counts[target] = found
+            return counts[target]
+
+        return {target: len(below(target)) for target in self._dependencies}
+
+    def order(self) -> list[str]:
+        """Return the targets in a valid build order.
+
+        Among ready targets, those with the most dependents come first, so
+        shared prefixes such as a release's ``base`` stage build early.
+
+        Raises:
+            ValueError: The stages form a cycle.
+        """
+        done: list[str] = []
+        scheduler = _Ready(self)
+        while scheduler.ready:
+            target = scheduler.pop()
+            done.append(target)
+            scheduler.finish(target)
+        if len(done) != len(self._dependencies):
+            raise ValueError("Dockerfile stages form a cycle")
+        return done
+
+    def __iter__(self):
+        """Iterate over target names."""
+        return iter(self._dependencies)
+
+    def __len__(self) -> int:
+        """Return the number of targets."""
+        return len(self._dependencies)
+
+
+class _Ready:
+    """Ready queue of a graph walk, highest fan-out first."""
+
+    def __init__(self, graph: StageGraph) -> None:
+        self._position = {t: i for i, t in enumerate(graph)}
+        self._weight = graph.descendants()
+        self._waiting = {t: set(graph.dependencies(t)) for t in graph}
+        self._dependents: dict[str, list[str]] = {t: [] for t in graph}
+        for target, deps in self._waiting.items():
+            for dep in deps:
+                self._dependents[dep].append(target)
+        self.ready = [t for t, deps in self._waiting.items() if not deps]
+
+    def pop(self) -> str:
+        self.ready.sort(key=lambda t: (-self._weight[t], self._position[t]))
+        return self.ready.pop(0)
+
+    def finish(self, target: str) -> None:
+        for dependent in self._dependents[target]:
+            waiting = self._waiting[dependent]
+            waiting.discard(target)
+            if not waiting:
+                self.ready.append(dependent)
+
+
+def memory_cap(job_memory: int, meminfo: str | Path = MEMINFO) -> int | None:
+    """Return how many jobs of ``job_memory`` bytes fit in available memory.
+
+    Reads ``MemAvailable`` from ``/proc/meminfo``; returns None when it
+    cannot be read (e.g. off Linux), meaning no cap.
+    """
+    if job_memory <= 0:
+        return None
+    try:
+        with open(meminfo, "r", encoding="utf-8") as file:
+            for line in file:
+                if line.startswith("MemAvailable:"):
+                    available = int(line.split()[1]) * 1024
+                    return max(1, available // job_memory)
+    except (OSError, ValueError, IndexError):
+        return None
+    return None
+
+
+def run_graph(
+    graph: StageGraph, run: Callable[[str], None], workers: int = 1
+) -> list[str]:
+    """Run ``run(target)`` for every target after its dependencies.
+
+    Independent targets run concurrently on up to ``workers`` threads,
+    highest fan-out first. After a failure no new targets are started;
+    running ones finish, then the first error is raised.
+
+    Returns the targets in the order they finished.
+    """
+    scheduler = _Ready(graph)
+    finished: list[str] = []
+    error: Exception | None = None
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        running = {}
+        while True:
+            while scheduler.ready and len(running) < workers and not error:
+                target = scheduler.pop()
+                running[pool.submit(run, target)] = target
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                target = running.pop(future)
+                try:
+                    future.result()
+                except Exception as exc:
+                    error = error or exc
+                    continue
+                finished.append(target)
+                scheduler.finish(target)
+    if error is not None:
+        raise error
+    if len(finished) != len(graph):
+        raise ValueError("Dockerfile stages form a cycle")
+    return finished
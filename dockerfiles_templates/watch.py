@@ -0,0 +1,235 @@
+"""File watchers for generate.py --watch: inotify with a polling fallback."""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+
+# inotify(7) event bits.
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+)
+_EVENT = struct.Struct("iIII")
+
+# Changes arriving this close together are reported as one batch.
+DEBOUNCE_SECONDS = 0.03
+POLL_INTERVAL = 0.25
+
+
+def ignored(name: str) -> bool:
+    """Return True for editor swap, backup and temporary files."""
+    return (
+        name.startswith((".", "#"))
+        or name.endswith(("~", ".swp", ".swx", ".tmp"))
+        or name == "4913"  # vim's write-permission probe
+    )
+
+
+def _roots(paths) -> list[tuple[Path, str | None]]:
+    """Split watch paths into (directory, only-this-name) pairs.
+
+    Files are watched through their parent directory, so editors that
+    save by renaming a new file into place are still seen.
+    """
+    roots = []
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            roots.append((path, None))
+        else:
+            roots.append((path.parent, path.name))
+    return roots
+
+
+class PollingWatcher:
+    """Detect changes by comparing mtimes and sizes at an interval."""
+
+    kind = "polling"
+
+    def __init__(self, paths, interval: float = POLL_INTERVAL) -> None:
+        """Initialize the watcher and take the first snapshot.
+
+        Args:
+            paths: Directories (watched recursively) and files to watch.
+            interval: Seconds between snapshots.
+        """
+        self._roots = _roots(paths)
+        self._interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        snapshot = {}
+        for directory, only in self._roots:
+            if only is not None:
+                candidates = [directory / only]
+            else:
+                candidates = directory.rglob("*")
+            for path in candidates:
+                if ignored(path.name):
+                    continue
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                if not path.is_dir():
+                    snapshot[str(path)] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def wait(self, timeout: float | None = None) -> set[str]:
+        """Block until files change; return their paths (empty on timeout)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snapshot = self._scan()
+            changed = {
+                path
+                for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            time.sleep(self._interval)
+
+    def close(self) -> None:
+        """Release resources (nothing to do for polling)."""
+
+    def __enter__(self) -> "PollingWatcher":
+        """Return the watcher."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Close the watcher."""
+        self.close()
+
+
+class InotifyWatcher(PollingWatcher):
+    """Linux inotify watcher over ctypes; no third-party dependency."""
+
+    kind = "inotify"
+
+    def __init__(self, paths) -> None:
+        """Initialize inotify watches for ``paths``.
+
+        Raises:
+            OSError: inotify is unavailable.
+        """
+        self._roots = _roots(paths)
+        library = ctypes.util.find_library("c")
+        self._libc = ctypes.CDLL(library, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._fd = fd
+        # Watch descriptor -> (directory, file names to report or None for
+        # all); inotify returns the same descriptor for a repeated directory.
+        self._watches: dict[int, tuple[Path, set[str] | None]] = {}
+        try:
+            for directory, only in self._roots:
+                self._add(directory, only, recursive=only is None)
+        except OSError:
+            self.close()
+            raise
+
+    def _add(self, directory: Path, only: str | None, recursive: bool):
+        wd = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(directory), WATCH_MASK
+        )
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"cannot watch {directory}")
+        names = None if only is None else {only}
+        if wd in self._watches:
+            known = self._watches[wd][1]
+            names = None if known is None or names is None else known | names
+        self._watches[wd] = (directory, names)
+        if recursive:
+            for child in directory.iterdir():
+                if child.is_dir() and not ignored(child.name):
+                    self._add(child, None, recursive=True)
+
+    def _read(self, changed: set[str]) -> None:
+        try:
+            data = os.read(self._fd, 65536)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            start = offset + _EVENT.size
+            offset = start + length
+            name = data[start:offset].rstrip(b"\0")
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped; report every watched file.
+                changed.update(PollingWatcher._scan(self))
+                continue
+            directory, names = self._watches.get(wd, (None, None))
+            if directory is None or not name:
+                continue
+            name = os.fsdecode(name)
+            if ignored(name) or (names is not None and name not in names):
+                continue
+            path = directory / name
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and names is None:
+                    self._add(path, None, recursive=True)
+                    changed.update(
+                        str(item)
+                        for item in path.rglob("*")
+                        if item.is_file()
+                    )
+                continue
+            changed.add(str(path))
+
+    def wait(self, timeout: float | None = None) -> set[str]:
+        """Block until files change; return their paths (empty on timeout)."""
+        changed: set[str] = set()
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return changed
+        # Collect the rest of a burst (editors write, rename and chmod).
+        while ready:
+            self._read(changed)
+            ready, _, _ = select.select([self._fd], [], [], DEBOUNCE_SECONDS)
+        return changed
+
+    def close(self) -> None:
+        """Close the inotify descriptor."""
+        if getattr(self, "_fd", None) is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def watch(paths, polling: bool = False) -> PollingWatcher:
+    """Return an inotify watcher for ``paths``, or a polling one.
+
+    Polling is used when requested, off Linux, or when inotify cannot be
+    set up (e.g. the watch limit is exhausted).
+    """
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(paths)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(paths)
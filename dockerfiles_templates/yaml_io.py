@@ -0,0 +1,73 @@
+"""YAML loading and dumping for templates.yml.
+
+YAML libraries are imported on first use so importing this module stays
+cheap for callers that never parse a catalog.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    import ruamel.yaml
+
+
+@lru_cache(maxsize=None)
+def round_trip_yaml() -> "ruamel.yaml.YAML":
+    """Return the round-trip YAML instance used by tools that write back."""
+    import ruamel.yaml
+
+    yaml = ruamel.yaml.YAML()
+    yaml.preserve_quotes = True
+    return yaml
+
+
+@lru_cache(maxsize=None)
+def _ruamel_safe_yaml() -> "ruamel.yaml.YAML":
+    """Return a safe ruamel loader, using its C extension when installed."""
+    import ruamel.yaml
+
+    return ruamel.yaml.YAML(typ="safe", pure=False)
+
+
+@lru_cache(maxsize=None)
+def _pyyaml():
+    """Return the PyYAML module if its libyaml bindings are installed."""
+    try:
+        import yaml
+    except ImportError:
+        return None
+    return yaml if hasattr(yaml, "CSafeLoader") else None
+
+
+def safe_loader_name() -> str:
+    """Return the name of the loader ``load_yaml`` uses for plain data."""
+    return "pyyaml-libyaml" if _pyyaml() is not None else "ruamel-safe"
+
+
+def load_yaml(content: bytes | str, round_trip: bool = False):
+    """Parse YAML content.
+
+    Read-only callers get plain dicts, lists and strings from the fastest
+    safe loader available (PyYAML's libyaml bindings when installed,
+    otherwise ruamel's safe loader). Round-trip mode keeps comments and
+    quoting so the document can be written back with ``dump_yaml``.
+
+    Args:
+        content: YAML document text or bytes.
+        round_trip: Return ruamel round-trip objects instead of plain data.
+    """
+    if round_trip:
+        return round_trip_yaml().load(content)
+    pyyaml = _pyyaml()
+    if pyyaml is not None:
+        return pyyaml.load(content, Loader=pyyaml.CSafeLoader)
+    return _ruamel_safe_yaml().load(content)
+
+
+def dump_yaml(data, path: str | Path) -> None:
+    """Write round-trip YAML data to ``path``."""
+    with Path(path).open("w", encoding="utf-8") as file:
+        round_trip_yaml().dump(data, file)
@@ -1,74 +1,482 @@
 #!/usr/bin/env python3
 """Generate the dockerfiles from a jinja template."""
+from __future__ import annotations
+
+import hashlib
 import os
 import json
 import logging
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
 import click
-from jinja2 import Environment, FileSystemLoader
+import jinja2
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    meta,
+)
 from dockerfiles_templates import Templates
+from dockerfiles_templates.bake import (
+    BAKE_DIR,
+    BAKE_HCL,
+    BAKE_JSON,
+    BakeModel,
+    family_bake_file,
+)
+from dockerfiles_templates.cache import (
+    CatalogCache,
+    RenderCache,
+    cache_disabled,
+    default_cache_dir,
+)
+from dockerfiles_templates.graph import (
+    ENTRY,
+    FILE,
+    OUTPUT,
+    TEMPLATE,
+    DependencyGraph,
+    node,
+)
+from dockerfiles_templates.manifest import (
+    MANIFEST_FILE,
+    CheckManifest,
+    Manifest,
+    context_digest,
+)
+from dockerfiles_templates.profile import PROFILE_FILE, Profiler
+from dockerfiles_templates.watch import watch
 
 
 log = logging.getLogger(__name__)
 json_parser = json
-templates = Templates()
+templates = None
+manifest = None
+TEMPLATE_DIR = "template"
+CATALOG_PATH = "templates.yml"
+SCHEMA_DIR = "schema"
+TASKS_FILE = ".vscode/tasks.json"
+_environments = {}
+_template_digests = {}
+_template_references = None
+# Templates loaded by the render in progress, see TrackingEnvironment.
+_loaded_templates = None
+# Seconds the render in progress spent loading and compiling templates.
+_template_load_seconds = 0.0
+# Stage timings and cache counters of the current run, see gen().
+profiler = Profiler()
+# True while gen(check=True) runs: caches are read but never written.
+_read_only = False
 
 
-def generate_dockerfiles(eol: bool = False):
-    """Generate the dockerfiles for this repo."""
-    file_loader = FileSystemLoader("template")
-    env = Environment(loader=file_loader)
-    entries = templates.entries(eol=eol)
-
-    for entry in entries:
-        settings = entry.copy()
-        family = settings["family"]
-        name = settings["name"]
-        settings["template_file"] = f"{family}.dockerfile.jinja"
-        settings["out_file"] = f"{family}/{name}.Dockerfile"
+def load_templates(
+    as_of: str | None = None, read_only: bool = False
+) -> Templates:
+    """Load the catalog snapshot shared by every generation step.
+
+    Args:
+        as_of: Optional ISO date EOL states are evaluated against; defaults
+            to ``DOCKERFILES_TEMPLATES_AS_OF`` or today.
+        read_only: Look the catalog up in its cache without storing it.
+    """
+    global templates
+    templates = Templates(
+        templates_path=CATALOG_PATH, as_of=as_of, read_only_cache=read_only
+    )
+    return templates
+
+
+class RenderJob(NamedTuple):
+    """One template rendered into one output file."""
+
+    out_file: str
+    template_file: str
+    context: object
+    # Tokens of the catalog entries the context is built from.
+    entries: tuple[str, ...] = ()
+
+
+class TrackingEnvironment(Environment):
+    """Environment that records the templates each render loads.
+
+    Includes, imports and extends all resolve through ``get_template`` or
+    ``select_template``, so this sees exactly the templates a render used,
+    including conditional includes that were actually taken.
+    """
+
+    def get_template(self, name, parent=None, globals=None):
+        """Load a template, noting its name for the current render."""
+        start = time.perf_counter()
+        template = super().get_template(name, parent, globals)
+        self._note(template, start)
+        return template
+
+    def select_template(self, names, parent=None, globals=None):
+        """Load the first existing template, noting the one selected."""
+        start = time.perf_counter()
+        template = super().select_template(names, parent, globals)
+        self._note(template, start)
+        return template
+
+    @staticmethod
+    def _note(template, start: float) -> None:
+        global _template_load_seconds
+        if _loaded_templates is not None:
+            _loaded_templates.add(template.name)
+            _template_load_seconds += time.perf_counter() - start
+
+
+def jinja_cache_dir() -> Path | None:
+    """Return the directory for compiled templates, or None if disabled.
+
+    In a read-only run the directory is not created.
+    """
+    if cache_disabled():
+        return None
+    directory = default_cache_dir() / "jinja"
+    if _read_only:
+        return directory if directory.is_dir() else None
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None
+    return directory
+
+
+class ReadOnlyBytecodeCache(FileSystemBytecodeCache):
+    """Bytecode cache that loads compiled templates but never writes."""
+
+    def dump_bytecode(self, bucket) -> None:
+        """Leave ``bucket`` unwritten."""
+
+
+def bytecode_cache() -> FileSystemBytecodeCache | None:
+    """Return the on-disk bytecode cache.
+
+    Compiled templates live under ``<cache dir>/jinja``, next to the
+    catalog cache. A read-only run gets a ``ReadOnlyBytecodeCache``.
+    """
+    directory = jinja_cache_dir()
+    if directory is None:
+        return None
+    if _read_only:
+        return ReadOnlyBytecodeCache(str(directory))
+    return FileSystemBytecodeCache(str(directory))
+
+
+def get_environment() -> Environment:
+    """Return this process's shared Jinja environment.
+
+    Read-only runs use an environment of their own, whose bytecode cache
+    does not write.
+    """
+    name = "read-only" if _read_only else "default"
+    env = _environments.get(name)
+    if env is None:
+        env = TrackingEnvironment(
+            loader=FileSystemLoader(TEMPLATE_DIR),
+            bytecode_cache=bytecode_cache(),
+        )
+        _environments[name] = env
+    return env
+
+
+def template_references(env: Environment, source: str) -> list:
+    """Return the templates ``source`` includes, imports or extends.
+
+    Results are kept in ``references.json`` next to the bytecode, keyed by
+    a hash of the source, so warm runs do not parse templates at all.
+    ``None`` marks a reference that cannot be resolved statically.
+    """
+    global _template_references
+    if _template_references is None:
+        directory = jinja_cache_dir()
+        cached = (
+            CatalogCache(directory).load("references", "jinja")
+            if directory
+            else None
+        )
+        _template_references = {"dirty": False, "items": cached or {}}
+    key = hashlib.sha256(source.encode()).hexdigest()
+    references = _template_references["items"].get(key)
+    profiler.cache(
+        "template references",
+        hits=references is not None,
+        misses=references is None,
+    )
+    if references is None:
+        references = list(meta.find_referenced_templates(env.parse(source)))
+        _template_references["items"][key] = references
+        _template_references["dirty"] = True
+    return references
+
+
+def save_template_references() -> None:
+    """Persist references found by ``template_references()`` this run.
+
+    Does nothing in a read-only run.
+    """
+    if _read_only:
+        return
+    directory = jinja_cache_dir()
+    if directory and _template_references and _template_references["dirty"]:
+        CatalogCache(directory).store(
+            "references", _template_references["items"], "jinja"
+        )
+        _template_references["dirty"] = False
+
+
+def precompile() -> list[str]:
+    """Compile every template into the bytecode cache.
+
+    Returns the names of the compiled templates.
+    """
+    env = get_environment()
+    names = env.list_templates()
+    for template_name in names:
+        env.get_template(template_name)
+        template_digest(env, template_name)
+    save_template_references()
+    return names
+
+
+def template_digest(env: Environment, name: str) -> str:
+    """Hash a template together with every template it includes.
+
+    Templates whose references cannot be resolved statically depend on
+    every template in the loader.
+    """
+    if name in _template_digests:
+        return _template_digests[name]
+
+    closure = {}
+    pending = [name]
+    while pending:
+        current = pending.pop()
+        if current in closure:
+            continue
+        source = env.loader.get_source(env, current)[0]
+        closure[current] = source
+        for referenced in template_references(env, source):
+            if referenced is None:
+                pending.extend(env.list_templates())
+            else:
+                pending.append(referenced)
+
+    digest = Manifest.key(
+        *(f"{item}\0{closure[item]}" for item in sorted(closure))
+    )
+    _template_digests[name] = digest
+    return digest
+
+
+def get_manifest() -> Manifest:
+    """Return the manifest of the current run, loading it on first use."""
+    global manifest
+    if manifest is None:
+        manifest = Manifest.load(MANIFEST_FILE)
+    return manifest
+
+
+def render_job(job: RenderJob) -> tuple[str, list[str], dict]:
+    """Render one job; runs in pool workers as well as in-process.
+
+    Returns the output, the names of every template it loaded, and the
+    seconds spent loading/compiling templates and rendering.
+    """
+    global _loaded_templates, _template_load_seconds
+    env = get_environment()
+    _loaded_templates = set()
+    _template_load_seconds = 0.0
+    start = time.perf_counter()
+    try:
+        output = env.get_template(job.template_file).render(job.context)
+        elapsed = time.perf_counter() - start
+        timings = {
+            "compile_seconds": _template_load_seconds,
+            "render_seconds": elapsed - _template_load_seconds,
+        }
+        return output, sorted(_loaded_templates), timings
+    finally:
+        _loaded_templates = None
+
+
+def get_render_cache() -> RenderCache | None:
+    """Return the render cache, or None if caching is disabled.
+
+    In a read-only run the cache is only looked up.
+    """
+    if cache_disabled():
+        return None
+    return RenderCache(read_only=_read_only)
+
+
+def render_outputs(
+    jobs: list[RenderJob],
+    workers: int = 1,
+    cache: RenderCache | None = None,
+):
+    """Render stale jobs and write them in job order.
+
+    Up-to-date outputs are skipped per the manifest. Stale outputs whose
+    key (template closure, render context and Jinja version) is in
+    ``cache`` are taken from it without rendering; the rest are rendered
+    and stored there. With ``workers`` > 1 the renders are spread across
+    a process pool; results are consumed in submission order, so files
+    are written in the same order and with the same content as a serial
+    run.
+    """
+    outputs = get_manifest()
+    stale = []
+    with profiler.stage("keys"):
+        for job in jobs:
+            key = Manifest.key(
+                jinja2.__version__,
+                template_digest(get_environment(), job.template_file),
+                context_digest(job.context),
+            )
+            if outputs.is_fresh(job.out_file, key):
+                outputs.skip(job.out_file)
+                profiler.output(job.out_file, "skipped")
+            else:
+                stale.append((job, key))
+    profiler.cache(
+        "manifest", hits=len(jobs) - len(stale), misses=len(stale)
+    )
+
+    cached = {}
+    if cache is not None:
+        with profiler.stage("render cache"):
+            for _, key in stale:
+                hit = cache.load(key)
+                if hit is not None:
+                    cached[key] = hit
+        profiler.cache(
+            "render", hits=len(cached), misses=len(stale) - len(cached)
+        )
+    pending = [job for job, key in stale if key not in cached]
+    if workers > 1 and len(pending) > 1:
+        workers = min(workers, len(pending))
+        chunksize = max(1, len(pending) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rendered = pool.map(render_job, pending, chunksize=chunksize)
+            _write_outputs(
+                outputs, stale, _merge_cached(stale, cached, rendered, cache)
+            )
+    else:
+        rendered = map(render_job, pending)
+        _write_outputs(
+            outputs, stale, _merge_cached(stale, cached, rendered, cache)
+        )
+
+
+def _merge_cached(stale: list, cached: dict, rendered, cache):
+    """Yield ``(output, templates, timings, source)`` in job order.
+
+    Fresh renders are stored in ``cache``.
+    """
+    rendered = iter(rendered)
+    for _, key in stale:
+        if key in cached:
+            output, used = cached[key]
+            yield output, used, {}, "cache"
+            continue
+        with profiler.stage("render"):
+            output, used, timings = next(rendered)
+        profiler.add_time("render.compile", timings["compile_seconds"])
+        profiler.add_time("render.execute", timings["render_seconds"])
+        if cache is not None:
+            with profiler.stage("render cache"):
+                cache.store(key, output, used)
+        yield output, used, timings, "rendered"
+
+
+def _write_outputs(outputs: Manifest, stale: list, rendered) -> None:
+    """Write rendered results paired with their jobs, in order."""
+    for (job, key), (output, used, timings, source) in zip(stale, rendered):
+        start = time.perf_counter()
+        written = outputs.write(job.out_file, key, output, templates=used)
+        seconds = time.perf_counter() - start
+        profiler.add_time("write", seconds)
+        profiler.output(
+            job.out_file,
+            source,
+            write_seconds=seconds,
+            bytes_written=len(output.encode()) if written else 0,
+            **timings,
+        )
+        if written:
+            log.info(f"Generating {job.out_file}")
+
+
+def dockerfile_jobs(eol: bool = False) -> list[RenderJob]:
+    """Return render jobs for the dockerfiles of this repo."""
+    jobs = []
+    for entry in templates.entries(eol=eol):
+        family = entry.family
+        name = entry.name
         template_file = f"{family}.dockerfile.jinja"
         out_file = f"{family}/{name}.Dockerfile"
-        # The jinja template
-        template = env.get_template(template_file)
-        output = template.render(settings)
-        log.info(f"Generating {out_file}")
-        os.makedirs(os.path.dirname(out_file), exist_ok=True)
-        dockerfile_out = open(out_file, "w")
-        dockerfile_out.write(output)
-        dockerfile_out.close()
+        settings = entry.to_render_context(
+            template_file=template_file, out_file=out_file
+        )
+        jobs.append(
+            RenderJob(
+                out_file, template_file, settings, entries=(entry.token,)
+            )
+        )
+    return jobs
 
 
-def generate_readmes():
-    """Generate the readme files."""
-    file_loader = FileSystemLoader("template")
-    env = Environment(loader=file_loader)
+def generate_dockerfiles(eol: bool = False, workers: int = 1):
+    """Generate the dockerfiles for this repo."""
+    render_outputs(dockerfile_jobs(eol=eol), workers)
+
+
+def readme_jobs() -> list[RenderJob]:
+    """Return render jobs for the per-family readme files."""
+    jobs = []
     repositories = templates.group_by("family").keys()
     for repository in repositories:
         dockerfiles = templates.entries(family=repository, eol=True)
         dockerfiles_for_readme = []
         for dockerfile in dockerfiles:
-            dockerfile_out = dockerfile.copy()
-            dockerfile_out["in_eol"] = templates.is_past_eol(dockerfile)
-            dockerfiles_for_readme.append(dockerfile_out)
+            dockerfiles_for_readme.append(
+                dockerfile.to_render_context(
+                    in_eol=templates.is_past_eol(dockerfile)
+                )
+            )
 
         if not dockerfiles_for_readme:
             continue
-        log.info("Generating readme for {}".format(repository))
-        readme_template = env.get_template("readme.md.jinja")
-        readme_output = readme_template.render(
-            {"repo_name": repository, "dockerfiles": dockerfiles_for_readme}
+        jobs.append(
+            RenderJob(
+                f"{repository}/README.md",
+                "readme.md.jinja",
+                {
+                    "repo_name": repository,
+                    "dockerfiles": dockerfiles_for_readme,
+                },
+                entries=tuple(dockerfile.token for dockerfile in dockerfiles),
+            )
         )
-        readme_file = f"{repository}/README.md"
-        os.makedirs(os.path.dirname(readme_file), exist_ok=True)
-        readme_out = open(readme_file, "w")
-        readme_out.write(readme_output)
-        readme_out.close()
+    return jobs
+
+
+def generate_readmes(workers: int = 1):
+    """Generate the readme files."""
+    render_outputs(readme_jobs(), workers)
 
 
 def get_compose_templates():
     """Get docker compose templates from templates folder."""
     suffix = ".docker-compose.yml.jinja"
     compose_templates = []
-    for entry in os.scandir("template"):
+    for entry in os.scandir(TEMPLATE_DIR):
         if not entry.is_file() or not entry.name.endswith(suffix):
             continue
         prefix = entry.name[: -len(suffix)]
@@ -86,80 +494,322 @@ def get_compose_templates():
     return compose_templates
 
 
-def generate_docker_compose(eol: bool = False):
-    """Generate the docker compose files."""
-    file_loader = FileSystemLoader("template")
-    env = Environment(loader=file_loader)
-
+def compose_jobs(eol: bool = False) -> list[RenderJob]:
+    """Return render jobs for the docker compose files."""
+    jobs = []
     compose_templates = get_compose_templates()
 
     for compose_template in compose_templates:
         group = compose_template["group"]
         family = compose_template["family"]
         template_file = compose_template["file"]
-        log.info(f"Template file: {template_file}")
-        template = env.get_template(template_file)
+        log.debug(f"Template file: {template_file}")
         entries = templates.entries(family=family, eol=eol)
         for entry in entries:
             name = entry["name"]
-            output = template.render(entry)
             out_file = f"docker-compose/{group}/{name}-docker-compose.yml"
-            log.info(f"Generating {out_file}")
-            os.makedirs(os.path.dirname(out_file), exist_ok=True)
-            compose_out = open(out_file, "w")
-            compose_out.write(output)
-            compose_out.close()
+            jobs.append(
+                RenderJob(
+                    out_file, template_file, entry, entries=(entry.token,)
+                )
+            )
+    return jobs
+
+
+def generate_docker_compose(eol: bool = False, workers: int = 1):
+    """Generate the docker compose files."""
+    render_outputs(compose_jobs(eol=eol), workers)
 
 
 def generate_tasks(eol: bool = False):
     """Generate tasks with available image names."""
-    log.info("Generating tasks.")
-    tasks_file = ".vscode/tasks.json"
+    tasks_file = TASKS_FILE
+    outputs = get_manifest()
+    image_tokens = templates.image_tokens(eol=eol)
+    key = Manifest.key("tasks", context_digest(image_tokens))
+    if outputs.is_fresh(tasks_file, key):
+        outputs.skip(tasks_file)
+        profiler.output(tasks_file, "skipped")
+        return
     with open(tasks_file, "r") as file:
         tasks = json_parser.load(file)
         for input in tasks["inputs"]:
             if input["id"] == "build_name":
-                input["options"] = templates.image_tokens(eol=eol)
-    with open(tasks_file, "w") as file:
-        json_parser.dump(tasks, file, indent=2)
-        file.write("\n")
+                input["options"] = image_tokens
+    output = json_parser.dumps(tasks, indent=2) + "\n"
+    _write_generated(outputs, tasks_file, key, output)
+
+
+def _write_generated(outputs: Manifest, out_file: str, key, output) -> None:
+    """Write an output built without a template, recording its profile."""
+    start = time.perf_counter()
+    written = outputs.write(out_file, key, output)
+    profiler.output(
+        out_file,
+        "rendered",
+        write_seconds=time.perf_counter() - start,
+        bytes_written=len(output.encode()) if written else 0,
+    )
+    if written:
+        log.info(f"Generating {out_file}")
+
+
+def generate_bake(out_files=None):
+    """Generate the docker-bake files from templates.yml.
+
+    Writes ``docker-bake.hcl``, the root ``docker-bake.json`` and one
+    ``bake/<family>.json`` per family, all from one ``BakeModel`` rather
+    than a template. Bake always includes all configured targets
+    (including EOL); only the ``default`` group leaves EOL targets out.
+    EOL filtering is handled by selection logic elsewhere
+    (build/workflows). ``out_files`` restricts which files are written.
+    """
+    outputs = get_manifest()
+    model = BakeModel.from_templates(templates)
+    files = {BAKE_HCL: model.to_hcl(), **model.json_files()}
+    for out_file, output in files.items():
+        if out_files is not None and out_file not in out_files:
+            continue
+        # The model is one cheap catalog pass; key on what it produced.
+        key = Manifest.key("bake", output)
+        _write_generated(outputs, out_file, key, output)
+
+
+def is_bake_output(out_file: str) -> bool:
+    """Return True for files written by ``generate_bake()``."""
+    return out_file in (BAKE_HCL, BAKE_JSON) or out_file.startswith(
+        f"{BAKE_DIR}/"
+    )
+
+
+def build_graph(jobs: list[RenderJob]) -> DependencyGraph:
+    """Build the graph from templates and catalog entries to outputs.
+
+    Template edges come from the include, extends and import nodes of each
+    template's AST. Outputs depend on the templates their last render
+    actually loaded, as recorded in the manifest, or on the static closure
+    of their template when no render was recorded yet.
+    """
+    graph = DependencyGraph()
+    env = get_environment()
+    names = env.list_templates()
+    for name in names:
+        graph.add(node(FILE, name), node(TEMPLATE, name))
+        source = env.loader.get_source(env, name)[0]
+        for referenced in template_references(env, source):
+            for used in names if referenced is None else [referenced]:
+                graph.add(node(TEMPLATE, used), node(TEMPLATE, name))
+
+    outputs = get_manifest()
+    for job in jobs:
+        target = node(OUTPUT, job.out_file)
+        record = outputs.record(job.out_file) or {}
+        loaded = record.get("templates") or []
+        if job.template_file in loaded:
+            for used in loaded:
+                graph.add(node(FILE, used), target)
+        else:
+            graph.add(node(TEMPLATE, job.template_file), target)
+        for token in job.entries:
+            graph.add(node(ENTRY, token), target)
+    for entry in templates.entries(eol=True):
+        # A family's bake file depends only on that family's entries.
+        for out_file in (
+            TASKS_FILE,
+            BAKE_HCL,
+            BAKE_JSON,
+            family_bake_file(entry.family),
+        ):
+            graph.add(node(ENTRY, entry.token), node(OUTPUT, out_file))
+    return graph
+
 
+def changed_nodes(paths) -> set[str]:
+    """Map changed file paths to dependency graph nodes.
 
-def generate_bake():
-    """Generate docker-bake.hcl from templates.yml.
+    Template files map to themselves. The catalog and schema map to every
+    entry, or, for a fragment of a ``templates.d/`` catalog, to the entries
+    that fragment declares. Other paths do not affect generation.
+    """
+    template_root = Path(TEMPLATE_DIR).resolve()
+    catalog = Path(CATALOG_PATH).resolve()
+    schema_root = Path(SCHEMA_DIR).resolve()
+    every_entry = {
+        node(ENTRY, token) for token in templates.image_tokens(eol=True)
+    }
+    nodes = set()
+    for path in paths:
+        resolved = Path(path).resolve()
+        if template_root in resolved.parents:
+            name = resolved.relative_to(template_root).as_posix()
+            nodes.add(node(FILE, name))
+        elif resolved == catalog or schema_root in resolved.parents:
+            nodes |= every_entry
+        elif catalog in resolved.parents:
+            fragment = resolved.relative_to(catalog).as_posix()
+            declared = {
+                node(ENTRY, entry.token)
+                for entry in templates.entries(eol=True)
+                if templates.fragment_of(entry) == fragment
+            }
+            # A removed fragment changes the catalog-wide outputs.
+            nodes |= declared or every_entry
+        else:
+            log.warning(f"Ignoring {path}: not a template or catalog file")
+    return nodes
+
+
+def gen(
+    log,
+    eol: bool = False,
+    as_of: str | None = None,
+    force: bool = False,
+    workers: int = 1,
+    changed=None,
+    check: bool = False,
+    profile: Profiler | None = None,
+) -> list[str]:
+    """Run all generation steps for dockerfiles, readmes, compose, and tasks.
+
+    Outputs whose templates, included snippets and render context are
+    unchanged since the last run (per ``.generate-manifest.json``) are
+    skipped; the others are taken from the content-addressed render cache
+    when any earlier run rendered the same inputs. ``force`` re-renders
+    everything without either. ``workers`` > 1 renders the remaining
+    outputs in a process pool. ``changed`` restricts the run to
+    outputs that depend on the given template or catalog files.
 
-    Bake always includes all configured targets (including EOL). EOL filtering
-    is handled by selection logic elsewhere (build/workflows).
+    With ``check``, every output is rendered in memory and compared with
+    the file on disk instead of written; returns the stale output paths.
+    Nothing is written then, including the manifest and the catalog,
+    render, bytecode and template reference caches.
+
+    Stage and per-output timings and cache hit rates are collected in
+    ``profile`` (a fresh ``Profiler`` if omitted), available afterwards
+    as the module's ``profiler``.
     """
-    file_loader = FileSystemLoader("template")
-    env = Environment(loader=file_loader, trim_blocks=True, lstrip_blocks=True)
+    global profiler, _read_only
+    profiler = profile if profile is not None else Profiler()
+    profiler.start()
+    _read_only = check
+    try:
+        return _gen(log, eol, as_of, force, workers, changed, check)
+    finally:
+        _read_only = False
+        profiler.stop()
+
 
-    template = env.get_template("docker-bake.hcl.jinja")
+def _gen(log, eol, as_of, force, workers, changed, check) -> list[str]:
+    """Run ``gen()`` with ``profiler`` set up."""
+    global manifest
+    if templates is None or as_of:
+        with profiler.stage("catalog"):
+            load_templates(as_of, read_only=check)
+        stats = templates.load_stats()
+        profiler.add_time("catalog.parse", stats["parse_seconds"])
+        profiler.add_time("catalog.validate", stats["validation_seconds"])
+        profiler.cache(
+            "catalog", hits=stats["cache_hits"], misses=stats["cache_misses"]
+        )
+    if check:
+        manifest = CheckManifest.load()
+    else:
+        manifest = Manifest(MANIFEST_FILE) if force else Manifest.load()
+    with profiler.stage("jobs"):
+        jobs = (
+            dockerfile_jobs(eol=eol) + readme_jobs() + compose_jobs(eol=eol)
+        )
+    cache = None if force else get_render_cache()
+    affected = None
+    if changed is not None:
+        with profiler.stage("graph"):
+            graph = build_graph(jobs)
+            affected = set(graph.outputs(changed_nodes(changed)))
+        jobs = [job for job in jobs if job.out_file in affected]
+        log.info(
+            f"{len(affected)} outputs depend on {', '.join(changed)}"
+        )
+    render_outputs(jobs, workers, cache)
+    with profiler.stage("bake"):
+        if affected is None:
+            generate_bake()
+        else:
+            bake_files = {f for f in affected if is_bake_output(f)}
+            if bake_files:
+                generate_bake(bake_files)
+    if affected is None or TASKS_FILE in affected:
+        with profiler.stage("tasks"):
+            generate_tasks(eol=eol)
+    with profiler.stage("finish"):
+        if cache is not None and not check:
+            cache.trim()
+        save_template_references()
+        for out_file in manifest.finish(complete=affected is None):
+            log.info(f"No longer generated: {out_file}")
+        manifest.save()
+    if check:
+        log.info(f"Checked outputs: {manifest.summary()}")
+        return manifest.outcomes("stale")
+    log.info(f"Generated outputs: {manifest.summary()}")
+    return []
 
-    # Always emit all bake targets/groups, but keep default as non-EOL.
-    all_settings = templates.group_by("family", eol=True)
-    active_settings = templates.group_by("family", eol=False)
 
-    output = template.render(
-        settings=all_settings,
-        active_settings=active_settings,
-        include_eol=True,
+def is_catalog_input(path: str) -> bool:
+    """Return True if ``path`` is the catalog, a fragment or the schema."""
+    resolved = Path(path).resolve()
+    return any(
+        resolved == root or root in resolved.parents
+        for root in (Path(CATALOG_PATH).resolve(), Path(SCHEMA_DIR).resolve())
     )
 
-    out_file = "docker-bake.hcl"
-    log.info(f"Generating {out_file}")
-    with open(out_file, "w") as f:
-        f.write(output)
 
+def watch_loop(
+    log,
+    eol: bool = False,
+    as_of: str | None = None,
+    workers: int = 1,
+    polling: bool = False,
+    iterations: int | None = None,
+):
+    """Regenerate affected outputs whenever templates or the catalog change.
 
-def gen(log, eol: bool = False):
-    """Run all generation steps for dockerfiles, readmes, compose, and tasks."""
-    log = log
-    generate_dockerfiles(eol=eol)
-    generate_readmes()
-    generate_docker_compose(eol=eol)
-    generate_bake()
-    generate_tasks(eol=eol)
+    The process stays warm: the catalog stays loaded and compiled templates
+    stay in the Jinja environment, so each change only re-renders the
+    outputs that depend on it. Errors are logged and watching continues.
+
+    Args:
+        log: Logger for progress and latency reports.
+        eol: Include expired end-of-life images too.
+        as_of: Date EOL states are evaluated against.
+        workers: Render processes per regeneration.
+        polling: Poll for changes instead of using inotify.
+        iterations: Stop after this many change batches (for tests).
+    """
+    gen(log, eol=eol, as_of=as_of, workers=workers)
+    paths = [TEMPLATE_DIR, CATALOG_PATH, SCHEMA_DIR]
+    with watch(paths, polling=polling) as watcher:
+        log.info(
+            f"Watching {', '.join(paths)} ({watcher.kind}); "
+            "press Ctrl+C to stop."
+        )
+        handled = 0
+        while iterations is None or handled < iterations:
+            changed = sorted(
+                os.path.relpath(path) for path in watcher.wait()
+            )
+            if not changed:
+                continue
+            handled += 1
+            start = time.perf_counter()
+            try:
+                if any(is_catalog_input(path) for path in changed):
+                    load_templates(as_of)
+                _template_digests.clear()
+                gen(log, eol=eol, workers=workers, changed=changed)
+            except Exception as error:  # keep watching after bad edits
+                log.error(f"Generation failed: {error}")
+            elapsed = (time.perf_counter() - start) * 1000
+            log.info(f"Handled {', '.join(changed)} in {elapsed:.1f} ms")
 
 
 def setup_logging():
@@ -179,10 +829,143 @@ def setup_logging():
     default=False,
     help="Include expired end-of-life images too.",
 )
-def main(eol: bool):
+@click.option(
+    "--as-of",
+    default=None,
+    metavar="YYYY-MM-DD",
+    help="Evaluate EOL dates as of this date instead of today.",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    default=False,
+    help="Re-render every output, ignoring the generate manifest.",
+)
+@click.option(
+    "--precompile",
+    "precompile_only",
+    is_flag=True,
+    default=False,
+    help="Compile every template into the bytecode cache and exit.",
+)
+@click.option(
+    "--changed",
+    multiple=True,
+    metavar="PATH",
+    help=(
+        "Only regenerate outputs depending on this template or catalog "
+        "file. Repeatable."
+    ),
+)
+@click.option(
+    "--watch",
+    "watch_mode",
+    is_flag=True,
+    default=False,
+    help="Keep running and regenerate affected outputs on every change.",
+)
+@click.option(
+    "--poll",
+    is_flag=True,
+    default=False,
+    help="With --watch, poll for changes instead of using inotify.",
+)
+@click.option(
+    "--check",
+    is_flag=True,
+    default=False,
+    help=(
+        "Render every output in memory and exit non-zero if any file on "
+        "disk is stale. Writes nothing."
+    ),
+)
+@click.option(
+    "--profile",
+    "profile_run",
+    is_flag=True,
+    default=False,
+    help=(
+        "Log a per-stage and per-output timing breakdown and write it to "
+        f"{PROFILE_FILE}."
+    ),
+)
+@click.option(
+    "--cprofile",
+    metavar="PATH",
+    default=None,
+    help="Also run under cProfile and dump pstats to PATH (implies --profile).",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Render in this many processes; 0 uses every CPU.",
+)
+def main(
+    eol: bool,
+    as_of: str | None,
+    force: bool,
+    precompile_only: bool,
+    changed: tuple[str, ...],
+    watch_mode: bool,
+    poll: bool,
+    check: bool,
+    profile_run: bool,
+    cprofile: str | None,
+    jobs: int,
+):
     """Generate Dockerfiles, compose files, readmes, and task entries."""
     setup_logging()
-    gen(log, eol=eol)
+    if precompile_only:
+        if cache_disabled():
+            log.warning("Template bytecode cache is disabled; nothing to do.")
+            return
+        names = precompile()
+        log.info(f"Precompiled {len(names)} templates.")
+        return
+    workers = jobs or os.cpu_count() or 1
+    if check and watch_mode:
+        raise click.UsageError("--check cannot be combined with --watch.")
+    if watch_mode:
+        try:
+            watch_loop(
+                log, eol=eol, as_of=as_of, workers=workers, polling=poll
+            )
+        except KeyboardInterrupt:
+            log.info("Stopped watching.")
+        return
+    profile = None
+    if profile_run or cprofile:
+        profile = Profiler(cprofile=bool(cprofile))
+    stale = gen(
+        log,
+        eol=eol,
+        as_of=as_of,
+        force=force,
+        workers=workers,
+        changed=changed or None,
+        check=check,
+        profile=profile,
+    )
+    if profile is not None:
+        log.info(profile.format())
+        if not check:
+            profile.save(PROFILE_FILE)
+            log.info(f"Wrote {PROFILE_FILE}")
+        if cprofile:
+            profile.dump_stats(cprofile)
+            log.info(f"Wrote cProfile statistics to {cprofile}")
+    if check:
+        if stale:
+            log.error(f"{len(stale)} generated files are stale:")
+            for out_file in stale:
+                log.error(f"  {out_file}")
+            log.error("Run ./generate.py and commit the results.")
+            sys.exit(1)
+        log.info("Generated files are up to date.")
+        return
     log.info("Finished generating dockerfiles.")
 
 
@@ -3,11 +3,20 @@
 
 from __future__ import annotations
 
+import tempfile
+import textwrap
 import unittest
+from datetime import date
+from pathlib import Path
+from unittest.mock import patch
 
+from dockerfiles_templates import api
+from dockerfiles_templates.platforms import PlatformRegistry
 from dockerfiles_templates import (
     Templates,
     canonical_platform,
+    default_as_of,
+    eol_is_past,
     filter_targets_by_platform,
     parse_platform,
     platforms_support,
@@ -64,6 +73,44 @@ class TemplatesApiTestCase(unittest.TestCase):
                 }
             )
 
+    def test_validation_modes(self) -> None:
+        settings = {
+            "dockerfiles": [
+                {
+                    "family": "ros2",
+                    "name": "jazzy",
+                    "distro": "jazzy",
+                    "base_image": "ubuntu:24.04",
+                    "targets": [
+                        {"target": "base", "platforms": ["linux/amd64"]}
+                    ],
+                }
+            ]
+        }
+        invalid = {"dockerfiles": [{"family": "ros2", "name": "jazzy"}]}
+        for mode in ("full", "first", "trusted"):
+            with self.assertRaisesRegex(ValueError, "dockerfiles.0"):
+                Templates.from_dict(invalid, validation=mode)
+        with self.assertRaises(ValueError):
+            Templates.from_dict(settings, validation="lazy")
+
+        Templates.from_dict(settings, validation="trusted")
+        with patch.object(
+            api, "compiled_validator", wraps=api.compiled_validator
+        ) as compiled:
+            Templates.from_dict(settings, validation="trusted")
+            compiled.assert_not_called()
+            Templates.from_dict(settings, validation="first")
+            compiled.assert_called_once()
+
+    def test_compiled_validator_is_cached(self) -> None:
+        schema = Path(api.__file__).resolve().parents[1] / "schema"
+        schema_path = schema / "templates.schema.json"
+        self.assertIs(
+            api.compiled_validator(schema_path),
+            api.compiled_validator(str(schema_path)),
+        )
+
     def test_entries_filters_family_eol_and_platform(self) -> None:
         templates = Templates.from_dict(
             {
@@ -144,6 +191,38 @@ class TemplatesApiTestCase(unittest.TestCase):
         self.assertIsNone(templates.get_entry("ros2", "foxy", eol=False))
         self.assertIsNotNone(templates.get_entry("ros2", "foxy", eol=True))
 
+    def test_as_of_snapshot(self) -> None:
+        settings = {
+            "dockerfiles": [
+                {
+                    "family": "ros2",
+                    "name": "humble",
+                    "distro": "humble",
+                    "base_image": "ubuntu:22.04",
+                    "eol": "2027-05-31",
+                    "targets": [
+                        {"target": "base", "platforms": ["linux/amd64"]}
+                    ],
+                }
+            ]
+        }
+        before = Templates.from_dict(settings, as_of="2027-05-30")
+        after = Templates.from_dict(settings, as_of=date(2027, 5, 31))
+        self.assertEqual(before.as_of, date(2027, 5, 30))
+        self.assertEqual([e.name for e in before.active()], ["humble"])
+        self.assertEqual(before.eol(), ())
+        self.assertEqual(after.active(), ())
+        self.assertEqual([e.name for e in after.eol()], ["humble"])
+        self.assertIsNone(after.get_entry("ros2", "humble"))
+
+        with patch.dict(
+            "os.environ", {"DOCKERFILES_TEMPLATES_AS_OF": "2027-06-01"}
+        ):
+            self.assertEqual(default_as_of(), date(2027, 6, 1))
+            self.assertEqual(Templates.from_dict(settings).active(), ())
+        self.assertTrue(eol_is_past("2027-05-31", as_of="2027-05-31"))
+        self.assertFalse(eol_is_past("2027-05-31", as_of="2027-05-30"))
+
     def test_targets_for_platform(self) -> None:
         templates = Templates.from_dict(
             {
@@ -166,6 +245,146 @@ class TemplatesApiTestCase(unittest.TestCase):
         targets = templates.targets_for_platform(entry, "linux/arm64")
         self.assertEqual([t["target"] for t in targets], ["dev"])
 
+    def test_group_by_images_and_tokens(self) -> None:
+        templates = Templates.from_dict(
+            {
+                "dockerfiles": [
+                    {
+                        "family": "ros2",
+                        "name": "foxy",
+                        "distro": "foxy",
+                        "base_image": "ubuntu:20.04",
+                        "eol": "2020-01-01",
+                        "targets": [
+                            {"target": "base", "platforms": ["linux/amd64"]}
+                        ],
+                    },
+                    {
+                        "family": "gz",
+                        "name": "harmonic",
+                        "distro": "harmonic",
+                        "base_image": "ubuntu:22.04",
+                        "targets": [
+                            {"target": "base", "platforms": ["linux/arm"]}
+                        ],
+                    },
+                    {
+                        "family": "ros2",
+                        "name": "jazzy",
+                        "distro": "jazzy",
+                        "base_image": "ubuntu:24.04",
+                        "targets": [
+                            {"target": "base", "platforms": ["linux/amd64"]},
+                            {"target": "dev", "platforms": ["linux/amd64"]},
+                        ],
+                    },
+                ]
+            }
+        )
+
+        groups = templates.group_by("family")
+        self.assertEqual(list(groups), ["gz", "ros2"])
+        self.assertEqual([e["name"] for e in groups["ros2"]], ["jazzy"])
+
+        groups = templates.group_by("family", eol=True)
+        self.assertEqual(list(groups), ["ros2", "gz"])
+        self.assertEqual(
+            [e["name"] for e in groups["ros2"]], ["foxy", "jazzy"]
+        )
+
+        groups = templates.group_by("base_image", platform="linux/arm/v7")
+        self.assertEqual(list(groups), ["ubuntu:22.04"])
+
+        self.assertEqual(templates.image_tokens(), ["gz-harmonic", "ros2-jazzy"])
+        self.assertEqual(
+            templates.images()["ros2"]["jazzy"]["targets"], ["base", "dev"]
+        )
+        self.assertEqual(
+            templates.image_definition("ros2-foxy", eol=True)["targets"],
+            ["base"],
+        )
+        with self.assertRaises(KeyError):
+            templates.image_definition("ros2-foxy")
+        with self.assertRaises(ValueError):
+            templates.group_by("targets")
+
+    def test_build_matrix_filters_and_groups(self) -> None:
+        templates = Templates.from_dict(
+            {
+                "dockerfiles": [
+                    {
+                        "family": "ros2",
+                        "name": "foxy",
+                        "distro": "foxy",
+                        "base_image": "ubuntu:20.04",
+                        "eol": "2020-01-01",
+                        "targets": [
+                            {"target": "base", "platforms": ["linux/amd64"]}
+                        ],
+                    },
+                    {
+                        "family": "ros2",
+                        "name": "jazzy",
+                        "distro": "jazzy",
+                        "base_image": "ubuntu:24.04",
+                        "targets": [
+                            {
+                                "target": "base",
+                                "platforms": ["linux/amd64", "linux/arm/v7"],
+                            },
+                            {"target": "dev", "platforms": ["linux/amd64"]},
+                        ],
+                    },
+                    {
+                        "family": "gz",
+                        "name": "harmonic",
+                        "distro": "harmonic",
+                        "base_image": "ubuntu:22.04",
+                        "targets": [
+                            {"target": "base", "platforms": ["linux/arm"]}
+                        ],
+                    },
+                ]
+            }
+        )
+
+        matrix = templates.matrix(eol=True)
+        self.assertEqual(len(matrix), 5)
+        self.assertIs(templates.matrix(eol=True), matrix)
+        first = next(iter(matrix))
+        self.assertEqual(first.target, "ros2-foxy-base")
+        self.assertEqual(first.tags, ("ros2:foxy-base",))
+        self.assertTrue(first.eol)
+
+        active = templates.matrix()
+        self.assertEqual(
+            active.unique("family", "name"),
+            [("ros2", "jazzy"), ("gz", "harmonic")],
+        )
+        self.assertEqual(
+            templates.matrix(family="ros2").unique("stage", "platform"),
+            [
+                ("base", "linux/amd64"),
+                ("base", "linux/arm/v7"),
+                ("dev", "linux/amd64"),
+            ],
+        )
+        self.assertEqual(
+            templates.matrix(platform="linux/arm/v7").unique("target"),
+            ["ros2-jazzy-base", "gz-harmonic-base"],
+        )
+        self.assertEqual(
+            templates.matrix(changed={("gz", "harmonic")}).unique("target"),
+            ["gz-harmonic-base"],
+        )
+
+        groups = active.groups(("name", "platform_group"), "target")
+        self.assertEqual(
+            groups[("jazzy", "linux-amd64")],
+            ["ros2-jazzy-base", "ros2-jazzy-dev"],
+        )
+        self.assertEqual(groups[("jazzy", "linux-arm")], ["ros2-jazzy-base"])
+
     def test_platform_helpers(self) -> None:
         self.assertEqual(parse_platform("amd64"), ("linux", "amd64", None))
         self.assertEqual(parse_platform("linux/arm/v7"), ("linux", "arm", "v7"))
@@ -181,6 +400,219 @@ class TemplatesApiTestCase(unittest.TestCase):
         filtered = filter_targets_by_platform(targets, "linux/arm64")
         self.assertEqual([t["target"] for t in filtered], ["dev"])
 
+    def test_platform_registry_masks(self) -> None:
+        registry = PlatformRegistry()
+        declared = registry.mask(["linux/amd64", "linux/arm"])
+        self.assertEqual(registry.id("linux-amd64"), registry.id("amd64"))
+        self.assertTrue(declared & registry.query_mask("linux/arm/v7"))
+        self.assertTrue(declared & registry.query_mask("linux/arm"))
+        self.assertFalse(declared & registry.query_mask("linux/arm64"))
+
+        variant_only = registry.mask(["linux/arm/v7"])
+        self.assertFalse(variant_only & registry.query_mask("linux/arm"))
+        self.assertFalse(variant_only & registry.query_mask("linux/arm/v6"))
+        self.assertEqual(
+            [str(p) for p in registry.platforms(declared)],
+            ["linux/amd64", "linux/arm"],
+        )
+
+
+class TemplatesCacheTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmpdir.name)
+        self.cache_dir = self.root / "cache"
+        self.templates_path = self.root / "templates.yml"
+        self._write("jazzy")
+
+    def tearDown(self) -> None:
+        self._tmpdir.cleanup()
+
+    def _write(self, name: str) -> None:
+        self.templates_path.write_text(
+            textwrap.dedent(
+                f"""
+                dockerfiles:
+                  - family: ros2
+                    name: {name}
+                    distro: {name}
+                    base_image: ubuntu:24.04
+                    targets:
+                      - target: base
+                        platforms: [linux/amd64]
+                """
+            ),
+            encoding="utf-8",
+        )
+
+    def _load(self, **kwargs) -> Templates:
+        return Templates(
+            templates_path=self.templates_path,
+            cache_dir=self.cache_dir,
+            **kwargs,
+        )
+
+    def test_repeat_load_skips_parsing_and_validation(self) -> None:
+        self._load()
+        with patch.object(api, "load_yaml") as load, patch.object(
+            Templates, "validate_settings"
+        ) as validate:
+            templates = self._load()
+        load.assert_not_called()
+        validate.assert_not_called()
+        self.assertEqual(templates.image_tokens(), ["ros2-jazzy"])
+
+    def test_edit_invalidates_cache(self) -> None:
+        self.assertEqual(self._load().changed_fragments(), ("templates.yml",))
+        self.assertEqual(self._load().changed_entries(), frozenset())
+        self._write("kilted")
+        templates = self._load()
+        self.assertEqual(templates.image_tokens(), ["ros2-kilted"])
+        self.assertEqual(templates.changed_entries(), {("ros2", "kilted")})
+
+    def test_load_records_state_only_when_asked(self) -> None:
+        self._load()
+        self.assertEqual(list(self.cache_dir.glob("state-*.json")), [])
+        self._load().changed_fragments()
+        self.assertEqual(len(list(self.cache_dir.glob("state-*.json"))), 1)
+
+    def test_invalid_edit_is_not_recorded(self) -> None:
+        self._load().changed_fragments()
+        self.templates_path.write_text("dockerfiles: {}\n", encoding="utf-8")
+        with self.assertRaises(ValueError):
+            self._load()
+        self._write("jazzy")
+        self.assertEqual(self._load().changed_fragments(), ())
+
+    def test_cache_opt_out(self) -> None:
+        self._load(cache=False)
+        self.assertFalse(self.cache_dir.exists())
+        with patch.dict("os.environ", {"DOCKERFILES_TEMPLATES_NO_CACHE": "1"}):
+            self._load()
+        self.assertFalse(self.cache_dir.exists())
+
+    def test_round_trip_save_preserves_comments(self) -> None:
+        text = self.templates_path.read_text(encoding="utf-8")
+        self.templates_path.write_text(
+            "# catalog comment\n" + text, encoding="utf-8"
+        )
+        templates = self._load(round_trip=True)
+        out_path = self.root / "out.yml"
+        templates.save(out_path)
+        self.assertIn("# catalog comment", out_path.read_text("utf-8"))
+        self.assertFalse(self.cache_dir.exists())
+        with self.assertRaises(ValueError):
+            self._load().save(out_path)
+
+    def test_read_only_load_returns_plain_data(self) -> None:
+        entry = self._load(cache=False).raw()[0]
+        self.assertIs(type(entry), dict)
+        self.assertIs(type(entry["targets"]), list)
+        self.assertIs(type(entry["name"]), str)
+
+
+class TemplatesFragmentsTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmpdir.name)
+        self.cache_dir = self.root / "cache"
+        self.catalog = self.root / "templates.d"
+        self._write("ros2/jazzy.yml", "ros2", "jazzy")
+        self._write("gz/harmonic.yml", "gz", "harmonic")
+
+    def tearDown(self) -> None:
+        self._tmpdir.cleanup()
+
+    def _write(
+        self, fragment: str, family: str, name: str, base: str = "24.04"
+    ) -> None:
+        path = self.catalog / fragment
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            textwrap.dedent(
+                f"""
+                dockerfiles:
+                  - family: {family}
+                    name: {name}
+                    distro: {name}
+                    base_image: ubuntu:{base}
+                    targets:
+                      - target: base
+                        platforms: [linux/amd64]
+                """
+            ),
+            encoding="utf-8",
+        )
+
+    def _load(self, **kwargs) -> Templates:
+        return Templates(
+            templates_path=self.catalog, cache_dir=self.cache_dir, **kwargs
+        )
+
+    def test_merges_fragments_in_path_order(self) -> None:
+        templates = self._load()
+        self.assertEqual(
+            list(templates.fragments()), ["gz/harmonic.yml", "ros2/jazzy.yml"]
+        )
+        self.assertEqual(
+            templates.image_tokens(), ["gz-harmonic", "ros2-jazzy"]
+        )
+        entry = templates.get_entry("ros2", "jazzy")
+        self.assertEqual(templates.fragment_of(entry), "ros2/jazzy.yml")
+
+    def test_hidden_and_editor_files_are_not_fragments(self) -> None:
+        (self.catalog / "ros2" / ".#jazzy.yml").write_text("{", "utf-8")
+        (self.catalog / ".hidden").mkdir()
+        (self.catalog / ".hidden" / "x.yml").write_text("{", "utf-8")
+        self.assertEqual(
+            list(self._load().fragments()),
+            ["gz/harmonic.yml", "ros2/jazzy.yml"],
+        )
+
+    def test_edit_reparses_only_changed_fragment(self) -> None:
+        first = self._load()
+        self.assertEqual(
+            first.changed_fragments(), ("gz/harmonic.yml", "ros2/jazzy.yml")
+        )
+        self.assertEqual(self._load().changed_fragments(), ())
+
+        self._write("ros2/jazzy.yml", "ros2", "jazzy", base="24.10")
+        with patch.object(api, "load_yaml", wraps=api.load_yaml) as load:
+            templates = self._load()
+        self.assertEqual(load.call_count, 1)
+        self.assertEqual(templates.changed_fragments(), ("ros2/jazzy.yml",))
+        self.assertEqual(templates.changed_entries(), {("ros2", "jazzy")})
+        self.assertEqual(
+            templates.get_entry("ros2", "jazzy")["base_image"], "ubuntu:24.10"
+        )
+
+        (self.catalog / "gz/harmonic.yml").unlink()
+        templates = self._load()
+        self.assertEqual(templates.changed_fragments(), ("gz/harmonic.yml",))
+        self.assertEqual(templates.changed_entries(), frozenset())
+
+    def test_cache_entries_are_per_yaml_loader(self) -> None:
+        self._load()
+        with patch.object(
+            api, "safe_loader_name", return_value="other-loader"
+        ):
+            templates = self._load()
+        self.assertEqual(templates.load_stats()["cache_hits"], 0)
+        self.assertEqual(self._load().load_stats()["cache_misses"], 0)
+
+    def test_fragment_errors_name_the_fragment(self) -> None:
+        self._write("ros2/dup.yml", "ros2", "jazzy")
+        with self.assertRaisesRegex(ValueError, "ros2/dup.yml, ros2/jazzy"):
+            self._load()
+
+        (self.catalog / "ros2/dup.yml").write_text(
+            "dockerfiles: [{family: ros2}]\n", encoding="utf-8"
+        )
+        with self.assertRaisesRegex(ValueError, "^ros2/dup.yml failed"):
+            self._load(cache=False)
+        with self.assertRaises(ValueError):
+            self._load(round_trip=True)
+
 
 if __name__ == "__main__":
     unittest.main()
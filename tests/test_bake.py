@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""Unit tests for dockerfiles_templates.bake."""
+
+from __future__ import annotations
+
+import json
+import re
+import unittest
+
+from dockerfiles_templates import Templates
+from dockerfiles_templates.bake import (
+    BakeModel,
+    bake_files,
+    cache_attributes,
+    parse_cache,
+)
+
+
+def _entry(family: str, name: str, eol: str, targets: list) -> dict:
+    return {
+        "family": family,
+        "name": name,
+        "distro": name,
+        "base_image": "ubuntu:24.04",
+        "eol": eol,
+        "targets": targets,
+    }
+
+
+def _templates() -> Templates:
+    return Templates.from_dict(
+        {
+            "dockerfiles": [
+                _entry(
+                    "ros2",
+                    "jazzy",
+                    "2099-01-01",
+                    [
+                        {
+                            "target": "base",
+                            "platforms": ["linux/amd64", "linux/arm/v7"],
+                        },
+                        {"target": "dev", "platforms": ["linux/arm/v8"]},
+                    ],
+                ),
+                _entry(
+                    "gz",
+                    "garden",
+                    "2020-01-01",
+                    [{"target": "base", "platforms": ["linux/amd64"]}],
+                ),
+                _entry(
+                    "ros2",
+                    "foxy",
+                    "2020-01-01",
+                    [{"target": "base", "platforms": ["linux/amd64"]}],
+                ),
+                _entry(
+                    "gz",
+                    "harmonic",
+                    "2099-01-01",
+                    [{"target": "base", "platforms": ["linux/amd64"]}],
+                ),
+            ]
+        },
+        as_of="2026-01-01",
+    )
+
+
+class BakeModelTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.model = BakeModel.from_templates(_templates())
+
+    def test_groups_cover_releases_platforms_families_and_default(self) -> None:
+        groups = self.model.groups()
+        self.assertEqual(
+            list(self.model.targets()),
+            [
+                "ros2-jazzy-base",
+                "ros2-jazzy-dev",
+                "ros2-foxy-base",
+                "gz-garden-base",
+                "gz-harmonic-base",
+            ],
+        )
+        self.assertEqual(
+            groups["ros2-jazzy"], ("ros2-jazzy-base", "ros2-jazzy-dev")
+        )
+        self.assertEqual(
+            groups["ros2-jazzy-linux-arm"],
+            ("ros2-jazzy-base", "ros2-jazzy-dev"),
+        )
+        self.assertEqual(groups["ros2-jazzy-linux-amd64"], ("ros2-jazzy-base",))
+        self.assertEqual(groups["gz"], ("gz-garden-base", "gz-harmonic-base"))
+        self.assertEqual(
+            groups["default"],
+            ("ros2-jazzy-base", "ros2-jazzy-dev", "gz-harmonic-base"),
+        )
+
+    def test_json_files_together_match_hcl(self) -> None:
+        hcl = self.model.to_hcl()
+        files = self.model.json_files()
+        self.assertEqual(
+            list(files),
+            ["docker-bake.json", "bake/ros2.json", "bake/gz.json"],
+        )
+        document = {"group": {}, "target": {}}
+        for content in files.values():
+            for kind, items in json.loads(content).items():
+                document.setdefault(kind, {}).update(items)
+        self.assertEqual(
+            set(document["target"]),
+            set(re.findall(r'^target "([^"]+)"', hcl, re.M)),
+        )
+        self.assertEqual(
+            set(document["group"]),
+            set(re.findall(r'^group "([^"]+)"', hcl, re.M)),
+        )
+        self.assertEqual(
+            document["target"]["gz-harmonic-base"],
+            {
+                "context": "gz",
+                "dockerfile": "harmonic.Dockerfile",
+                "target": "base",
+                "tags": ["${REGISTRY}/gz:harmonic-base"],
+            },
+        )
+        self.assertEqual(
+            document["variable"], {"REGISTRY": {"default": "althack"}}
+        )
+        ros2 = json.loads(files["bake/ros2.json"])
+        self.assertNotIn("gz-harmonic-base", ros2["target"])
+        self.assertNotIn("default", ros2["group"])
+
+    def test_bake_files_selects_the_family_of_a_ref(self) -> None:
+        families = ["ros2", "gz"]
+        self.assertEqual(
+            bake_files("ros2-jazzy-base", families),
+            ["docker-bake.json", "bake/ros2.json"],
+        )
+        self.assertEqual(
+            bake_files("gz", families), ["docker-bake.json", "bake/gz.json"]
+        )
+        self.assertEqual(
+            bake_files("default", families),
+            ["docker-bake.json", "bake/ros2.json", "bake/gz.json"],
+        )
+
+    def test_output_is_byte_stable(self) -> None:
+        again = BakeModel.from_templates(_templates())
+        self.assertEqual(again.to_hcl(), self.model.to_hcl())
+        self.assertEqual(again.json_files(), self.model.json_files())
+        self.assertFalse(self.model.to_hcl().endswith("\n"))
+        self.assertTrue(self.model.root_json().endswith("}\n"))
+
+
+class CacheAttributesTestCase(unittest.TestCase):
+    def test_backends_use_stable_scopes_and_mode_max(self) -> None:
+        self.assertEqual(
+            cache_attributes(
+                "local:/tmp/cache/", "ros2-jazzy-base", "linux/arm/v7"
+            ),
+            {
+                "cache-from": "type=local,"
+                "src=/tmp/cache/ros2-jazzy-base-linux-arm-v7",
+                "cache-to": "type=local,"
+                "dest=/tmp/cache/ros2-jazzy-base-linux-arm-v7,mode=max",
+            },
+        )
+        self.assertEqual(
+            cache_attributes(
+                "registry:localhost:5000/cache",
+                "gz-harmonic-dev",
+                "linux/amd64",
+            ),
+            {
+                "cache-from": "type=registry,"
+                "ref=localhost:5000/cache:gz-harmonic-dev-linux-amd64",
+                "cache-to": "type=registry,"
+                "ref=localhost:5000/cache:gz-harmonic-dev-linux-amd64,mode=max",
+            },
+        )
+        self.assertEqual(
+            cache_attributes("none", "gz-harmonic-dev", "linux/amd64"), {}
+        )
+
+    def test_invalid_specs_are_rejected(self) -> None:
+        self.assertEqual(parse_cache("none"), ("none", ""))
+        self.assertEqual(
+            parse_cache("registry:localhost:5000/ci/cache"),
+            ("registry", "localhost:5000/ci/cache"),
+        )
+        for spec in (
+            "local",
+            "local:",
+            "registry:",
+            "gha:x",
+            "none:x",
+            "registry:localhost:5000/c:latest",
+            "registry:althack/cache@sha256:0123",
+        ):
+            with self.subTest(spec=spec), self.assertRaises(ValueError):
+                parse_cache(spec)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""Unit tests for build.py."""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import unittest
+from datetime import date
+from unittest.mock import patch
+
+import build
+
+
+class BuildPushTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.state_file = os.path.join(tmpdir.name, "state.json")
+        state = patch.object(build, "STATE_FILE", self.state_file)
+        state.start()
+        self.addCleanup(state.stop)
+
+    def test_push_bakes_a_group_in_one_invocation(self) -> None:
+        targets = {"ros2-jazzy-base": {}, "ros2-jazzy-dev": {}}
+        with patch.object(
+            build.subprocess,
+            "check_output",
+            return_value=json.dumps({"target": targets}),
+        ), patch.object(build.subprocess, "run") as run, patch.dict(
+            os.environ, {"DOCKER_REGISTRY": "althack", "DOCKER_CLEAN": ""}
+        ):
+            build.build(
+                "ros2-jazzy", push=True, clean=False, as_of=date(2026, 9, 1)
+            )
+
+        run.assert_called_once()
+        cmd = run.call_args.args[0]
+        self.assertEqual(cmd[-1], "ros2-jazzy")
+        self.assertIn("--push", cmd)
+        sets = [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "--set"]
+        self.assertEqual(
+            sets,
+            [
+                "ros2-jazzy-base.tags=althack/ros2:jazzy-base,"
+                "althack/ros2:jazzy-base-2026-09-01",
+                "ros2-jazzy-dev.tags=althack/ros2:jazzy-dev,"
+                "althack/ros2:jazzy-dev-2026-09-01",
+            ],
+        )
+        files = [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "--file"]
+        self.assertEqual(
+            files,
+            [
+                str(build.REPO_ROOT / "docker-bake.json"),
+                str(build.REPO_ROOT / "bake" / "ros2.json"),
+            ],
+        )
+
+    def test_jobs_schedule_targets_along_the_stage_graph(self) -> None:
+        targets = {
+            f"ros2-humble-{stage}": {}
+            for stage in ("base", "dev", "desktop", "full", "gazebo")
+        }
+        with patch.object(
+            build.subprocess,
+            "check_output",
+            return_value=json.dumps({"target": targets}),
+        ), patch.object(build.subprocess, "run") as run, patch.dict(
+            os.environ, {"DOCKER_REGISTRY": "althack", "DOCKER_CLEAN": ""}
+        ):
+            build.build(
+                "ros2-humble",
+                push=False,
+                clean=False,
+                as_of=date(2026, 9, 1),
+                jobs=2,
+            )
+
+        built = [call.args[0][-1] for call in run.call_args_list]
+        self.assertEqual(built, list(targets))
+        self.assertTrue(
+            all("--load" in call.args[0] for call in run.call_args_list)
+        )
+
+    def test_cache_sets_per_target_cache_attributes(self) -> None:
+        targets = {"gz-harmonic-base": {}, "gz-harmonic-dev": {}}
+
+        def check_output(cmd, text):
+            if cmd[:2] == ["docker", "version"]:
+                return "linux/amd64\n"
+            return json.dumps({"target": targets})
+
+        with patch.object(
+            build.subprocess, "check_output", side_effect=check_output
+        ), patch.object(build.subprocess, "run") as run, patch.dict(
+            os.environ, {"DOCKER_PUSH": "", "DOCKER_CLEAN": ""}
+        ):
+            build.build(
+                "gz-harmonic",
+                push=False,
+                clean=False,
+                cache="local:/var/cache/bake",
+            )
+
+        cmd = run.call_args.args[0]
+        self.assertIn("--load", cmd)
+        sets = [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "--set"]
+        self.assertEqual(
+            sets,
+            [
+                "gz-harmonic-base.cache-from=type=local,"
+                "src=/var/cache/bake/gz-harmonic-base-linux-amd64",
+                "gz-harmonic-base.cache-to=type=local,"
+                "dest=/var/cache/bake/gz-harmonic-base-linux-amd64,mode=max",
+                "gz-harmonic-dev.cache-from=type=local,"
+                "src=/var/cache/bake/gz-harmonic-dev-linux-amd64",
+                "gz-harmonic-dev.cache-to=type=local,"
+                "dest=/var/cache/bake/gz-harmonic-dev-linux-amd64,mode=max",
+            ],
+        )
+        self.assertEqual(cmd[-1], "gz-harmonic")
+
+    def test_skip_unchanged_builds_only_changed_targets(self) -> None:
+        targets = {"ros2-jazzy-base": {}, "ros2-jazzy-dev": {}}
+        with patch.object(
+            build.subprocess,
+            "check_output",
+            return_value=json.dumps({"target": targets}),
+        ), patch.object(build.subprocess, "run") as run, patch.object(
+            build.DockerBake, "image_exists", return_value=True
+        ) as image_exists, patch.dict(
+            os.environ, {"DOCKER_PUSH": "", "DOCKER_CLEAN": ""}
+        ):
+            build.build("ros2-jazzy", push=False, clean=False)
+            self.assertEqual(run.call_args.args[0][-1], "ros2-jazzy")
+
+            run.reset_mock()
+            with self.assertLogs(build.log, "INFO") as logs:
+                build.build(
+                    "ros2-jazzy", push=False, clean=False, skip_unchanged=True
+                )
+            run.assert_not_called()
+            self.assertIn("Skipping 2 unchanged targets", logs.output[0])
+            image_exists.assert_any_call("althack/ros2:jazzy-base")
+
+            state = build.BuildState.load(self.state_file)
+            state.record("ros2-jazzy-dev", "outdated", 1.0, push=False)
+            state.save()
+            build.build(
+                "ros2-jazzy", push=False, clean=False, skip_unchanged=True
+            )
+            self.assertEqual(run.call_args.args[0][-1], "ros2-jazzy-dev")
+
+            run.reset_mock()
+            image_exists.side_effect = lambda image: "dev" not in image
+            build.build(
+                "ros2-jazzy", push=False, clean=False, skip_unchanged=True
+            )
+            self.assertEqual(run.call_args.args[0][-1], "ros2-jazzy-dev")
+
+    def test_skip_unchanged_retags_pushes_and_rebuilds_for_a_registry(
+        self,
+    ) -> None:
+        targets = {"ros2-jazzy-base": {}}
+        with patch.object(
+            build.subprocess,
+            "check_output",
+            return_value=json.dumps({"target": targets}),
+        ), patch.object(build.subprocess, "run") as run, patch.dict(
+            os.environ, {"DOCKER_REGISTRY": "althack", "DOCKER_CLEAN": ""}
+        ):
+            build.build(
+                "ros2-jazzy-base",
+                push=True,
+                clean=False,
+                as_of=date(2026, 9, 1),
+            )
+            run.reset_mock()
+            build.build(
+                "ros2-jazzy-base",
+                push=True,
+                clean=False,
+                as_of=date(2026, 9, 2),
+                skip_unchanged=True,
+            )
+            run.assert_called_once()
+            self.assertEqual(
+                run.call_args.args[0],
+                [
+                    "docker",
+                    "buildx",
+                    "imagetools",
+                    "create",
+                    "--tag",
+                    "althack/ros2:jazzy-base-2026-09-02",
+                    "althack/ros2:jazzy-base",
+                ],
+            )
+
+            with patch.dict(os.environ, {"DOCKER_REGISTRY": "myfork"}):
+                build.build(
+                    "ros2-jazzy-base",
+                    push=True,
+                    clean=False,
+                    as_of=date(2026, 9, 1),
+                    skip_unchanged=True,
+                )
+            cmd = run.call_args.args[0]
+            self.assertIn(
+                "ros2-jazzy-base.tags=myfork/ros2:jazzy-base,"
+                "myfork/ros2:jazzy-base-2026-09-01",
+                cmd,
+            )
+
+
+class PruneTestCase(unittest.TestCase):
+    def test_parse_prune(self) -> None:
+        self.assertEqual(build.parse_prune("dangling"), ("dangling", ""))
+        self.assertEqual(
+            build.parse_prune("buildcache-keep=20GB"),
+            ("buildcache-keep", "20GB"),
+        )
+        self.assertEqual(build.parse_prune("age=7d"), ("age", "168h"))
+        self.assertEqual(build.parse_prune("age=1h30m"), ("age", "5400s"))
+        for policy in ("all", "none=1", "buildcache-keep=lots", "age=0h"):
+            with self.subTest(policy=policy), self.assertRaises(ValueError):
+                build.parse_prune(policy)
+
+    def test_prune_removes_only_superseded_project_images(self) -> None:
+        def check_output(cmd, text):
+            if "dangling=true" in cmd:
+                return "sha256:old\nsha256:foreign\n"
+            if "--format" in cmd:
+                return "sha256:new\n"
+            return json.dumps({"target": {"ros2-jazzy-base": {}}})
+
+        baker = build.DockerBake(registry="althack")
+        with patch.object(
+            build.subprocess, "check_output", side_effect=check_output
+        ), patch.object(build.subprocess, "run") as run:
+            baker.prune("age=3d", before={"sha256:old", "sha256:kept"})
+
+        commands = [call.args[0] for call in run.call_args_list]
+        self.assertEqual(
+            commands,
+            [
+                ["docker", "image", "rm", "sha256:old"],
+                ["docker", "buildx", "prune", "-f", "--filter", "until=72h"],
+            ],
+        )
+        self.assertNotIn(["docker", "system", "prune", "-f"], commands)
+
+    def test_build_snapshots_project_images_before_pruning(self) -> None:
+        images = iter(["sha256:old\n", "sha256:new\n"])
+
+        def check_output(cmd, text):
+            if "dangling=true" in cmd:
+                return "sha256:old\n"
+            if "--format" in cmd:
+                self.assertIn("reference=althack/ros2:*", cmd)
+                return next(images)
+            return json.dumps({"target": {"ros2-jazzy-base": {}}})
+
+        with tempfile.TemporaryDirectory() as tmpdir, patch.object(
+            build, "STATE_FILE", os.path.join(tmpdir, "state.json")
+        ), patch.object(
+            build.subprocess, "check_output", side_effect=check_output
+        ), patch.object(
+            build.subprocess, "run"
+        ) as run, patch.dict(
+            os.environ, {"DOCKER_REGISTRY": "althack", "DOCKER_PUSH": ""}
+        ):
+            build.build("ros2-jazzy-base", push=False, clean=True)
+
+        commands = [call.args[0] for call in run.call_args_list]
+        self.assertEqual(commands[-1], ["docker", "image", "rm", "sha256:old"])
+        self.assertEqual(len(commands), 2)
+
+    def test_docker_clean_false_turns_pruning_off(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir, patch.object(
+            build, "STATE_FILE", os.path.join(tmpdir, "state.json")
+        ), patch.object(
+            build.subprocess,
+            "check_output",
+            return_value=json.dumps({"target": {"ros2-jazzy-base": {}}}),
+        ), patch.object(
+            build.DockerBake, "prune"
+        ) as prune, patch.object(
+            build.subprocess, "run"
+        ), patch.dict(
+            os.environ, {"DOCKER_CLEAN": "false", "DOCKER_PUSH": ""}
+        ):
+            build.build("ros2-jazzy-base", push=False)
+            prune.assert_not_called()
+            build.build("ros2-jazzy-base", push=False, clean=True)
+            prune.assert_called_once()
+
+    def test_project_images_without_families_is_empty(self) -> None:
+        baker = build.DockerBake()
+        with patch.object(
+            build.DockerBake, "families", return_value=[]
+        ), patch.object(build.subprocess, "check_output") as check_output:
+            self.assertEqual(baker.project_images(), set())
+        check_output.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Unit tests for dockerfiles_templates.cache."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from dockerfiles_templates import cache as cache_module
+from dockerfiles_templates.cache import (
+    CatalogCache,
+    RenderCache,
+    render_cache_limit,
+)
+
+
+class RenderCacheTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmpdir.name)
+        self.cache = RenderCache(self.root / "render")
+
+    def tearDown(self) -> None:
+        self._tmpdir.cleanup()
+
+    def test_store_and_load_round_trip(self) -> None:
+        self.assertIsNone(self.cache.load("a"))
+        self.cache.store("a", "FROM base\n", ["ros2.dockerfile.jinja"])
+        self.assertEqual(
+            self.cache.load("a"), ("FROM base\n", ["ros2.dockerfile.jinja"])
+        )
+        (self.root / "render" / "b.json").write_text("{bad", "utf-8")
+        self.assertIsNone(self.cache.load("b"))
+
+    def test_trim_evicts_least_recently_used(self) -> None:
+        for index, key in enumerate(["old", "used", "new"]):
+            self.cache.store(key, "x" * 100, [])
+            path = self.root / "render" / f"{key}.json"
+            os.utime(path, ns=(index * 10**9, index * 10**9))
+        self.cache.load("used")
+        size = (self.root / "render" / "new.json").stat().st_size
+
+        self.assertEqual(self.cache.trim(2 * size), 1)
+        self.assertIsNone(self.cache.load("old"))
+        self.assertIsNotNone(self.cache.load("used"))
+        self.assertIsNotNone(self.cache.load("new"))
+
+    def test_read_only_cache_never_writes(self) -> None:
+        self.cache.store("a", "x", [])
+        path = self.root / "render" / "a.json"
+        os.utime(path, ns=(0, 0))
+        cache = RenderCache(self.root / "render", read_only=True)
+
+        self.assertEqual(cache.load("a"), ("x", []))
+        cache.store("b", "y", [])
+        self.assertEqual(cache.trim(0), 0)
+        self.assertEqual(path.stat().st_mtime_ns, 0)
+        self.assertEqual(list((self.root / "render").iterdir()), [path])
+
+    def test_limit_from_environment(self) -> None:
+        env = "DOCKERFILES_TEMPLATES_RENDER_CACHE_MB"
+        with patch.dict(os.environ, {env: "0.5"}):
+            self.assertEqual(render_cache_limit(), 512 * 1024)
+        with patch.dict(os.environ, {env: "lots"}):
+            self.assertEqual(render_cache_limit(), 64 * 1024 * 1024)
+
+
+class CatalogCacheTestCase(unittest.TestCase):
+    def test_trim_caps_catalog_and_state_files(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir, patch.object(
+            cache_module, "MAX_CACHE_FILES", 2
+        ):
+            cache = CatalogCache(tmpdir)
+            for index in range(4):
+                cache.store(f"c{index}", {}, "catalog")
+                cache.store(f"s{index}", {}, "state")
+                for kind, key in (("catalog", "c"), ("state", "s")):
+                    path = Path(tmpdir) / f"{kind}-{key}{index}.json"
+                    os.utime(path, ns=(index * 10**9, index * 10**9))
+            cache.store("s4", {}, "state")
+
+            self.assertEqual(
+                sorted(path.name for path in Path(tmpdir).iterdir()),
+                [
+                    "catalog-c2.json",
+                    "catalog-c3.json",
+                    "state-s3.json",
+                    "state-s4.json",
+                ],
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Unit tests for dockerfiles_templates.fingerprint."""
+
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from dockerfiles_templates.fingerprint import (
+    BuildState,
+    copy_sources,
+    stage_blocks,
+    target_fingerprint,
+)
+
+DOCKERFILE = """\
+ARG VERSION=1
+FROM ubuntu:24.04 AS base
+COPY ./ros_entrypoint.sh /
+FROM base AS dev
+RUN echo dev
+FROM ubuntu:24.04 AS other
+RUN echo other
+"""
+
+
+class FingerprintTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.context = Path(self._tmpdir.name)
+        self.dockerfile = self.context / "jazzy.Dockerfile"
+        self.dockerfile.write_text(DOCKERFILE)
+        (self.context / "ros_entrypoint.sh").write_text("#!/bin/bash\n")
+
+    def tearDown(self) -> None:
+        self._tmpdir.cleanup()
+
+    def _fingerprint(self, stage: str, inputs=()) -> str:
+        return target_fingerprint(
+            self.dockerfile, stage, self.context, inputs
+        )
+
+    def test_stage_blocks_and_copy_sources(self) -> None:
+        preamble, blocks = stage_blocks(DOCKERFILE)
+        self.assertEqual(preamble, "ARG VERSION=1")
+        self.assertEqual(list(blocks), ["base", "dev", "other"])
+        self.assertEqual(
+            blocks["dev"], ("base", "FROM base AS dev\nRUN echo dev")
+        )
+        self.assertEqual(
+            copy_sources(
+                "COPY --chown=ros:ros a.sh b/ /opt/\n"
+                "COPY --from=base /etc/x /etc/x\n"
+                'ADD ["c d.sh", "/"]\n'
+                "RUN cp a b"
+            ),
+            ["a.sh", "b/", "c d.sh"],
+        )
+
+    def test_fingerprint_follows_stage_chain_and_context(self) -> None:
+        base, dev, other = (
+            self._fingerprint(stage) for stage in ("base", "dev", "other")
+        )
+        self.assertEqual(self._fingerprint("dev"), dev)
+        self.assertNotEqual(self._fingerprint("dev", ["parent"]), dev)
+
+        self.dockerfile.write_text(
+            DOCKERFILE.replace("RUN echo dev", "# comment\n\nRUN echo dev")
+        )
+        self.assertEqual(self._fingerprint("dev"), dev)
+
+        (self.context / "ros_entrypoint.sh").write_text("#!/bin/sh\n")
+        self.assertNotEqual(self._fingerprint("base"), base)
+        self.assertNotEqual(self._fingerprint("dev"), dev)
+        self.assertEqual(self._fingerprint("other"), other)
+
+        self.dockerfile.write_text(
+            DOCKERFILE.replace("ubuntu:24.04 AS other", "ubuntu:26.04 AS other")
+        )
+        self.assertNotEqual(self._fingerprint("other"), other)
+
+    def test_build_state_tracks_load_and_push_separately(self) -> None:
+        path = self.context / "build" / "state.json"
+        state = BuildState.load(path)
+        self.assertFalse(state.is_current("t", "abc", push=False))
+        state.record("t", "abc", 12.5, push=False)
+        state.save()
+
+        state = BuildState.load(path)
+        self.assertTrue(state.is_current("t", "abc", push=False))
+        self.assertFalse(state.is_current("t", "abc", push=True))
+        self.assertFalse(state.is_current("t", "def", push=False))
+        self.assertEqual(state.seconds("t", push=False), 12.5)
+
+        path.write_text("not json")
+        self.assertFalse(
+            BuildState.load(path).is_current("t", "abc", push=False)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
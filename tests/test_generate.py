@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""Unit tests for generate.py rendering."""
+
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from click.testing import CliRunner
+from jinja2 import Environment
+
+import generate
+from benchmarks.catalog import synthetic_catalog
+from dockerfiles_templates import Templates
+from dockerfiles_templates.cache import RenderCache
+from dockerfiles_templates.manifest import Manifest
+from dockerfiles_templates.profile import Profiler
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+class RenderOutputsTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmpdir.name)
+        shutil.copytree(REPO_ROOT / "template", self.root / "template")
+        self._cwd = os.getcwd()
+        os.chdir(self.root)
+        self._env = patch.dict(
+            os.environ,
+            {"DOCKERFILES_TEMPLATES_CACHE_DIR": str(self.root / "cache")},
+        )
+        self._env.start()
+        self._saved = (generate.templates, generate.manifest)
+        generate.templates = Templates.from_dict(synthetic_catalog(12))
+        self._reset_environments()
+
+    def tearDown(self) -> None:
+        generate.templates, generate.manifest = self._saved
+        self._reset_environments()
+        self._env.stop()
+        os.chdir(self._cwd)
+        self._tmpdir.cleanup()
+
+    def _reset_environments(self) -> None:
+        generate._environments.clear()
+        generate._template_digests.clear()
+        generate._template_references = None
+
+    def _render(self, workers: int) -> dict[str, str]:
+        generate.manifest = Manifest(self.root / "manifest.json")
+        jobs = generate.dockerfile_jobs(eol=True) + generate.readme_jobs()
+        generate.render_outputs(jobs, workers)
+        outputs = {
+            job.out_file: Path(job.out_file).read_text(encoding="utf-8")
+            for job in jobs
+        }
+        for job in jobs:
+            os.remove(job.out_file)
+        return outputs
+
+    def test_parallel_render_matches_serial(self) -> None:
+        serial = self._render(1)
+        self.assertGreater(len(serial), 12)
+        self.assertEqual(self._render(2), serial)
+
+    def test_fresh_outputs_are_skipped(self) -> None:
+        generate.manifest = Manifest(self.root / "manifest.json")
+        jobs = generate.readme_jobs()
+        generate.render_outputs(jobs)
+        generate.render_outputs(jobs)
+        self.assertEqual(
+            generate.manifest.outcomes("skipped"),
+            sorted(job.out_file for job in jobs),
+        )
+
+    def test_render_cache_skips_rendering_after_relocation(self) -> None:
+        jobs = generate.readme_jobs()
+        generate.manifest = Manifest(self.root / "manifest.json")
+        first = RenderCache(self.root / "ci-a")
+        generate.render_outputs(jobs, cache=first)
+        expected = {
+            job.out_file: Path(job.out_file).read_bytes() for job in jobs
+        }
+        for job in jobs:
+            os.remove(job.out_file)
+
+        # A fresh runner restores the directory somewhere else.
+        shutil.copytree(self.root / "ci-a", self.root / "ci-b")
+        generate.manifest = Manifest(self.root / "manifest-b.json")
+        with patch.object(
+            generate, "render_job", side_effect=AssertionError("rendered")
+        ):
+            generate.render_outputs(jobs, cache=RenderCache(self.root / "ci-b"))
+        self.assertEqual(
+            {job.out_file: Path(job.out_file).read_bytes() for job in jobs},
+            expected,
+        )
+        record = generate.manifest.record(jobs[0].out_file)
+        self.assertIn("readme.md.jinja", record["templates"])
+
+    def test_precompiled_templates_skip_compilation(self) -> None:
+        names = generate.precompile()
+        self.assertIn("readme.md.jinja", names)
+        self.assertTrue(any((self.root / "cache" / "jinja").iterdir()))
+
+        self._reset_environments()
+        with patch.object(
+            Environment, "compile", side_effect=AssertionError("compiled")
+        ), patch.object(
+            Environment, "parse", side_effect=AssertionError("parsed")
+        ):
+            rendered = self._render(1)
+        self.assertTrue(rendered)
+
+    def test_changed_snippet_selects_outputs_that_include_it(self) -> None:
+        def gz(name: str, base_image: str) -> dict:
+            return {
+                "family": "gz",
+                "name": name,
+                "distro": "harmonic",
+                "base_image": base_image,
+                "targets": [{"target": "base", "platforms": ["linux/amd64"]}],
+            }
+
+        generate.templates = Templates.from_dict(
+            {
+                "dockerfiles": [
+                    gz("harmonic", "ubuntu:24.04"),
+                    gz("harmonic-cuda", "nvidia/cuda:12.6.3-base-ubuntu24.04"),
+                ]
+            }
+        )
+        generate.manifest = Manifest(self.root / "manifest.json")
+        jobs = generate.dockerfile_jobs() + generate.readme_jobs()
+        graph = generate.build_graph(jobs)
+        nvidia = generate.changed_nodes(["template/snippits/nvidia.jinja"])
+        # Nothing rendered yet: fall back to the static include graph.
+        self.assertEqual(
+            graph.outputs(nvidia),
+            ["gz/harmonic-cuda.Dockerfile", "gz/harmonic.Dockerfile"],
+        )
+
+        generate.render_outputs(jobs)
+        graph = generate.build_graph(jobs)
+        self.assertEqual(graph.outputs(nvidia), ["gz/harmonic-cuda.Dockerfile"])
+        self.assertEqual(
+            graph.outputs(generate.changed_nodes(["templates.yml"])),
+            [
+                ".vscode/tasks.json",
+                "bake/gz.json",
+                "docker-bake.hcl",
+                "docker-bake.json",
+                "gz/README.md",
+                "gz/harmonic-cuda.Dockerfile",
+                "gz/harmonic.Dockerfile",
+            ],
+        )
+        self.assertEqual(
+            graph.outputs(generate.changed_nodes(["README.md"])), []
+        )
+
+    def test_check_reports_stale_outputs_without_writing(self) -> None:
+        (self.root / ".vscode").mkdir()
+        shutil.copy(REPO_ROOT / ".vscode" / "tasks.json", self.root / ".vscode")
+        self.assertEqual(generate.gen(generate.log), [])
+        manifest = Path(generate.MANIFEST_FILE).read_bytes()
+        self.assertEqual(generate.gen(generate.log, check=True), [])
+
+        readme = generate.readme_jobs()[0].out_file
+        Path(readme).write_text("stale\n", encoding="utf-8")
+        os.remove(generate.BAKE_JSON)
+        stale = generate.gen(generate.log, check=True)
+        self.assertEqual(stale, sorted([readme, generate.BAKE_JSON]))
+        self.assertEqual(Path(readme).read_text(encoding="utf-8"), "stale\n")
+        self.assertFalse(os.path.exists(generate.BAKE_JSON))
+        self.assertEqual(Path(generate.MANIFEST_FILE).read_bytes(), manifest)
+
+    def test_check_leaves_caches_and_profile_untouched(self) -> None:
+        (self.root / ".vscode").mkdir()
+        shutil.copy(REPO_ROOT / ".vscode" / "tasks.json", self.root / ".vscode")
+        shutil.copy(REPO_ROOT / generate.CATALOG_PATH, self.root)
+        generate.gen(generate.log)
+        # Force template, bytecode and reference cache misses.
+        readme = self.root / "template" / "readme.md.jinja"
+        readme.write_text(readme.read_text() + "{# changed #}\n")
+        cache = self.root / "cache"
+
+        def snapshot() -> dict[str, int]:
+            return {
+                str(path): path.stat().st_mtime_ns
+                for path in [cache, *cache.rglob("*")]
+            }
+
+        before = snapshot()
+        result = CliRunner().invoke(
+            generate.main, ["--check", "--profile", "--as-of", "2026-09-01"]
+        )
+        self.assertEqual(result.exit_code, 1, result.output)
+        self.assertEqual(snapshot(), before)
+        self.assertFalse(os.path.exists(generate.PROFILE_FILE))
+
+    def test_profile_reports_a_warm_run_without_rendering(self) -> None:
+        (self.root / ".vscode").mkdir()
+        shutil.copy(REPO_ROOT / ".vscode" / "tasks.json", self.root / ".vscode")
+        cold = Profiler()
+        generate.gen(generate.log, profile=cold)
+        report = cold.report()
+        self.assertGreater(report["stages"]["render"], 0)
+        self.assertGreater(report["bytes_written"], 0)
+        readme = generate.readme_jobs()[0].out_file
+        self.assertEqual(report["outputs"][readme]["source"], "rendered")
+        self.assertIn("compile_seconds", report["outputs"][readme])
+
+        warm = Profiler()
+        generate.gen(generate.log, profile=warm)
+        report = warm.report()
+        self.assertIs(generate.profiler, warm)
+        self.assertNotIn("render", report["stages"])
+        self.assertEqual(report["caches"]["manifest"]["hit_rate"], 1.0)
+        self.assertEqual(report["bytes_written"], 0)
+
+    def test_watch_loop_regenerates_affected_outputs(self) -> None:
+        class FakeWatcher:
+            kind = "fake"
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc_info):
+                return None
+
+            def wait(self, timeout=None):
+                return {"template/readme.md.jinja"}
+
+        (self.root / ".vscode").mkdir()
+        shutil.copy(REPO_ROOT / ".vscode" / "tasks.json", self.root / ".vscode")
+        with patch.object(generate, "watch", return_value=FakeWatcher()):
+            with patch.object(generate, "gen", wraps=generate.gen) as gen:
+                with self.assertLogs(generate.log, "INFO") as logs:
+                    generate.watch_loop(generate.log, iterations=1)
+        self.assertEqual(
+            gen.call_args.kwargs["changed"], ["template/readme.md.jinja"]
+        )
+        self.assertTrue(
+            any(
+                "Handled template/readme.md.jinja in" in line
+                for line in logs.output
+            )
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Startup benchmarks for the dockerfiles_templates package."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# Cumulative import budget for ``import dockerfiles_templates``. Override with
+# DOCKERFILES_TEMPLATES_IMPORT_BUDGET_MS on unusually slow machines.
+IMPORT_BUDGET_MS = float(
+    os.getenv("DOCKERFILES_TEMPLATES_IMPORT_BUDGET_MS", "50")
+)
+HEAVY_MODULES = ("ruamel", "jsonschema", "yaml")
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def import_time_ms(module: str) -> float:
+    """Return the cumulative ``-X importtime`` cost of ``module`` in ms."""
+    result = run_python("-X", "importtime", "-c", f"import {module}")
+    for line in result.stderr.splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1000
+    raise AssertionError(f"No importtime record for {module}")
+
+
+class ImportTimeTestCase(unittest.TestCase):
+    def test_platform_helpers_skip_heavy_imports(self) -> None:
+        result = run_python(
+            "-c",
+            "import sys\n"
+            "from dockerfiles_templates import (\n"
+            "    canonical_platform, parse_platform, platforms_support)\n"
+            f"print(sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules))",
+        )
+        self.assertEqual(result.stdout.strip(), "[]")
+
+    def test_catalog_api_loads_on_demand(self) -> None:
+        result = run_python(
+            "-c",
+            "import sys, dockerfiles_templates\n"
+            "assert 'jsonschema' not in sys.modules\n"
+            "print(dockerfiles_templates.Templates.__name__)",
+        )
+        self.assertEqual(result.stdout.strip(), "Templates")
+
+    def test_import_time_within_budget(self) -> None:
+        # Best of three runs keeps the check stable on noisy runners.
+        elapsed = min(
+            import_time_ms("dockerfiles_templates") for _ in range(3)
+        )
+        self.assertLess(
+            elapsed,
+            IMPORT_BUDGET_MS,
+            f"import dockerfiles_templates took {elapsed:.1f}ms "
+            f"(budget {IMPORT_BUDGET_MS:.1f}ms)",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
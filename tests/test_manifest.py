@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Unit tests for dockerfiles_templates.manifest."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from dockerfiles_templates.manifest import (
+    CheckManifest,
+    Manifest,
+    context_digest,
+)
+from dockerfiles_templates.model import Entry
+
+
+class ManifestTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmpdir.name)
+        self.path = self.root / "manifest.json"
+        self.out_file = str(self.root / "out" / "jazzy.Dockerfile")
+
+    def tearDown(self) -> None:
+        self._tmpdir.cleanup()
+
+    def test_fresh_outputs_are_skipped_until_inputs_change(self) -> None:
+        manifest = Manifest.load(self.path)
+        key = Manifest.key("template", b"context")
+        self.assertFalse(manifest.is_fresh(self.out_file, key))
+        self.assertTrue(manifest.write(self.out_file, key, "FROM base\n"))
+        manifest.finish()
+        manifest.save()
+
+        manifest = Manifest.load(self.path)
+        self.assertTrue(manifest.is_fresh(self.out_file, key))
+        other = Manifest.key("template", b"other")
+        self.assertFalse(manifest.is_fresh(self.out_file, other))
+
+        mtime = os.stat(self.out_file).st_mtime_ns
+        self.assertFalse(manifest.write(self.out_file, other, "FROM base\n"))
+        self.assertEqual(os.stat(self.out_file).st_mtime_ns, mtime)
+        self.assertEqual(manifest.outcomes("rendered"), [self.out_file])
+
+    def test_edited_output_is_not_fresh(self) -> None:
+        manifest = Manifest.load(self.path)
+        key = Manifest.key("template")
+        manifest.write(self.out_file, key, "FROM base\n")
+        Path(self.out_file).write_text("FROM edited\n", encoding="utf-8")
+        self.assertFalse(manifest.is_fresh(self.out_file, key))
+
+    def test_finish_forgets_outputs_not_produced(self) -> None:
+        manifest = Manifest.load(self.path)
+        manifest.write(self.out_file, Manifest.key("a"), "a\n")
+        manifest.save()
+
+        manifest = Manifest.load(self.path)
+        self.assertEqual(manifest.finish(), [self.out_file])
+        self.assertTrue(Path(self.out_file).exists())
+        self.assertEqual(
+            manifest.summary(), "0 rendered (0 written), 0 skipped, 1 removed"
+        )
+
+    def test_check_manifest_compares_without_writing(self) -> None:
+        manifest = Manifest.load(self.path)
+        key = Manifest.key("a")
+        manifest.write(self.out_file, key, "FROM base\n")
+        manifest.save()
+        saved = self.path.read_text(encoding="utf-8")
+
+        check = CheckManifest.load(self.path)
+        self.assertFalse(check.is_fresh(self.out_file, key))
+        self.assertFalse(check.write(self.out_file, key, "FROM base\n"))
+        missing = str(self.root / "missing.Dockerfile")
+        self.assertFalse(check.write(missing, key, "FROM base\n"))
+        check.finish()
+        check.save()
+        self.assertEqual(check.outcomes("stale"), [missing])
+        self.assertEqual(check.summary(), "2 checked, 1 stale")
+        self.assertFalse(Path(missing).exists())
+        self.assertEqual(self.path.read_text(encoding="utf-8"), saved)
+
+        # Same size, different bytes.
+        self.assertFalse(check.write(self.out_file, key, "FROM edit\n"))
+        self.assertIn(self.out_file, check.outcomes("stale"))
+
+    def test_corrupt_manifest_starts_empty(self) -> None:
+        self.path.write_text("{not json", encoding="utf-8")
+        manifest = Manifest.load(self.path)
+        self.assertFalse(manifest.is_fresh(self.out_file, Manifest.key("a")))
+
+    def test_context_digest_is_stable(self) -> None:
+        entry = Entry(
+            {
+                "family": "ros2",
+                "name": "jazzy",
+                "distro": "jazzy",
+                "base_image": "ubuntu:24.04",
+                "targets": [{"target": "base", "platforms": ["linux/amd64"]}],
+            }
+        )
+        context = {"entry": entry, ("ros2", "jazzy"): {"linux-amd64": ["x"]}}
+        self.assertEqual(context_digest(context), context_digest(dict(context)))
+        self.assertNotEqual(
+            context_digest(entry.to_render_context(in_eol=True)),
+            context_digest(entry.to_render_context(in_eol=False)),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
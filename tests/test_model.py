@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Unit tests for dockerfiles_templates.model."""
+
+from __future__ import annotations
+
+import pickle
+import unittest
+
+from dockerfiles_templates import Entry, Platform, Target, Templates
+from dockerfiles_templates.model import _Frozen
+
+ENTRY = {
+    "family": "ignition",
+    "name": "fortress",
+    "distro": "fortress",
+    "base_image": "ubuntu:20.04",
+    "gazebo_version": "6",
+    "targets": [
+        {"target": "base", "platforms": ["linux/amd64", "linux/arm"]},
+        {"target": "dev", "platforms": ["linux/arm/v7"]},
+    ],
+}
+
+
+class ModelTestCase(unittest.TestCase):
+    def test_entry_is_a_read_only_mapping(self) -> None:
+        entry = Entry(ENTRY)
+        self.assertEqual(list(entry), list(ENTRY))
+        self.assertEqual(entry["gazebo_version"], "6")
+        self.assertIsNone(entry.get("eol"))
+        self.assertNotIn("eol", entry)
+        self.assertEqual(entry.targets[1]["platforms"], ("linux/arm/v7",))
+        self.assertEqual(entry.to_dict(), ENTRY)
+        self.assertFalse(hasattr(entry, "__dict__"))
+        with self.assertRaises(AttributeError):
+            entry.name = "garden"
+        with self.assertRaises(TypeError):
+            entry["name"] = "garden"
+
+    def test_render_context_shares_targets(self) -> None:
+        entry = Entry(ENTRY)
+        context = entry.to_render_context(out_file="x.Dockerfile")
+        self.assertIs(context["targets"], entry.targets)
+        self.assertEqual(context["out_file"], "x.Dockerfile")
+        self.assertIsInstance(entry.copy(), dict)
+
+    def test_platforms_are_parsed_and_interned(self) -> None:
+        target = Target("base", ["linux/ARM", "linux-arm64"])
+        self.assertEqual(
+            target.parsed_platforms,
+            (Platform("linux", "arm"), Platform("linux", "arm64")),
+        )
+        self.assertIs(Platform.parse("linux/arm"), target.parsed_platforms[0])
+        self.assertTrue(target.supports("linux/arm/v7"))
+        self.assertFalse(Target("dev", ["linux/arm/v7"]).supports("linux/arm"))
+        self.assertEqual(Platform.parse("linux/arm/v7").key, "linux-arm-v7")
+
+    def test_pickle_round_trip(self) -> None:
+        entry = Entry(ENTRY)
+        self.assertEqual(pickle.loads(pickle.dumps(entry)), entry)
+
+    def test_subclasses_must_implement_to_dict(self) -> None:
+        class Incomplete(_Frozen):
+            __slots__ = ()
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+    def test_templates_return_model_objects(self) -> None:
+        templates = Templates.from_dict({"dockerfiles": [ENTRY]})
+        entry = templates.get_entry("ignition", "fortress")
+        self.assertIsInstance(entry, Entry)
+        self.assertIs(templates.raw()[0], templates.raw()[0])
+        self.assertIsInstance(templates.raw()[0], dict)
+        targets = templates.targets_for_platform(entry, "linux/arm/v7")
+        self.assertEqual([t.target for t in targets], ["base", "dev"])
+
+
+if __name__ == "__main__":
+    unittest.main()
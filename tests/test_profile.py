@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Unit tests for dockerfiles_templates.profile."""
+
+from __future__ import annotations
+
+import json
+import pstats
+import tempfile
+import unittest
+from pathlib import Path
+
+from dockerfiles_templates.profile import Profiler
+
+
+class ProfilerTestCase(unittest.TestCase):
+    def test_report_collects_stages_outputs_and_caches(self) -> None:
+        profiler = Profiler()
+        profiler.start()
+        with profiler.stage("render"):
+            pass
+        profiler.add_time("render.compile", 0.25)
+        profiler.add_time("render.compile", 0.25)
+        profiler.output("a.Dockerfile", "rendered", write_seconds=0.5)
+        profiler.output("a.Dockerfile", "rendered", bytes_written=10)
+        profiler.output("b.Dockerfile", "skipped")
+        profiler.cache("manifest", hits=3, misses=1)
+        profiler.cache("render")
+        profiler.stop()
+
+        report = profiler.report()
+        self.assertEqual(report["stages"]["render.compile"], 0.5)
+        self.assertGreaterEqual(report["total_seconds"], 0)
+        self.assertEqual(report["bytes_written"], 10)
+        self.assertEqual(
+            report["outputs"]["a.Dockerfile"],
+            {"source": "rendered", "write_seconds": 0.5, "bytes_written": 10},
+        )
+        self.assertEqual(report["caches"]["manifest"]["hit_rate"], 0.75)
+        self.assertIsNone(report["caches"]["render"]["hit_rate"])
+        self.assertEqual(json.loads(profiler.to_json()), report)
+
+        text = profiler.format()
+        self.assertIn("    compile", text)
+        self.assertIn("75%", text)
+        self.assertIn("Outputs: 2 (1 rendered, 1 skipped), 10 bytes", text)
+        self.assertIn("a.Dockerfile (rendered)", text)
+
+    def test_cprofile_dump(self) -> None:
+        with self.assertRaises(ValueError):
+            Profiler().dump_stats("unused")
+        profiler = Profiler(cprofile=True)
+        profiler.start()
+        sorted(range(100))
+        profiler.stop()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "gen.pstats"
+            profiler.dump_stats(path)
+            self.assertGreater(pstats.Stats(str(path)).total_calls, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
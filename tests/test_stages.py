@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Unit tests for dockerfiles_templates.stages."""
+
+from __future__ import annotations
+
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from dockerfiles_templates.stages import (
+    StageGraph,
+    dockerfile_stages,
+    memory_cap,
+    run_graph,
+)
+
+DOCKERFILE = """\
+ARG BASE=ubuntu:24.04
+FROM ubuntu:24.04 AS base
+RUN true
+FROM base AS dev
+FROM dev as tools
+FROM --platform=$BUILDPLATFORM tools AS desktop
+FROM althack/ros2:jazzy-base AS extra
+"""
+
+
+def _target(context: str, dockerfile: str, stage: str) -> dict:
+    return {
+        "context": context,
+        "dockerfile": dockerfile,
+        "target": stage,
+        "tags": [f"${{REGISTRY}}/{context}:jazzy-{stage}"],
+    }
+
+
+class StageGraphTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmpdir.name)
+        (self.root / "ros2").mkdir()
+        (self.root / "ros2" / "jazzy.Dockerfile").write_text(DOCKERFILE)
+        self.definition = {
+            "target": {
+                f"ros2-jazzy-{stage}": _target(
+                    "ros2", "jazzy.Dockerfile", stage
+                )
+                for stage in ("base", "dev", "desktop", "extra")
+            }
+        }
+
+    def tearDown(self) -> None:
+        self._tmpdir.cleanup()
+
+    def _graph(self, targets=None) -> StageGraph:
+        return StageGraph.from_definition(
+            self.definition,
+            targets or list(self.definition["target"]),
+            self.root,
+            "althack",
+        )
+
+    def test_dockerfile_stages(self) -> None:
+        self.assertEqual(
+            dockerfile_stages(DOCKERFILE),
+            {
+                "base": "ubuntu:24.04",
+                "dev": "base",
+                "tools": "dev",
+                "desktop": "tools",
+                "extra": "althack/ros2:jazzy-base",
+            },
+        )
+
+    def test_dependencies_skip_non_target_stages_and_follow_tags(self) -> None:
+        graph = self._graph()
+        self.assertEqual(graph.dependencies("ros2-jazzy-base"), ())
+        self.assertEqual(
+            graph.dependencies("ros2-jazzy-desktop"), ("ros2-jazzy-dev",)
+        )
+        self.assertEqual(
+            graph.dependencies("ros2-jazzy-extra"), ("ros2-jazzy-base",)
+        )
+        self.assertEqual(graph.descendants()["ros2-jazzy-base"], 3)
+        self.assertEqual(graph.order()[0], "ros2-jazzy-base")
+
+        partial = self._graph(["ros2-jazzy-desktop"])
+        self.assertEqual(partial.dependencies("ros2-jazzy-desktop"), ())
+
+    def test_cycle_is_rejected(self) -> None:
+        graph = StageGraph({"a": ["b"], "b": ["a"]})
+        with self.assertRaises(ValueError):
+            graph.order()
+        with self.assertRaises(ValueError):
+            run_graph(graph, lambda target: None, 2)
+
+    def test_memory_cap(self) -> None:
+        meminfo = self.root / "meminfo"
+        meminfo.write_text("MemTotal: 16777216 kB\nMemAvailable: 8388608 kB\n")
+        self.assertEqual(memory_cap(2 * 1024**3, meminfo), 4)
+        self.assertEqual(memory_cap(16 * 1024**3, meminfo), 1)
+        self.assertIsNone(memory_cap(0, meminfo))
+        self.assertIsNone(memory_cap(1024, self.root / "missing"))
+
+
+class RunGraphTestCase(unittest.TestCase):
+    def test_runs_independent_chains_concurrently_in_order(self) -> None:
+        graph = StageGraph(
+            {
+                "a-base": [],
+                "a-dev": ["a-base"],
+                "b-base": [],
+                "b-dev": ["b-base"],
+            }
+        )
+        lock = threading.Lock()
+        active = []
+        peak = []
+
+        def run(target: str) -> None:
+            with lock:
+                active.append(target)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.remove(target)
+
+        finished = run_graph(graph, run, workers=2)
+        self.assertEqual(max(peak), 2)
+        self.assertLess(finished.index("a-base"), finished.index("a-dev"))
+        self.assertLess(finished.index("b-base"), finished.index("b-dev"))
+
+    def test_failure_stops_dependents(self) -> None:
+        graph = StageGraph({"base": [], "dev": ["base"], "other": []})
+        ran = []
+
+        def run(target: str) -> None:
+            ran.append(target)
+            if target == "base":
+                raise RuntimeError("build failed")
+
+        with self.assertRaisesRegex(RuntimeError, "build failed"):
+            run_graph(graph, run, workers=1)
+        self.assertNotIn("dev", ran)
+
+
+if __name__ == "__main__":
+    unittest.main()
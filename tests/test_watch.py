@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Unit tests for dockerfiles_templates.watch."""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from dockerfiles_templates.watch import (
+    InotifyWatcher,
+    PollingWatcher,
+    ignored,
+)
+
+
+class WatcherTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmpdir.name)
+        (self.root / "template" / "snippits").mkdir(parents=True)
+        (self.root / "template" / "snippits" / "nvidia.jinja").write_text("a")
+        (self.root / "templates.yml").write_text("dockerfiles: []\n")
+
+    def tearDown(self) -> None:
+        self._tmpdir.cleanup()
+
+    def _edit(self) -> None:
+        time.sleep(0.05)
+        (self.root / "template" / "snippits" / "nvidia.jinja").write_text("b")
+        (self.root / "template" / "snippits" / ".nvidia.jinja.swp").write_text(
+            "swap"
+        )
+        replacement = self.root / "templates.yml.new"
+        replacement.write_text("dockerfiles: [] # edited\n")
+        os.replace(replacement, self.root / "templates.yml")
+        (self.root / "README.md").write_text("not watched")
+
+    def _check(self, watcher: PollingWatcher) -> None:
+        with watcher:
+            editor = threading.Thread(target=self._edit)
+            editor.start()
+            changed = set()
+            deadline = time.monotonic() + 5
+            while len(changed) < 2 and time.monotonic() < deadline:
+                changed |= watcher.wait(timeout=1)
+            editor.join()
+        self.assertEqual(
+            {os.path.relpath(path, self.root) for path in changed},
+            {"template/snippits/nvidia.jinja", "templates.yml"},
+        )
+
+    def test_polling_watcher_reports_changed_files(self) -> None:
+        paths = [self.root / "template", self.root / "templates.yml"]
+        self._check(PollingWatcher(paths, interval=0.02))
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify only")
+    def test_inotify_watcher_reports_changed_files(self) -> None:
+        paths = [self.root / "template", self.root / "templates.yml"]
+        self._check(InotifyWatcher(paths))
+
+    def test_wait_times_out_without_changes(self) -> None:
+        with PollingWatcher([self.root], interval=0.01) as watcher:
+            self.assertEqual(watcher.wait(timeout=0.05), set())
+
+    def test_ignored_names(self) -> None:
+        self.assertTrue(ignored(".ros2.dockerfile.jinja.swp"))
+        self.assertTrue(ignored("readme.md.jinja~"))
+        self.assertFalse(ignored("nvidia.jinja"))
+
+
+if __name__ == "__main__":
+    unittest.main()